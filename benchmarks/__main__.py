@@ -0,0 +1,138 @@
+"""
+Benchmark suite for the 5G Core Analytics & Insights Platform.
+
+Builds deterministic AMF/SMF corpora with the tools/ generators, then
+measures read_log, the KPI parsers, the KpiWriter, the main.py batch
+pipeline and every API endpoint. Results are written as JSON; compare
+them against a baseline to fail on throughput or latency regressions.
+
+Usage:
+    python -m benchmarks run --lines 100000 --output benchmarks/results.json
+    python -m benchmarks run --compare benchmarks/baseline.json
+    python -m benchmarks compare benchmarks/baseline.json benchmarks/results.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+
+# Configure logging before the pipeline modules do; their INFO lines drown the results
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+from benchmarks import cases
+from benchmarks.compare import DEFAULT_THRESHOLD, compare_results, format_comparison
+from benchmarks.corpus import build_corpus
+
+logger = logging.getLogger("benchmarks")
+
+# Benchmark groups selectable with --only
+GROUPS = ("read", "parse", "writer", "pipeline", "api")
+
+
+def run_benchmarks(args):
+    corpora = {nf_type: build_corpus(nf_type, args.lines, args.seed) for nf_type in ("AMF", "SMF")}
+    groups = args.only.split(",") if args.only else GROUPS
+
+    results = {}
+    for group in groups:
+        logger.info("Running %s benchmarks", group)
+        if group == "read":
+            results.update(cases.bench_read_log(corpora, args.repeat))
+        elif group == "parse":
+            results.update(cases.bench_parsers(corpora, args.repeat))
+        elif group == "writer":
+            results.update(cases.bench_writer(args.lines // 5, args.repeat))
+        elif group == "pipeline":
+            results.update(cases.bench_pipeline(corpora, args.repeat, args.workers))
+        elif group == "api":
+            results.update(cases.bench_endpoints(corpora, args.requests))
+        else:
+            raise SystemExit(f"Unknown benchmark group '{group}', expected: {', '.join(GROUPS)}")
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "lines": args.lines,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "host": platform.node(),
+            "python": platform.python_version()
+        },
+        "results": results
+    }
+
+
+def print_results(results):
+    for name, metrics in results["results"].items():
+        values = "  ".join(f"{metric}={value:,}" for metric, value in metrics.items())
+        print(f"{name:<44} {values}")
+
+
+def gate(baseline_path, current, threshold):
+    """
+    Print the comparison and return the process exit code.
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    rows, regressions = compare_results(baseline, current, threshold)
+    print(format_comparison(rows))
+
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {threshold:.0%}")
+        return 1
+    print(f"\nNo regressions beyond {threshold:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion pipeline and API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks")
+    run.add_argument("--lines", type=int, default=100000,
+                     help="Lines per NF corpus (10^5 to 10^8)")
+    run.add_argument("--seed", type=int, default=7, help="Corpus RNG seed")
+    run.add_argument("--repeat", type=int, default=3,
+                     help="Repetitions per benchmark; the fastest is kept")
+    run.add_argument("--requests", type=int, default=200,
+                     help="Timed requests per API endpoint")
+    run.add_argument("--workers", type=int, default=1,
+                     help="Parser processes for the pipeline benchmark")
+    run.add_argument("--only", help=f"Comma-separated groups to run: {', '.join(GROUPS)}")
+    run.add_argument("--output", default="benchmarks/results.json",
+                     help="Where to write the results")
+    run.add_argument("--compare", metavar="BASELINE",
+                     help="Fail if results regress against this baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="Allowed relative regression (0.2 = 20%%)")
+
+    compare = commands.add_parser("compare", help="Compare two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                         help="Allowed relative regression (0.2 = 20%%)")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.current) as current_file:
+            sys.exit(gate(args.baseline, json.load(current_file), args.threshold))
+
+    results = run_benchmarks(args)
+    with open(args.output, "w") as output_file:
+        json.dump(results, output_file, indent=2)
+    print_results(results)
+    logger.info("Results written to %s", args.output)
+
+    if args.compare:
+        sys.exit(gate(args.compare, results, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark cases.
+
+Each case returns {benchmark name: {metric: value}}. Metric names end in
+"_per_sec" (higher is better) or "_ms" (lower is better); see
+benchmarks.compare. Other metrics are informational.
+"""
+
+from contextlib import contextmanager
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import main as pipeline
+from log_parser.amf_parser import parse_amf_logs
+from log_parser.log_reader import read_log
+from log_parser.smf_parser import parse_smf_logs
+from tools.benchmark_writer import fresh_database, make_run, write_bulk
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Endpoints timed by bench_endpoints, against the database of the pipeline run
+ENDPOINTS = [
+    "/summary",
+    "/amf",
+    "/smf",
+    "/snssai",
+    "/dashboard",
+    "/amf/latency",
+    "/smf/latency",
+    "/ran",
+    "/procedures",
+    "/amf?from=2026-01-01T00:00:00Z&to=2026-01-02T00:00:00Z&step=5m",
+    "/metrics"
+]
+
+
+def best_of(repeat, run):
+    """
+    Run a measurement `repeat` times and keep the fastest.
+
+    Args:
+        run (callable): Returns (seconds, result).
+    """
+    return min((run() for _ in range(repeat)), key=lambda measurement: measurement[0])
+
+
+def throughput(seconds, lines=0, size=0, rows=0):
+    result = {"seconds": round(seconds, 4)}
+    if lines:
+        result["lines_per_sec"] = round(lines / seconds, 1)
+    if size:
+        result["mb_per_sec"] = round(size / MB / seconds, 2)
+    if rows:
+        result["rows_per_sec"] = round(rows / seconds, 1)
+    return result
+
+
+def bench_read_log(corpora, repeat):
+    """
+    Stream each corpus through read_log.
+    """
+    results = {}
+    for nf_type, path in corpora.items():
+        def run():
+            started = time.perf_counter()
+            lines = sum(1 for _ in read_log(path))
+            return time.perf_counter() - started, lines
+
+        seconds, lines = best_of(repeat, run)
+        results[f"read_log[{nf_type.lower()}]"] = throughput(seconds, lines, os.path.getsize(path))
+    return results
+
+
+def bench_parsers(corpora, repeat):
+    """
+    Count KPIs of each corpus with parse_amf_logs / parse_smf_logs.
+
+    The file is streamed while parsing, so subtract read_log for the
+    parser's own cost.
+    """
+    parsers = {
+        "AMF": ("parse_amf_logs", lambda lines: parse_amf_logs(lines, series={})),
+        "SMF": ("parse_smf_logs", lambda lines: parse_smf_logs(lines, series={}, slice_series={}))
+    }
+
+    results = {}
+    for nf_type, path in corpora.items():
+        name, parse = parsers[nf_type]
+
+        def run():
+            started = time.perf_counter()
+            parse(read_log(path))
+            return time.perf_counter() - started, None
+
+        seconds, _ = best_of(repeat, run)
+        lines = sum(1 for _ in read_log(path))
+        results[name] = throughput(seconds, lines, os.path.getsize(path))
+    return results
+
+
+def bench_writer(procedures, repeat):
+    """
+    Store synthetic KPI totals, buckets and procedure records through KpiWriter.
+    """
+    batch = make_run(procedures)
+
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            db_path = fresh_database(directory, "bench.db", "WAL")
+            started = time.perf_counter()
+            rows = write_bulk(db_path, *batch)
+            return time.perf_counter() - started, rows
+
+    seconds, rows = best_of(repeat, run)
+    return {"insert_kpis.KpiWriter": throughput(seconds, rows=rows)}
+
+
+@contextmanager
+def pipeline_workdir(corpora):
+    """
+    Run inside a scratch directory laid out like the repo (logs/, db/).
+
+    The pipeline and the API use paths relative to the working directory,
+    so this points them at the corpora and a fresh database.
+    """
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "logs"))
+        os.makedirs(os.path.join(directory, "db"))
+        for nf_type, path in corpora.items():
+            os.symlink(os.path.abspath(path), os.path.join(directory, "logs", f"{nf_type.lower()}.log"))
+
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+
+def bench_pipeline(corpora, repeat, workers=1):
+    """
+    Run main.py's batch ingestion on the corpora and report its stages.
+
+    Each repetition starts from an empty database.
+    """
+    def run():
+        with pipeline_workdir(corpora):
+            pipeline.main(workers=workers, report_path="reports/run.json")
+            with open("reports/run.json") as report_file:
+                report = json.load(report_file)
+        return report["total_seconds"], report
+
+    _, report = best_of(repeat, run)
+
+    results = {}
+    for stage in report["stages"]:
+        if stage["name"] in ("parse", "store"):
+            results[f"pipeline.{stage['name']}"] = throughput(
+                stage["seconds"], stage["lines"], stage["bytes"], stage["rows"]
+            )
+    results["pipeline.total"] = {"seconds": report["total_seconds"]}
+    return results
+
+
+def bench_endpoints(corpora, requests_per_endpoint):
+    """
+    Time every API endpoint against a database ingested from the corpora.
+
+    The response cache is cleared before each request, so every timing
+    includes the database work.
+    """
+    from fastapi.testclient import TestClient
+    from server.app import app, response_cache
+
+    results = {}
+    with pipeline_workdir(corpora):
+        pipeline.main(report_path="reports/run.json")
+
+        with TestClient(app) as client:
+            # Let the /metrics registry build from the fresh database
+            time.sleep(1.5)
+
+            for endpoint in ENDPOINTS:
+                for _ in range(3):
+                    client.get(endpoint)
+
+                latencies = []
+                for _ in range(requests_per_endpoint):
+                    response_cache.clear()
+                    started = time.perf_counter()
+                    response = client.get(endpoint)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+
+                latencies.sort()
+                results[f"GET {endpoint}"] = {
+                    "p50_ms": round(statistics.median(latencies), 3),
+                    "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 3),
+                    "requests_per_sec": round(len(latencies) / (sum(latencies) / 1000), 1)
+                }
+
+    return results
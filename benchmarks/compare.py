@@ -0,0 +1,78 @@
+"""
+Regression gates for benchmark results.
+
+A metric regresses when it is worse than the baseline by more than the
+threshold: "_per_sec" metrics must not drop, "_ms" metrics must not
+rise. Latency changes below MIN_LATENCY_DELTA_MS are ignored as noise.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default allowed relative change before a metric counts as regressed
+DEFAULT_THRESHOLD = 0.2
+
+# Latency differences smaller than this never fail a comparison
+MIN_LATENCY_DELTA_MS = 1.0
+
+
+def metric_direction(metric):
+    """
+    Return 1 if higher is better, -1 if lower is better, None if not gated.
+    """
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith("_ms"):
+        return -1
+    return None
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two result files.
+
+    Args:
+        baseline (dict): Baseline results (see benchmarks.__main__).
+        current (dict): New results.
+        threshold (float): Allowed relative change, e.g. 0.2 for 20%.
+
+    Returns:
+        tuple: (rows, regressions), where each row is
+        (benchmark, metric, baseline value, current value, relative change, regressed)
+        and regressions lists the regressed rows.
+    """
+    if baseline["meta"].get("lines") != current["meta"].get("lines"):
+        logger.warning("Baseline corpus size %s differs from current %s; results may not be comparable",
+                       baseline["meta"].get("lines"), current["meta"].get("lines"))
+
+    rows = []
+    for name, metrics in sorted(current["results"].items()):
+        base_metrics = baseline["results"].get(name)
+        if base_metrics is None:
+            continue
+
+        for metric, value in sorted(metrics.items()):
+            direction = metric_direction(metric)
+            base_value = base_metrics.get(metric)
+            if direction is None or not base_value:
+                continue
+
+            change = (value - base_value) / base_value
+            regressed = -change * direction > threshold
+            if direction < 0 and value - base_value < MIN_LATENCY_DELTA_MS:
+                regressed = False
+            rows.append((name, metric, base_value, value, change, regressed))
+
+    return rows, [row for row in rows if row[5]]
+
+
+def format_comparison(rows):
+    """
+    Render comparison rows as a text table.
+    """
+    lines = [f"{'benchmark':<44} {'metric':<18} {'baseline':>14} {'current':>14} {'change':>8}"]
+    for name, metric, base_value, value, change, regressed in rows:
+        flag = "  REGRESSED" if regressed else ""
+        lines.append(f"{name:<44} {metric:<18} {base_value:>14,.2f} {value:>14,.2f} {change:>+8.1%}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,56 @@
+"""
+Deterministic synthetic log corpora for the benchmarks.
+
+Corpora are built with tools.log_generator from a fixed seed and clock,
+so the same (lines, seed) always yields the same file. The procedure mix
+is the generator's default, which follows the original generators'
+sample runs. Files are cached under CORPUS_DIR and only built once.
+"""
+
+import logging
+import os
+
+from tools.log_generator import build_config, generate_log
+
+logger = logging.getLogger(__name__)
+
+CORPUS_DIR = "benchmarks/corpora"
+
+# Event time of the first procedure
+CORPUS_START = "2026-01-01T00:00:00"
+
+# Part of the file name; bump when the generator's output changes so stale corpora are rebuilt
+CORPUS_VERSION = 3
+
+
+def corpus_path(nf_type, lines, seed):
+    return os.path.join(CORPUS_DIR, f"{nf_type.lower()}-{lines}-{seed}-v{CORPUS_VERSION}.log")
+
+
+def build_corpus(nf_type, lines, seed=7, workers=None):
+    """
+    Return the path of a deterministic corpus, building it if missing.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        lines (int): Number of log lines.
+        seed (int): RNG seed.
+        workers (int): Generator processes (default: CPU count); the
+            corpus is identical for any value.
+
+    Returns:
+        str: Path of the corpus file.
+    """
+    path = corpus_path(nf_type, lines, seed)
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(CORPUS_DIR, exist_ok=True)
+    logger.info("Building %s corpus with %d lines (seed %d)", nf_type, lines, seed)
+
+    # Build under a temporary name so an interrupted build is never reused
+    partial = path + ".partial"
+    generate_log(build_config(nf_type, seed, start=CORPUS_START), lines, partial, workers)
+    os.replace(partial, path)
+
+    return path
@@ -0,0 +1,102 @@
+import json
+import logging
+import threading
+import time
+
+import requests
+import streamlit as st
+
+# -------------------- Logging Configuration --------------------
+logger = logging.getLogger("dashboard_live")
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
+# -------------------- API Endpoint --------------------
+# Server-Sent Events stream of /dashboard snapshots and deltas
+API_LIVE_URL = "http://127.0.0.1:8000/live"
+
+# Seconds to wait before reconnecting after the stream drops
+RECONNECT_DELAY = 2.0
+
+
+def apply_delta(state, delta):
+    """
+    Merge a delta from /live into the state in place (None removes a key).
+    """
+    for key, value in delta.items():
+        if value is None:
+            state.pop(key, None)
+        elif isinstance(value, dict) and isinstance(state.get(key), dict):
+            apply_delta(state[key], value)
+        else:
+            state[key] = value
+
+
+class LiveKpiState:
+    """
+    Latest dashboard data, kept current by one background /live subscription.
+
+    Shared by every browser session of the Streamlit server, so the API
+    sees one subscriber however many viewers are connected.
+    """
+
+    def __init__(self, url=API_LIVE_URL):
+        self.url = url
+        self.state = None
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self._run, name="live-kpi-state", daemon=True).start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(f"Live KPI stream disconnected: {e}")
+            with self._lock:
+                self.state = None
+            time.sleep(RECONNECT_DELAY)
+
+    def _listen(self):
+        with requests.get(self.url, stream=True, timeout=(5, 60)) as response:
+            response.raise_for_status()
+            logger.info("Subscribed to live KPI updates")
+
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    self._apply(event, json.loads(line[5:]))
+
+    def _apply(self, event, data):
+        with self._lock:
+            if event == "snapshot":
+                self.state = data
+            elif event == "delta" and self.state is not None:
+                apply_delta(self.state, data)
+            else:
+                return
+            self.version += 1
+
+    def get(self, *sections):
+        """
+        Return a copy of the requested sections, or None while not connected.
+        """
+        with self._lock:
+            if self.state is None or any(section not in self.state for section in sections):
+                return None
+            return json.loads(json.dumps({section: self.state[section] for section in sections}))
+
+
+@st.cache_resource
+def get_live_state():
+    """
+    Return the process-wide live KPI state, starting its subscription once.
+    """
+    return LiveKpiState().start()
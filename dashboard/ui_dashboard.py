@@ -12,6 +12,10 @@ logging.basicConfig(
 from ui_summary import show_summary_page
 from ui_amf import show_amf_page
 from ui_smf import show_smf_page
+from live_state import get_live_state
+
+# Seconds between checks for a live update; a check only reads the local version
+LIVE_POLL_INTERVAL = 1
 
 # -------------------- Streamlit Page Config --------------------
 st.set_page_config(
@@ -32,10 +36,13 @@ selected_page = st.sidebar.selectbox(
     index=0                       # Default to "Overview"
 )
 
+live_updates = st.sidebar.checkbox("Live updates", value=True)
+
 # Log the selected page
 logger.info(f"User selected dashboard page: {selected_page}")
 
 # -------------------- Render the Selected Page --------------------
+live_version = get_live_state().version
 try:
     pages[selected_page]()  # Call the corresponding function to render the page
     logger.info(f"Rendered {selected_page} page successfully")
@@ -43,3 +50,15 @@ except Exception as e:
     # Log any unexpected errors during page rendering
     logger.exception(f"Failed to render {selected_page} page: {e}")
     st.error(f"Failed to load {selected_page} page. Please try again.")
+
+# -------------------- Live Updates --------------------
+# Re-render when the API pushes new KPIs; no polling of the API or DB.
+# The check runs as a timed fragment, so the script thread never blocks
+# and sidebar changes apply immediately.
+@st.fragment(run_every=LIVE_POLL_INTERVAL)
+def watch_live_updates():
+    if get_live_state().version != live_version:
+        st.rerun()
+
+if live_updates:
+    watch_live_updates()
@@ -2,6 +2,7 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import requests
 import logging
+from live_state import get_live_state
 
 # -------------------- Logging Configuration --------------------
 logger = logging.getLogger("dashboard_smf")
@@ -23,10 +24,15 @@ def show_smf_page():
 
     # -------------------- Fetch Data from API --------------------
     try:
-        logger.info("Fetching SMF KPI data from API")
-        response = requests.get(API_URL, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        live = get_live_state().get("smf")
+        if live is not None:
+            data = live["smf"]
+        else:
+            # Live stream not connected yet; fall back to one request
+            logger.info("Fetching SMF KPI data from API")
+            response = requests.get(API_URL, timeout=5)
+            response.raise_for_status()
+            data = response.json()
         logger.debug(f"SMF KPI data fetched: {data}")
     except Exception as e:
         logger.exception("Failed to fetch SMF KPI data")
@@ -3,6 +3,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import requests
 import logging
+from live_state import get_live_state
 
 # -------------------- Logging Configuration --------------------
 logger = logging.getLogger("dashboard_summary")
@@ -11,9 +12,9 @@ logging.basicConfig(
     format="%(asctime)s %(levelname)s %(name)s: %(message)s"
 )
 
-# -------------------- API Endpoints --------------------
-API_URL = "http://127.0.0.1:8000/summary"
-API_SNSSAI_URL = "http://127.0.0.1:8000/snssai"
+# -------------------- API Endpoint --------------------
+# Summary and slice data in one round trip, from one DB snapshot
+API_URL = "http://127.0.0.1:8000/dashboard?fields=summary,snssai"
 
 def show_summary_page():
     """
@@ -24,13 +25,19 @@ def show_summary_page():
     """
     st.title("📊 5G Core Network KPI Summary")
 
-    # -------------------- Fetch KPI Summary Data --------------------
+    # -------------------- Fetch KPI Summary & Slice Data --------------------
     try:
-        logger.info("Fetching KPI summary from API")
-        response = requests.get(API_URL, timeout=5)
-        response.raise_for_status()
-        data = response.json()
+        dashboard = get_live_state().get("summary", "snssai")
+        if dashboard is None:
+            # Live stream not connected yet; fall back to one request
+            logger.info("Fetching KPI summary and slice data from API")
+            response = requests.get(API_URL, timeout=5)
+            response.raise_for_status()
+            dashboard = response.json()
+        data = dashboard["summary"]
+        snssai_data = dashboard["snssai"]
         logger.debug(f"KPI summary data fetched: {data}")
+        logger.debug(f"SNSSAI data fetched: {snssai_data}")
     except Exception as e:
         logger.exception("Failed to fetch KPI summary")
         st.error(f"Failed to fetch data from API: {e}")
@@ -60,18 +67,6 @@ def show_summary_page():
         st.progress(min(data["session_success_rate"] / 100, 1.0))
         st.caption(f"{data['session_success_rate']}%")
 
-    # -------------------- Fetch SNSSAI / Slice Data --------------------
-    try:
-        logger.info("Fetching SNSSAI slice data from API")
-        response = requests.get(API_SNSSAI_URL, timeout=5)
-        response.raise_for_status()
-        snssai_data = response.json()
-        logger.debug(f"SNSSAI data fetched: {snssai_data}")
-    except Exception as e:
-        logger.exception("Failed to fetch SNSSAI data")
-        st.error(f"Failed to fetch data from API: {e}")
-        st.stop()
-
     slices = []
     session_counts = []
 
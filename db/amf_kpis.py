@@ -1,37 +1,54 @@
 import logging
-import sqlite3
-from db.setup_db import get_db_connection
+from db.connection_pool import get_read_connection
+from log_parser.kpi_spec import KPI_SPECS
+from log_parser.time_buckets import BASE_RESOLUTION, window_start
 
 logger = logging.getLogger(__name__)
 
-def fetch_amf_kpis():
-    logger.info("Fetching AMF KPIs from database")
-
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
+def build_amf_kpis(amf):
+    """
+    Shape raw AMF KPI totals ({kpi_name: value}) for the API, using the
+    API names from kpi_spec.json.
+    """
+    return KPI_SPECS["AMF"].build_api_kpis(amf)
+
+def fetch_amf_kpis(window_minutes=None):
+    """
+    Fetch AMF KPI totals.
+
+    Args:
+        window_minutes (int): If set, only count events whose own timestamp
+            falls in the trailing window, read from the 1m bucket table;
+            otherwise read the all-time totals from kpi_rollups.
+    """
+    logger.info("Fetching AMF KPIs from database (window=%s min)", window_minutes)
+
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
-            SELECT kpi_name, SUM(kpi_value) AS value
-            FROM amf_kpis
-            GROUP BY kpi_name
-        """)
+        if window_minutes:
+            # Index range scan over the event-time buckets
+            cursor.execute("""
+                SELECT kpi_name, SUM(kpi_value) AS value
+                FROM amf_kpi_buckets
+                WHERE resolution = ? AND bucket_start >= ?
+                GROUP BY kpi_name
+            """, (BASE_RESOLUTION, window_start(window_minutes)))
+        else:
+            # Totals maintained at insert time; a primary key prefix lookup
+            cursor.execute("""
+                SELECT kpi_name, value
+                FROM kpi_rollups
+                WHERE nf = 'AMF' AND slice = ''
+            """)
 
         rows = cursor.fetchall()
         amf = {row["kpi_name"]: row["value"] for row in rows}
 
         logger.debug("AMF KPI raw data: %s", amf)
 
-        return {
-            "registration_request": amf.get("registration_request", 0),
-            "registration_success": amf.get("registration_success", 0),
-            "registration_reject": amf.get("registration_reject", 0),
-            "authentication_request": amf.get("authentication_request", 0),
-            "authentication_success": amf.get("authentication_success", 0),
-            "authentication_failure": amf.get("authentication_failure", 0),
-            "authentication_retry": amf.get("authentication_retry", 0)
-        }
+        return build_amf_kpis(amf)
 
     except Exception:
         logger.exception("Failed to fetch AMF KPIs")
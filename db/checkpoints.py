@@ -0,0 +1,271 @@
+"""
+Ingestion checkpoint utilities for the
+5G Core Analytics & Insights Platform.
+
+A checkpoint records how far into a log file KPIs have already been
+ingested, so later runs only parse appended bytes. Checkpoints are
+keyed by path but also carry the log's inode and content fingerprint,
+so a checkpoint follows its log when logrotate renames, copies or
+compresses it, and a rotated log is never ingested twice.
+"""
+
+from datetime import datetime
+import logging
+import os
+
+from db.setup_db import get_db_connection
+from log_parser.log_reader import (
+    detect_compression,
+    find_last_line_end,
+    find_last_member_end,
+    log_fingerprint
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_checkpoint(file_path: str, db_path: str = "db/5g_kpis.db"):
+    """
+    Fetch the stored checkpoint for a log file.
+
+    Args:
+        file_path (str): Path to the log file.
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        dict | None: {"inode", "size", "offset", "fingerprint",
+        "compression"} or None if never ingested.
+    """
+    conn = get_db_connection(db_path)
+
+    try:
+        row = conn.execute(
+            """
+            SELECT inode, size, offset, fingerprint, compression
+            FROM ingestion_checkpoints
+            WHERE path = ?
+            """,
+            (os.path.abspath(file_path),)
+        ).fetchone()
+
+        return dict(row) if row else None
+
+    finally:
+        conn.close()
+
+
+def find_moved_checkpoint(fingerprint: str, stat, compression, db_path: str = "db/5g_kpis.db"):
+    """
+    Find the checkpoint a rotated log was ingested under before it moved.
+
+    Candidates share the log's fingerprint, those with its inode first
+    (a rename) and then the most recent. A plain checkpoint continues in
+    a plain log of at least its offset (rename or copytruncate copy) or
+    in a compressed one (offset in decompressed bytes); a compressed
+    checkpoint only in the same archive, i.e. the same inode or size.
+    Checkpoints saved before fingerprints existed are matched by inode,
+    as a rename.
+
+    Args:
+        fingerprint (str | None): Fingerprint of the log (see log_fingerprint).
+        stat (os.stat_result): The log's stat.
+        compression (str | None): The log's compression.
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        dict | None: {"path", "inode", "size", "offset", "fingerprint",
+        "compression"} of the checkpoint, or None.
+    """
+    conn = get_db_connection(db_path)
+
+    try:
+        rows = conn.execute(
+            """
+            SELECT path, inode, size, offset, fingerprint, compression
+            FROM ingestion_checkpoints
+            WHERE (fingerprint = ? OR fingerprint IS NULL AND inode = ?) AND offset > 0
+            ORDER BY inode = ? DESC, updated_at DESC
+            """,
+            (fingerprint, stat.st_ino, stat.st_ino)
+        ).fetchall()
+
+    finally:
+        conn.close()
+
+    for row in rows:
+        if row["fingerprint"] is None:
+            # Its compression is unknown, but a renamed file keeps its format
+            if row["offset"] <= stat.st_size:
+                return dict(row, compression=compression)
+        elif row["compression"] is None:
+            if compression is not None or row["offset"] <= stat.st_size:
+                return dict(row)
+        elif row["compression"] == compression and (stat.st_ino == row["inode"] or stat.st_size == row["size"]):
+            return dict(row)
+    return None
+
+
+def write_checkpoint(
+    conn,
+    file_path: str,
+    inode: int,
+    size: int,
+    offset: int,
+    fingerprint: str = None,
+    compression: str = None,
+    moved_from: str = None):
+    """
+    Insert or update the checkpoint for a log file on an open connection.
+
+    The caller owns the transaction (see db.insert_kpis.KpiWriter).
+
+    Args:
+        moved_from (str): Path of the checkpoint this log continues (see
+            find_moved_checkpoint); it is removed unless its path already
+            holds a different log.
+    """
+    logger.info("Saving checkpoint for %s at offset %d", file_path, offset)
+    path = os.path.abspath(file_path)
+
+    if moved_from and moved_from != path:
+        conn.execute(
+            """
+            DELETE FROM ingestion_checkpoints
+            WHERE path = ? AND (fingerprint = ? OR fingerprint IS NULL AND inode = ?)
+            """,
+            (moved_from, fingerprint, inode)
+        )
+
+    conn.execute(
+        """
+        INSERT INTO ingestion_checkpoints
+        (path, inode, size, offset, updated_at, fingerprint, compression)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET
+            inode = excluded.inode,
+            size = excluded.size,
+            offset = excluded.offset,
+            updated_at = excluded.updated_at,
+            fingerprint = excluded.fingerprint,
+            compression = excluded.compression
+        """,
+        (
+            path,
+            inode,
+            size,
+            offset,
+            datetime.utcnow().isoformat(),
+            fingerprint,
+            compression
+        )
+    )
+
+
+def save_checkpoint(
+    file_path: str,
+    inode: int,
+    size: int,
+    offset: int,
+    fingerprint: str = None,
+    compression: str = None,
+    db_path: str = "db/5g_kpis.db"):
+    """
+    Insert or update the checkpoint for a log file.
+    """
+    conn = get_db_connection(db_path)
+
+    try:
+        write_checkpoint(conn, file_path, inode, size, offset, fingerprint, compression)
+        conn.commit()
+
+    except Exception as exc:
+        conn.rollback()
+        logger.exception("Failed to save checkpoint for %s: %s", file_path, exc)
+        raise
+
+    finally:
+        conn.close()
+
+
+def get_pending_range(file_path: str, db_path: str = "db/5g_kpis.db"):
+    """
+    Work out which bytes of a log file have not been ingested yet.
+
+    A log whose checkpoint no longer matches it was rotated (inode or
+    fingerprint changed) or truncated (smaller than the stored offset).
+    It is read from byte 0 unless it continues a checkpoint stored under
+    another path (see find_moved_checkpoint): a renamed log resumes at its
+    old offset, and a log compressed after rotation skips the part that
+    was ingested from the plain file. The range ends after the last
+    complete line, so a partially written line is picked up by the next
+    run.
+
+    Compressed logs are rotated archives and are ingested whole; their
+    range ends at the file size. A gzip range ends after its last
+    complete member instead, so an archive logrotate is still writing
+    (or zero-padded after a crash) is ingested up to there, and members
+    completed or appended later are picked up from the stored offset.
+
+    Args:
+        file_path (str): Path to the log file.
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        dict: {"start", "end", "inode", "size", "fingerprint",
+        "compression", "skip", "moved_from"} for the pending byte range;
+        skip is the number of leading decompressed bytes already ingested
+        and moved_from the path of the checkpoint it continues, if any.
+    """
+    stat = os.stat(file_path)
+    compression = detect_compression(file_path)
+    fingerprint = log_fingerprint(file_path)
+    checkpoint = get_checkpoint(file_path, db_path)
+    start, skip, moved_from = 0, 0, None
+
+    if checkpoint is None or not checkpoint["offset"]:
+        logger.info("No checkpoint for %s", file_path)
+    elif checkpoint["inode"] != stat.st_ino:
+        logger.warning("%s was rotated (inode %d → %d)", file_path, checkpoint["inode"], stat.st_ino)
+    elif None not in (fingerprint, checkpoint["fingerprint"]) and fingerprint != checkpoint["fingerprint"]:
+        logger.warning("%s was replaced (its first line changed)", file_path)
+    elif stat.st_size < checkpoint["offset"]:
+        logger.warning("%s was truncated (%d < %d bytes)", file_path, stat.st_size, checkpoint["offset"])
+    else:
+        start = checkpoint["offset"]
+
+    if not start:
+        moved = find_moved_checkpoint(fingerprint, stat, compression, db_path)
+        if moved is None:
+            logger.info("Ingesting %s from start", file_path)
+        else:
+            moved_from = moved["path"]
+            if moved["compression"] == compression:
+                start = moved["offset"]
+            else:
+                skip = moved["offset"]
+            logger.info("%s continues the checkpoint of %s (offset %d)", file_path, moved_from, moved["offset"])
+
+    if compression == "gzip":
+        end = find_last_member_end(file_path, start, stat.st_size)
+        if end < stat.st_size:
+            logger.warning("%s has an incomplete or invalid gzip member at byte %d; "
+                           "leaving it for a later run", file_path, end)
+            if skip:
+                # Keep the plain checkpoint until the whole archive can be read
+                end, skip, moved_from = start, 0, None
+    elif compression:
+        end = stat.st_size
+    else:
+        end = find_last_line_end(file_path, start, stat.st_size)
+    logger.info("Pending range for %s: bytes %d-%d", file_path, start, end)
+
+    return {
+        "start": start,
+        "end": end,
+        "inode": stat.st_ino,
+        "size": stat.st_size,
+        "fingerprint": fingerprint,
+        "compression": compression,
+        "skip": skip,
+        "moved_from": moved_from
+    }
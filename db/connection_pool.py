@@ -0,0 +1,227 @@
+"""
+Read connection pool for the
+5G Core Analytics & Insights Platform API.
+
+API requests borrow read-only SQLite connections from a shared pool
+instead of opening a new connection each time. A borrowed connection
+behaves like a normal one; close() returns it to the pool.
+"""
+
+from contextlib import contextmanager
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from urllib.request import pathname2url
+
+from db.setup_db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Matches the default size of the thread pool that runs sync FastAPI handlers
+DEFAULT_POOL_SIZE = 40
+
+# Seconds a query waits on a locked database before failing
+BUSY_TIMEOUT = 5.0
+
+# Seconds a request waits for a free connection before failing
+ACQUIRE_TIMEOUT = 10.0
+
+# Idle connections are checked with a trivial query before reuse after this many seconds
+HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PooledConnection:
+    """
+    Borrowed pool connection; close() hands it back instead of closing it.
+
+    Each borrow gets its own handle, so closing a handle twice cannot
+    return the connection to the pool twice.
+    """
+
+    def __init__(self, pool, connection, last_used=None):
+        self._pool = pool
+        self._connection = connection
+        self._released = False
+        self.last_used = time.monotonic() if last_used is None else last_used
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self)
+
+
+class ReadConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections shared by threads.
+
+    Connections are opened lazily, so the pool can be created before the
+    ingestion pipeline has created the database file.
+    """
+
+    def __init__(self, db_path="db/5g_kpis.db", size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file.
+            size (int): Maximum number of open connections.
+        """
+        self.db_path = db_path
+        self.size = size
+
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self):
+        # Read-only and shareable: a connection may be borrowed by any handler thread
+        connection = sqlite3.connect(
+            f"file:{pathname2url(self.db_path)}?mode=ro",
+            uri=True,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only = ON")
+        return PooledConnection(self, connection)
+
+    def _is_healthy(self, pooled):
+        if time.monotonic() - pooled.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            pooled.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            logger.warning("Discarding unhealthy pooled connection to %s", self.db_path)
+            return False
+
+    def acquire(self):
+        """
+        Borrow a connection, opening one if the pool is not yet full.
+
+        Returns:
+            PooledConnection: Connection to hand back with close().
+        """
+        if self._closed:
+            raise RuntimeError("Read connection pool is closed")
+
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                pooled = None
+
+            if pooled is None:
+                with self._lock:
+                    can_open = self._opened < self.size
+                    if can_open:
+                        self._opened += 1
+
+                if can_open:
+                    try:
+                        return self._connect()
+                    except Exception:
+                        with self._lock:
+                            self._opened -= 1
+                        raise
+
+                try:
+                    pooled = self._idle.get(timeout=ACQUIRE_TIMEOUT)
+                except queue.Empty:
+                    raise TimeoutError(f"No free database connection after {ACQUIRE_TIMEOUT}s")
+
+            if self._is_healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+    def release(self, pooled):
+        """
+        Return a borrowed connection to the pool.
+        """
+        if self._closed:
+            self._discard(pooled)
+            return
+
+        # Never hand out a connection with a transaction left open
+        if pooled.in_transaction:
+            pooled.rollback()
+        self._idle.put(PooledConnection(self, pooled._connection, time.monotonic()))
+
+    def _discard(self, pooled):
+        try:
+            pooled._connection.close()
+        finally:
+            with self._lock:
+                self._opened -= 1
+
+    def health_check(self):
+        """
+        Run a trivial query on a pooled connection.
+
+        Returns:
+            bool: True if the database answered.
+        """
+        try:
+            pooled = self.acquire()
+        except (sqlite3.Error, TimeoutError):
+            logger.exception("Read connection pool health check failed")
+            return False
+
+        try:
+            pooled.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            logger.exception("Read connection pool health check failed")
+            self._discard(pooled)
+            return False
+
+        pooled.close()
+        return True
+
+    def close(self):
+        """
+        Close every idle connection; borrowed ones are closed on release.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        logger.info("Read connection pool for %s closed", self.db_path)
+
+
+# Pool shared by the API process; None outside the FastAPI lifespan
+_read_pool = None
+
+
+@contextmanager
+def read_pool(db_path="db/5g_kpis.db", size=DEFAULT_POOL_SIZE):
+    """
+    Open the shared read pool for the lifetime of the block.
+    """
+    global _read_pool
+    _read_pool = ReadConnectionPool(db_path, size)
+    logger.info("Read connection pool for %s opened (size=%d)", db_path, size)
+
+    try:
+        yield _read_pool
+    finally:
+        pool, _read_pool = _read_pool, None
+        pool.close()
+
+
+def get_read_connection():
+    """
+    Return a connection for API reads.
+
+    Borrowed from the shared pool when one is open, otherwise a new
+    connection (e.g. for scripts); close() works the same either way.
+    """
+    if _read_pool is None:
+        return get_db_connection()
+    return _read_pool.acquire()
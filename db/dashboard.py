@@ -0,0 +1,72 @@
+import logging
+from db.connection_pool import get_read_connection
+from db.amf_kpis import build_amf_kpis
+from db.smf_kpis import build_smf_kpis
+from db.db_summary import build_kpi_summary
+from db.nssai_kpis import build_nssai_kpis
+from db.distinct_ue import query_distinct_ue
+from log_parser.time_buckets import ALL_TIME_RESOLUTION
+
+logger = logging.getLogger(__name__)
+
+# Sections the dashboard endpoint can return
+DASHBOARD_SECTIONS = ("summary", "amf", "smf", "snssai")
+
+def fetch_dashboard(sections=DASHBOARD_SECTIONS):
+    """
+    Fetch several KPI views from one consistent database snapshot.
+
+    The KPI rollups are read once and shared by every section, and all
+    queries run in a single read transaction, so the sections always
+    agree with each other even while an ingestion commits.
+
+    Args:
+        sections (iterable[str]): Subset of DASHBOARD_SECTIONS to build.
+
+    Returns:
+        dict: section → data, in the shapes of the matching fetch_*
+        functions ("amf"/"smf" are KPI dicts without rates).
+    """
+    sections = set(sections)
+    logger.info("Fetching dashboard sections %s from database", sorted(sections))
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    try:
+        # WAL readers see one snapshot for the whole transaction
+        cursor.execute("BEGIN")
+
+        cursor.execute("SELECT nf, kpi_name, slice, value FROM kpi_rollups")
+        totals = {"AMF": {}, "SMF": {}}
+        slices = {}
+        for row in cursor.fetchall():
+            if row["slice"]:
+                if row["kpi_name"] == "snssai_ue_count":
+                    slices[row["slice"]] = slices.get(row["slice"], 0) + int(row["value"])
+            else:
+                totals.setdefault(row["nf"], {})[row["kpi_name"]] = row["value"]
+
+        result = {}
+        if "summary" in sections:
+            result["summary"] = build_kpi_summary(totals["AMF"], totals["SMF"])
+        if "amf" in sections:
+            result["amf"] = build_amf_kpis(totals["AMF"])
+        if "smf" in sections:
+            result["smf"] = build_smf_kpis(totals["SMF"])
+        if "snssai" in sections:
+            unique_ue = query_distinct_ue(cursor, "SMF", "snssai", ALL_TIME_RESOLUTION)
+            result["snssai"] = build_nssai_kpis(sorted(slices.items()), unique_ue)
+
+        cursor.execute("COMMIT")
+
+        logger.info("Fetched dashboard sections successfully")
+        return result
+
+    except Exception:
+        logger.exception("Failed to fetch dashboard")
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after dashboard fetch")
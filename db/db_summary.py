@@ -1,57 +1,61 @@
 import logging
-import sqlite3
-from db.setup_db import get_db_connection
+from db.connection_pool import get_read_connection
 
 logger = logging.getLogger(__name__)
 
+def build_kpi_summary(amf, smf):
+    """
+    Build the network summary from raw AMF and SMF KPI totals.
+    """
+    reg_req = amf.get("registration_request", 0)
+    reg_succ = amf.get("registration_success", 0)
+    reg_fail = amf.get("registration_reject", 0)
+
+    pdu_req = smf.get("pdu_session_create_request", 0)
+    pdu_succ = smf.get("pdu_session_est_complete", 0)
+    pdu_fail = smf.get("pdu_session_est_reject", 0)
+
+    # ---------- Rates ----------
+    reg_success_rate = round((reg_succ / reg_req) * 100, 2) if reg_req else 0
+    session_success_rate = round((pdu_succ / pdu_req) * 100, 2) if pdu_req else 0
+
+    return {
+        "registered_ues": reg_succ,
+        "pdu_sessions_established": pdu_succ,
+        "registration_failures": reg_fail,
+        "pdu_session_failures": pdu_fail,
+        "registration_success_rate": reg_success_rate,
+        "session_success_rate": session_success_rate
+    }
+
 def get_kpi_summary_from_db():
     logger.info("Fetching network KPI summary from database")
 
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
+    conn = get_read_connection()
     cur = conn.cursor()
 
     try:
         # ---------- AMF ----------
         cur.execute("""
-            SELECT kpi_name, SUM(kpi_value) as value
-            FROM amf_kpis
-            GROUP BY kpi_name
+            SELECT kpi_name, value
+            FROM kpi_rollups
+            WHERE nf = 'AMF' AND slice = ''
         """)
         amf_rows = cur.fetchall()
         amf = {row["kpi_name"]: row["value"] for row in amf_rows}
         logger.debug("AMF raw data: %s", amf)
 
-        reg_req = amf.get("registration_request", 0)
-        reg_succ = amf.get("registration_success", 0)
-        reg_fail = amf.get("registration_reject", 0)
-
         # ---------- SMF ----------
         cur.execute("""
-            SELECT kpi_name, SUM(kpi_value) as value
-            FROM smf_kpis
-            GROUP BY kpi_name
+            SELECT kpi_name, value
+            FROM kpi_rollups
+            WHERE nf = 'SMF' AND slice = ''
         """)
         smf_rows = cur.fetchall()
         smf = {row["kpi_name"]: row["value"] for row in smf_rows}
         logger.debug("SMF raw data: %s", smf)
 
-        pdu_req = smf.get("pdu_session_create_request", 0)
-        pdu_succ = smf.get("pdu_session_est_complete", 0)
-        pdu_fail = smf.get("pdu_session_est_reject", 0)
-
-        # ---------- Rates ----------
-        reg_success_rate = round((reg_succ / reg_req) * 100, 2) if reg_req else 0
-        session_success_rate = round((pdu_succ / pdu_req) * 100, 2) if pdu_req else 0
-
-        summary = {
-            "registered_ues": reg_succ,
-            "pdu_sessions_established": pdu_succ,
-            "registration_failures": reg_fail,
-            "pdu_session_failures": pdu_fail,
-            "registration_success_rate": reg_success_rate,
-            "session_success_rate": session_success_rate
-        }
+        summary = build_kpi_summary(amf, smf)
 
         logger.info("Fetched network KPI summary successfully")
         logger.debug("KPI summary: %s", summary)
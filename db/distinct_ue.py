@@ -0,0 +1,70 @@
+import logging
+from db.connection_pool import get_read_connection
+from log_parser.distinct_sketch import HyperLogLog
+from log_parser.time_buckets import ALL_TIME_RESOLUTION, BASE_RESOLUTION, window_start
+
+logger = logging.getLogger(__name__)
+
+def query_distinct_ue(cursor, nf, dimension, resolution, start=0):
+    """
+    Union the distinct-UE sketches of one dimension on an open cursor.
+
+    Returns:
+        dict: {key: {"estimate": int, "standard_error": float}}
+    """
+    cursor.execute("""
+        SELECT key, sketch
+        FROM distinct_ue_sketches
+        WHERE nf = ? AND dimension = ? AND resolution = ? AND bucket_start >= ?
+    """, (nf, dimension, resolution, start))
+
+    merged = {}
+    for row in cursor:
+        sketch = HyperLogLog.from_bytes(row["sketch"])
+        if row["key"] in merged:
+            merged[row["key"]].merge(sketch)
+        else:
+            merged[row["key"]] = sketch
+
+    return {key: sketch.summary() for key, sketch in sorted(merged.items())}
+
+def fetch_distinct_ue(nf, dimension, window_minutes=None):
+    """
+    Fetch approximate distinct-UE (SUPI) counts of one NF dimension.
+
+    Sketches of every matching bucket are unioned before estimating, so
+    a UE seen in several buckets is counted once.
+
+    Args:
+        nf (str): "AMF" or "SMF".
+        dimension (str): "ran_id" (AMF) or "snssai" (SMF).
+        window_minutes (int): If set, only union the 1m buckets in the
+            trailing event-time window; otherwise read the all-time
+            sketch of each key.
+
+    Returns:
+        dict: {key: {"estimate": int, "standard_error": float}}
+    """
+    logger.info("Fetching %s distinct UEs per %s (window=%s min)", nf, dimension, window_minutes)
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    try:
+        if window_minutes:
+            resolution, start = BASE_RESOLUTION, window_start(window_minutes)
+        else:
+            resolution, start = ALL_TIME_RESOLUTION, 0
+
+        result = query_distinct_ue(cursor, nf, dimension, resolution, start)
+
+        logger.info("Processed %s distinct UEs for %d keys", nf, len(result))
+        return result
+
+    except Exception:
+        logger.exception("Failed to fetch %s distinct UEs", nf)
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after distinct UE fetch")
@@ -0,0 +1,109 @@
+import logging
+from db.connection_pool import get_read_connection
+from log_parser.time_buckets import BUCKET_RESOLUTIONS, format_epoch, parse_time
+
+logger = logging.getLogger(__name__)
+
+# Rows handed to the encoder per fetch; bounds memory whatever the export size
+EXPORT_BATCH_ROWS = 5000
+
+# Dataset → (table, exported columns, ordering); *_series datasets are bucket tables
+EXPORT_DATASETS = {
+    "amf_kpis": ("amf_kpis", ("timestamp", "kpi_name", "kpi_value"), "id"),
+    "smf_kpis": ("smf_kpis", ("timestamp", "kpi_name", "kpi_value"), "id"),
+    "snssai_kpis": ("snssai_kpis", ("timestamp", "nf", "kpi_name", "slice", "value"), "id"),
+    "amf_series": ("amf_kpi_buckets", ("bucket_start", "kpi_name", "kpi_value"),
+                   "bucket_start, kpi_name"),
+    "smf_series": ("smf_kpi_buckets", ("bucket_start", "kpi_name", "kpi_value"),
+                   "bucket_start, kpi_name"),
+    "snssai_series": ("snssai_kpi_buckets", ("bucket_start", "nf", "kpi_name", "slice", "value"),
+                      "bucket_start, nf, kpi_name, slice")
+}
+
+def build_export_query(dataset, resolution="1m", start=None, end=None):
+    """
+    Build the query for an export.
+
+    Args:
+        dataset (str): Key of EXPORT_DATASETS.
+        resolution (str): Bucket resolution of a *_series dataset.
+        start (str): Series start, epoch seconds or ISO-8601.
+        end (str): Exclusive series end.
+
+    Returns:
+        tuple: (columns, sql, params)
+
+    Raises:
+        ValueError: If the dataset, resolution or a time is invalid.
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(f"Unknown export dataset '{dataset}', expected one of: {', '.join(EXPORT_DATASETS)}")
+    table, columns, order = EXPORT_DATASETS[dataset]
+
+    conditions, params = [], []
+    if dataset.endswith("_series"):
+        if resolution not in BUCKET_RESOLUTIONS:
+            raise ValueError(f"Invalid resolution '{resolution}', expected one of: {', '.join(BUCKET_RESOLUTIONS)}")
+        conditions.append("resolution = ?")
+        params.append(BUCKET_RESOLUTIONS[resolution])
+        if start:
+            conditions.append("bucket_start >= ?")
+            params.append(parse_time(start))
+        if end:
+            conditions.append("bucket_start < ?")
+            params.append(parse_time(end))
+    elif start or end:
+        raise ValueError("'from' and 'to' only apply to *_series exports")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY {order}"
+    return columns, sql, tuple(params)
+
+def iter_export_batches(columns, sql, params):
+    """
+    Stream the rows of an export query in batches.
+
+    The rows are stepped through an open cursor, EXPORT_BATCH_ROWS at a
+    time, and the whole export reads one database snapshot. The borrowed
+    connection is returned when the generator finishes or is closed.
+
+    Yields:
+        list[tuple]: Up to EXPORT_BATCH_ROWS rows in column order; series
+        bucket starts are ISO-8601 strings.
+    """
+    logger.info("Starting export: %s", sql)
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+    exported = 0
+
+    try:
+        cursor.execute("BEGIN")
+        cursor.execute(sql, params)
+
+        series = columns[0] == "bucket_start"
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_ROWS)
+            if not rows:
+                break
+            if series:
+                rows = [(format_epoch(row[0]), *row[1:]) for row in rows]
+            else:
+                rows = [tuple(row) for row in rows]
+            exported += len(rows)
+            yield rows
+
+        cursor.execute("COMMIT")
+        logger.info("Export finished (%d rows)", exported)
+
+    except GeneratorExit:
+        logger.warning("Export cancelled by the client after %d rows", exported)
+        raise
+
+    except Exception:
+        logger.exception("Export failed after %d rows", exported)
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after export")
@@ -0,0 +1,32 @@
+import logging
+import sqlite3
+from db.connection_pool import get_read_connection
+
+logger = logging.getLogger(__name__)
+
+def fetch_ingestion_generation():
+    """
+    Fetch the ingestion generation, bumped by every committed ingestion.
+
+    Returns:
+        int | None: Current generation, or None if the database does not
+        exist or has not been migrated yet, or no pooled connection is free
+        (callers should then skip caching).
+    """
+    conn = None
+
+    try:
+        # Inside the try: before the first ingestion the database cannot be opened
+        conn = get_read_connection()
+        row = conn.execute(
+            "SELECT generation FROM ingestion_generation WHERE id = 1"
+        ).fetchone()
+        return row["generation"] if row else None
+
+    except (sqlite3.OperationalError, TimeoutError):
+        logger.warning("Ingestion generation unavailable; response caching disabled")
+        return None
+
+    finally:
+        if conn is not None:
+            conn.close()
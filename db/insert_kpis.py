@@ -1,47 +1,333 @@
 """
 KPI insertion utilities for the
 5G Core Analytics & Insights Platform.
+
+KpiWriter stores everything produced by one ingestion run (KPI totals,
+event-time buckets, sketches, procedures and checkpoints) on a single
+connection in one transaction. The insert_* functions wrap a writer
+for callers that store one kind of row at a time.
 """
 
 from datetime import datetime
 import logging
-from typing import Dict
+from typing import Dict, List
 
-from db.setup_db import get_db_connection
+from db.setup_db import get_write_connection
+from db.checkpoints import write_checkpoint
+from db.procedures import write_procedure_fragments
+from log_parser.distinct_sketch import HyperLogLog
+from log_parser.latency_sketch import LatencySketch
+from log_parser.time_buckets import ALL_TIME_RESOLUTION, BUCKET_RESOLUTIONS, rollup_minute_counts
 
 logger = logging.getLogger(__name__)
 
 
-def insert_amf_kpis(amf_kpis: Dict[str, float], db_path: str = "db/5g_kpis.db"):
+class KpiWriter:
     """
-    Insert AMF KPIs into the database.
+    Bulk writer for one ingestion run.
+
+    Use it as a context manager: the transaction is committed when the
+    block exits normally and rolled back if an exception escapes, so a
+    run is stored completely or not at all.
+
+        with KpiWriter(db_path) as writer:
+            writer.insert_amf_kpis(amf_kpis)
+            writer.save_checkpoint(path, inode, size, offset)
     """
-    logger.info("Inserting AMF KPIs: %s", amf_kpis)
 
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    timestamp = datetime.utcnow().isoformat()
-
-    try:
-        for kpi_name, kpi_value in amf_kpis.items():
-            cursor.execute(
-                """
-                INSERT INTO amf_kpis (timestamp, kpi_name, kpi_value)
-                VALUES (?, ?, ?)
-                """,
-                (timestamp, kpi_name, kpi_value)
+    def __init__(self, db_path: str = "db/5g_kpis.db"):
+        """
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        self.conn = None
+        self.rows = 0
+        self.timestamp = None
+
+    def __enter__(self):
+        self.conn = get_write_connection(self.db_path)
+        self.conn.execute("BEGIN IMMEDIATE")
+        self.rows = 0
+        # One ingestion timestamp for every total written in this run
+        self.timestamp = datetime.utcnow().isoformat()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        try:
+            if exc_type is None:
+                # Tell API caches that the data changed, atomically with the change
+                self.conn.execute("UPDATE ingestion_generation SET generation = generation + 1")
+                self.conn.execute("COMMIT")
+                logger.info("Committed %d rows", self.rows)
+            else:
+                self.conn.execute("ROLLBACK")
+                logger.error("Rolled back ingestion transaction: %s", exc)
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def _executemany(self, sql: str, rows: List[tuple]):
+        self.conn.executemany(sql, rows)
+        self.rows += len(rows)
+
+    def _add_kpi_rollups(self, nf: str, rows: List[tuple]):
+        # Keep the kpi_rollups totals in step with the raw rows
+        self._executemany(
+            """
+            INSERT INTO kpi_rollups (nf, kpi_name, slice, value)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(nf, kpi_name, slice)
+            DO UPDATE SET value = value + excluded.value
+            """,
+            [(nf, *row) for row in rows]
+        )
+
+    def insert_amf_kpis(self, amf_kpis: Dict[str, float]):
+        """
+        Insert AMF KPI totals.
+        """
+        self._executemany(
+            "INSERT INTO amf_kpis (timestamp, kpi_name, kpi_value) VALUES (?, ?, ?)",
+            [(self.timestamp, kpi_name, kpi_value) for kpi_name, kpi_value in amf_kpis.items()]
+        )
+        self._add_kpi_rollups("AMF", [(kpi_name, "", value) for kpi_name, value in amf_kpis.items()])
+
+    def insert_smf_kpis(self, smf_kpis: Dict[str, float]):
+        """
+        Insert SMF KPI totals.
+        """
+        self._executemany(
+            "INSERT INTO smf_kpis (timestamp, kpi_name, kpi_value) VALUES (?, ?, ?)",
+            [(self.timestamp, kpi_name, kpi_value) for kpi_name, kpi_value in smf_kpis.items()]
+        )
+        self._add_kpi_rollups("SMF", [(kpi_name, "", value) for kpi_name, value in smf_kpis.items()])
+
+    def insert_nssai_kpis(self, nf: str, nssai_kpis: Dict[str, int]):
+        """
+        Insert slice-level (SNSSAI) totals.
+        """
+        self._executemany(
+            """
+            INSERT INTO snssai_kpis (timestamp, nf, kpi_name, value, slice)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (self.timestamp, nf, "snssai_ue_count", ue_count, slice_id)
+                for slice_id, ue_count in nssai_kpis.items()
+            ]
+        )
+        self._add_kpi_rollups(
+            nf, [("snssai_ue_count", slice_id, count) for slice_id, count in nssai_kpis.items()]
+        )
+
+    def insert_kpi_buckets(self, table: str, series: Dict[tuple, int]):
+        """
+        Add per-minute KPI counts into every bucket resolution of a table.
+
+        Args:
+            table (str): "amf_kpi_buckets" or "smf_kpi_buckets".
+            series (dict): {(minute, kpi_name): count} from the parsers.
+        """
+        self._executemany(
+            f"""
+            INSERT INTO {table} (resolution, bucket_start, kpi_name, kpi_value)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(resolution, bucket_start, kpi_name)
+            DO UPDATE SET kpi_value = kpi_value + excluded.kpi_value
+            """,
+            [
+                (resolution, bucket_start, kpi_name, count)
+                for (resolution, bucket_start, kpi_name), count
+                in rollup_minute_counts(series).items()
+            ]
+        )
+
+    def insert_nssai_kpi_buckets(self, nf: str, slice_series: Dict[tuple, int]):
+        """
+        Add per-minute slice counts into every bucket resolution.
+
+        Args:
+            nf (str): NF type the counts come from.
+            slice_series (dict): {(minute, snssai): count} from parse_smf_logs.
+        """
+        self._executemany(
+            """
+            INSERT INTO snssai_kpi_buckets
+            (resolution, bucket_start, nf, kpi_name, slice, value)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(resolution, bucket_start, nf, kpi_name, slice)
+            DO UPDATE SET value = value + excluded.value
+            """,
+            [
+                (resolution, bucket_start, nf, "snssai_ue_count", slice_id, count)
+                for (resolution, bucket_start, slice_id), count
+                in rollup_minute_counts(slice_series).items()
+            ]
+        )
+
+    def _upsert_sketches(self, table, nf, sketches, sketch_type, summary_column, summarize):
+        # Roll the minute sketches up in memory, into every resolution and all-time
+        rollup = {}
+        for (minute_start, dimension, key), sketch in sketches.items():
+            buckets = [
+                (resolution, minute_start - minute_start % resolution)
+                for resolution in BUCKET_RESOLUTIONS.values()
+            ]
+            buckets.append((ALL_TIME_RESOLUTION, 0))
+            for resolution, bucket_start in buckets:
+                bucket = (dimension, resolution, bucket_start, key)
+                merged = rollup.get(bucket)
+                if merged is None:
+                    merged = rollup[bucket] = sketch_type()
+                merged.merge(sketch)
+
+        # Read every stored bucket they touch in one join, and merge it in
+        self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS sketch_buckets (
+                dimension TEXT NOT NULL,
+                resolution INTEGER NOT NULL,
+                bucket_start INTEGER NOT NULL,
+                key TEXT NOT NULL
             )
+        """)
+        self.conn.execute("DELETE FROM sketch_buckets")
+        self.conn.executemany("INSERT INTO sketch_buckets VALUES (?, ?, ?, ?)", rollup)
+
+        stored = self.conn.execute(
+            f"""
+            SELECT s.dimension, s.resolution, s.bucket_start, s.key, s.sketch
+            FROM sketch_buckets b
+            JOIN {table} s
+              ON s.nf = ? AND s.dimension = b.dimension AND s.resolution = b.resolution
+             AND s.bucket_start = b.bucket_start AND s.key = b.key
+            """,
+            (nf,)
+        )
+        for dimension, resolution, bucket_start, key, blob in stored:
+            rollup[(dimension, resolution, bucket_start, key)].merge(sketch_type.from_bytes(blob))
 
-        conn.commit()
-        logger.info("AMF KPIs inserted successfully")
+        self._executemany(
+            f"""
+            INSERT OR REPLACE INTO {table}
+            (nf, dimension, resolution, bucket_start, key, {summary_column}, sketch)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (nf, dimension, resolution, bucket_start, key, summarize(sketch), sketch.to_bytes())
+                for (dimension, resolution, bucket_start, key), sketch in rollup.items()
+            ]
+        )
 
-    except Exception as exc:
-        conn.rollback()
-        logger.exception("Failed to insert AMF KPIs: %s", exc)
-        raise
+    def insert_latency_sketches(self, nf: str, sketches: Dict[tuple, LatencySketch]):
+        """
+        Merge per-minute latency sketches into every bucket resolution
+        and the all-time sketch of each key.
 
-    finally:
-        conn.close()
+        Args:
+            nf (str): NF type the latencies come from.
+            sketches (dict): {(minute_start, dimension, key): LatencySketch}
+                from the parsers.
+        """
+        self._upsert_sketches(
+            "latency_sketches", nf, sketches, LatencySketch,
+            "count", lambda sketch: sketch.count
+        )
+
+    def insert_distinct_ue_sketches(self, nf: str, sketches: Dict[tuple, HyperLogLog]):
+        """
+        Union per-minute distinct-SUPI sketches into every bucket resolution
+        and the all-time sketch of each key.
+
+        Args:
+            nf (str): NF type the SUPIs come from.
+            sketches (dict): {(minute_start, dimension, key): HyperLogLog}
+                from the parsers.
+        """
+        self._upsert_sketches(
+            "distinct_ue_sketches", nf, sketches, HyperLogLog,
+            "estimate", lambda sketch: round(sketch.estimate())
+        )
+
+    def insert_procedure_records(self, nf: str, records: List[tuple]):
+        """
+        Insert correlated procedure records.
+
+        Args:
+            nf (str): NF type the procedures belong to.
+            records (list): (procedure_id, outcome, start_time, duration_ms,
+                steps, retries) tuples from the procedure correlator.
+        """
+        self._executemany(
+            """
+            INSERT INTO procedure_records
+            (nf, procedure_id, outcome, start_time, duration_ms, steps, retries)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(nf, *record) for record in records]
+        )
+
+        # Totals per outcome: procedures, duration sum/max, steps, retries
+        totals = {}
+        for _, outcome, _, duration_ms, steps, retries in records:
+            total = totals.setdefault(outcome, [0, 0.0, 0.0, 0, 0])
+            total[0] += 1
+            total[1] += duration_ms
+            total[2] = max(total[2], duration_ms)
+            total[3] += steps
+            total[4] += retries
+
+        self._executemany(
+            """
+            INSERT INTO procedure_rollups
+            (nf, outcome, procedures, total_duration_ms, max_duration_ms, total_steps, retries)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(nf, outcome) DO UPDATE SET
+                procedures = procedures + excluded.procedures,
+                total_duration_ms = total_duration_ms + excluded.total_duration_ms,
+                max_duration_ms = MAX(max_duration_ms, excluded.max_duration_ms),
+                total_steps = total_steps + excluded.total_steps,
+                retries = retries + excluded.retries
+            """,
+            [(nf, outcome, *total) for outcome, total in totals.items()]
+        )
+
+    def save_procedure_fragments(self, nf: str, fragments):
+        """
+        Replace the stored in-flight procedures of an NF.
+        """
+        self.rows += write_procedure_fragments(self.conn, nf, fragments)
+
+    def save_checkpoint(
+        self,
+        file_path: str,
+        inode: int,
+        size: int,
+        offset: int,
+        fingerprint: str = None,
+        compression: str = None,
+        moved_from: str = None):
+        """
+        Advance the ingestion checkpoint of a log file.
+
+        Written in the same transaction as the KPIs, so a crash can never
+        leave the checkpoint ahead of (or behind) the stored data. See
+        db.checkpoints.write_checkpoint for the optional arguments.
+        """
+        write_checkpoint(self.conn, file_path, inode, size, offset, fingerprint, compression, moved_from)
+        self.rows += 1
+
+
+def insert_amf_kpis(amf_kpis: Dict[str, float], db_path: str = "db/5g_kpis.db"):
+    """
+    Insert AMF KPIs into the database.
+    """
+    logger.info("Inserting AMF KPIs: %s", amf_kpis)
+
+    with KpiWriter(db_path) as writer:
+        writer.insert_amf_kpis(amf_kpis)
+
+    logger.info("AMF KPIs inserted successfully")
 
 
 def insert_smf_kpis(smf_kpis: Dict[str, float], db_path: str = "db/5g_kpis.db"):
@@ -50,30 +336,10 @@ def insert_smf_kpis(smf_kpis: Dict[str, float], db_path: str = "db/5g_kpis.db"):
     """
     logger.info("Inserting SMF KPIs: %s", smf_kpis)
 
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    timestamp = datetime.utcnow().isoformat()
-
-    try:
-        for kpi_name, kpi_value in smf_kpis.items():
-            cursor.execute(
-                """
-                INSERT INTO smf_kpis (timestamp, kpi_name, kpi_value)
-                VALUES (?, ?, ?)
-                """,
-                (timestamp, kpi_name, kpi_value)
-            )
+    with KpiWriter(db_path) as writer:
+        writer.insert_smf_kpis(smf_kpis)
 
-        conn.commit()
-        logger.info("SMF KPIs inserted successfully")
-
-    except Exception as exc:
-        conn.rollback()
-        logger.exception("Failed to insert SMF KPIs: %s", exc)
-        raise
-
-    finally:
-        conn.close()
+    logger.info("SMF KPIs inserted successfully")
 
 
 def insert_nssai_kpis(
@@ -85,34 +351,81 @@ def insert_nssai_kpis(
     """
     logger.info("Inserting SNSSAI KPIs for NF: %s", nf)
 
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    timestamp = datetime.utcnow().isoformat()
-
-    try:
-        for slice_id, ue_count in nssai_kpis.items():
-            cursor.execute(
-                """
-                INSERT INTO snssai_kpis
-                (timestamp, nf, kpi_name, value, slice)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    timestamp,
-                    nf,
-                    "snssai_ue_count",
-                    ue_count,
-                    slice_id
-                )
-            )
+    with KpiWriter(db_path) as writer:
+        writer.insert_nssai_kpis(nf, nssai_kpis)
+
+    logger.info("SNSSAI KPIs inserted successfully")
+
+
+def insert_amf_kpi_buckets(series: Dict[tuple, int], db_path: str = "db/5g_kpis.db"):
+    """
+    Insert AMF KPI counts into the 1m/5m/1h event-time buckets.
+
+    Args:
+        series (dict): {(minute, kpi_name): count} from parse_amf_logs.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_kpi_buckets("amf_kpi_buckets", series)
+
+
+def insert_smf_kpi_buckets(series: Dict[tuple, int], db_path: str = "db/5g_kpis.db"):
+    """
+    Insert SMF KPI counts into the 1m/5m/1h event-time buckets.
+
+    Args:
+        series (dict): {(minute, kpi_name): count} from parse_smf_logs.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_kpi_buckets("smf_kpi_buckets", series)
+
+
+def insert_nssai_kpi_buckets(
+    nf: str,
+    slice_series: Dict[tuple, int],
+    db_path: str = "db/5g_kpis.db"):
+    """
+    Insert slice-level counts into the 1m/5m/1h event-time buckets.
 
-        conn.commit()
-        logger.info("SNSSAI KPIs inserted successfully")
+    Args:
+        nf (str): NF type the counts come from.
+        slice_series (dict): {(minute, snssai): count} from parse_smf_logs.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_nssai_kpi_buckets(nf, slice_series)
+
+
+def insert_latency_sketches(
+    nf: str,
+    sketches: Dict[tuple, LatencySketch],
+    db_path: str = "db/5g_kpis.db"):
+    """
+    Merge per-minute latency sketches into every bucket resolution.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_latency_sketches(nf, sketches)
+
+
+def insert_distinct_ue_sketches(
+    nf: str,
+    sketches: Dict[tuple, HyperLogLog],
+    db_path: str = "db/5g_kpis.db"):
+    """
+    Union per-minute distinct-SUPI sketches into every bucket resolution.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_distinct_ue_sketches(nf, sketches)
+
+
+def insert_procedure_records(
+    nf: str,
+    records: List[tuple],
+    db_path: str = "db/5g_kpis.db"):
+    """
+    Insert correlated procedure records into the database.
+    """
+    logger.info("Inserting %d %s procedure records", len(records), nf)
 
-    except Exception as exc:
-        conn.rollback()
-        logger.exception("Failed to insert SNSSAI KPIs: %s", exc)
-        raise
+    with KpiWriter(db_path) as writer:
+        writer.insert_procedure_records(nf, records)
 
-    finally:
-        conn.close()
+    logger.info("Procedure records inserted successfully")
@@ -0,0 +1,189 @@
+import logging
+import time
+from db.connection_pool import get_read_connection
+from db.amf_kpis import build_amf_kpis
+from db.smf_kpis import build_smf_kpis
+from log_parser.time_buckets import (
+    BUCKET_RESOLUTIONS, format_epoch, parse_step, parse_time, series_resolution
+)
+
+logger = logging.getLogger(__name__)
+
+# Range used when only part of from/to is given
+DEFAULT_RANGE_SECONDS = 86400
+
+# Steps returned per page; a week at 1m is 10080 steps
+DEFAULT_PAGE_STEPS = 1000
+MAX_PAGE_STEPS = 10000
+
+# Bucket width in seconds → label
+RESOLUTION_LABELS = {width: label for label, width in BUCKET_RESOLUTIONS.items()}
+
+# Series name → (bucket table, value column, key column, fixed filter)
+SERIES_SOURCES = {
+    "AMF": ("amf_kpi_buckets", "kpi_value", "kpi_name", ""),
+    "SMF": ("smf_kpi_buckets", "kpi_value", "kpi_name", ""),
+    "SNSSAI": ("snssai_kpi_buckets", "value", "slice",
+               "AND nf = 'SMF' AND kpi_name = 'snssai_ue_count'")
+}
+
+def resolve_range(start=None, end=None, step="1m", after=None, now=None):
+    """
+    Validate and normalise series query parameters.
+
+    Args:
+        start (str): Range start, epoch seconds or ISO-8601; defaults to
+            DEFAULT_RANGE_SECONDS before the end. Rounded down to the step.
+        end (str): Exclusive range end; defaults to now.
+        step (str): Step width such as "1m", "15m", "1h" or "1d".
+        after (int): "next" value of the previous page.
+
+    Returns:
+        dict: start, end, step (seconds), resolution (bucket width read)
+        and page_start (epoch seconds).
+
+    Raises:
+        ValueError: If a parameter is malformed or the range is empty.
+    """
+    step_seconds = parse_step(step)
+    now = time.time() if now is None else now
+
+    end = parse_time(end) if end else int(now)
+    start = parse_time(start) if start else end - DEFAULT_RANGE_SECONDS
+    start -= start % step_seconds
+    if start >= end:
+        raise ValueError("'from' must be before 'to'")
+
+    page_start = start
+    if after is not None:
+        if after % step_seconds or not start <= after < end:
+            raise ValueError(f"Invalid cursor {after} for this range and step")
+        page_start = after
+
+    return {
+        "start": start,
+        "end": end,
+        "step": step_seconds,
+        "resolution": series_resolution(step_seconds),
+        "page_start": page_start
+    }
+
+def _first_bucket(cursor, table, filters, params, resolution, start, end, step):
+    # Jump over empty stretches with one primary key seek; None when nothing is left
+    cursor.execute(f"""
+        SELECT MIN(bucket_start) AS first_bucket
+        FROM {table}
+        WHERE resolution = ? AND bucket_start >= ? AND bucket_start < ? {filters}
+    """, (resolution, start, end, *params))
+    first = cursor.fetchone()["first_bucket"]
+    return None if first is None else first - first % step
+
+def query_kpi_series(cursor, source, time_range, limit=DEFAULT_PAGE_STEPS, slice_id=None):
+    """
+    Read one page of a KPI series, re-aggregated to the requested step.
+
+    The page is a primary key range scan of a bucket table; SQLite sums
+    the stored buckets into steps, so only the returned points reach
+    Python. Pages are keyed on time: each page covers at most `limit`
+    steps, starting at the first stored bucket at or after page_start.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor on an open connection.
+        source (str): Key of SERIES_SOURCES.
+        time_range (dict): Result of resolve_range.
+        limit (int): Maximum steps per page.
+        slice_id (str): Only count this S-NSSAI (SNSSAI series only).
+
+    Returns:
+        tuple: ([(step_start, {key: value})], next page cursor or None)
+    """
+    table, value_column, key_column, filters = SERIES_SOURCES[source]
+    params = ()
+    if slice_id is not None:
+        filters += " AND slice = ?"
+        params = (slice_id,)
+
+    resolution, step, end = time_range["resolution"], time_range["step"], time_range["end"]
+
+    page_start = _first_bucket(
+        cursor, table, filters, params, resolution, time_range["page_start"], end, step
+    )
+    if page_start is None:
+        return [], None
+    page_end = min(end, page_start + limit * step)
+
+    cursor.execute(f"""
+        SELECT bucket_start - bucket_start % ? AS step_start,
+               {key_column} AS key,
+               SUM({value_column}) AS value
+        FROM {table}
+        WHERE resolution = ? AND bucket_start >= ? AND bucket_start < ? {filters}
+        GROUP BY step_start, key
+        ORDER BY step_start
+    """, (step, resolution, page_start, page_end, *params))
+
+    points = []
+    for row in cursor:
+        if not points or points[-1][0] != row["step_start"]:
+            points.append((row["step_start"], {}))
+        points[-1][1][row["key"]] = row["value"]
+
+    next_page = None
+    if page_end < end:
+        next_page = _first_bucket(cursor, table, filters, params, resolution, page_end, end, step)
+
+    return points, next_page
+
+def fetch_kpi_series(source, start=None, end=None, step="1m", after=None,
+                     limit=DEFAULT_PAGE_STEPS, slice_id=None):
+    """
+    Fetch one page of a step-aggregated KPI series for the API.
+
+    Args:
+        source (str): "AMF", "SMF" or "SNSSAI".
+        start, end, step, after: See resolve_range.
+        limit (int): Maximum steps per page.
+        slice_id (str): Only count this S-NSSAI (SNSSAI series only).
+
+    Returns:
+        dict: The normalised range, "points" ({"start", "kpis"} for AMF and
+        SMF, {"start", "sessions"} per slice for SNSSAI) and "next", the
+        cursor of the following page or None on the last page.
+
+    Raises:
+        ValueError: If a parameter is malformed.
+    """
+    time_range = resolve_range(start, end, step, after)
+    logger.info("Fetching %s KPI series from database (%s)", source, time_range)
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    try:
+        points, next_page = query_kpi_series(cursor, source, time_range, limit, slice_id)
+
+        if source == "SNSSAI":
+            points = [{"start": format_epoch(t), "sessions": {k: int(v) for k, v in values.items()}}
+                      for t, values in points]
+        else:
+            build = build_amf_kpis if source == "AMF" else build_smf_kpis
+            points = [{"start": format_epoch(t), "kpis": build(values)} for t, values in points]
+
+        logger.info("Fetched %d %s series points", len(points), source)
+
+        return {
+            "from": format_epoch(time_range["start"]),
+            "to": format_epoch(time_range["end"]),
+            "step": step,
+            "resolution": RESOLUTION_LABELS[time_range["resolution"]],
+            "points": points,
+            "next": next_page
+        }
+
+    except Exception:
+        logger.exception("Failed to fetch %s KPI series", source)
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after %s KPI series fetch", source)
@@ -0,0 +1,79 @@
+import logging
+from db.connection_pool import get_read_connection
+from log_parser.latency_sketch import LATENCY_DIMENSIONS, LatencySketch
+from log_parser.time_buckets import ALL_TIME_RESOLUTION, BASE_RESOLUTION, window_start
+
+logger = logging.getLogger(__name__)
+
+def fetch_latency_sketches(nf, window_minutes=None):
+    """
+    Fetch the merged latency sketch of one NF per dimension and key.
+
+    Sketches of every matching bucket are merged, so each sketch covers
+    the whole range rather than a single bucket.
+
+    Args:
+        nf (str): "AMF" or "SMF".
+        window_minutes (int): If set, only merge the 1m buckets in the
+            trailing event-time window; otherwise read the all-time
+            sketch of each key.
+
+    Returns:
+        dict: {(dimension, key): LatencySketch}
+    """
+    logger.info("Fetching %s latency sketches from database (window=%s min)", nf, window_minutes)
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    try:
+        if window_minutes:
+            resolution, start = BASE_RESOLUTION, window_start(window_minutes)
+        else:
+            resolution, start = ALL_TIME_RESOLUTION, 0
+
+        # One primary key range scan per dimension
+        dimensions = list(LATENCY_DIMENSIONS[nf])
+        placeholders = ", ".join("?" * len(dimensions))
+        cursor.execute(f"""
+            SELECT dimension, key, sketch
+            FROM latency_sketches
+            WHERE nf = ? AND dimension IN ({placeholders})
+              AND resolution = ? AND bucket_start >= ?
+        """, (nf, *dimensions, resolution, start))
+
+        merged = {}
+        for row in cursor:
+            sketch = LatencySketch.from_bytes(row["sketch"])
+            key = (row["dimension"], row["key"])
+            if key in merged:
+                merged[key].merge(sketch)
+            else:
+                merged[key] = sketch
+
+        logger.info("Merged %s latency sketches for %d keys", nf, len(merged))
+        return merged
+
+    except Exception:
+        logger.exception("Failed to fetch %s latency sketches", nf)
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after latency fetch")
+
+def fetch_latency_percentiles(nf, window_minutes=None):
+    """
+    Fetch latency percentiles of one NF per dimension and key.
+
+    Args:
+        nf (str): "AMF" or "SMF".
+        window_minutes (int): See fetch_latency_sketches.
+
+    Returns:
+        dict: {dimension: {key: {"count", "p50", "p90", "p99", "p99.9", "max"}}}
+    """
+    result = {}
+    for (dimension, key), sketch in sorted(fetch_latency_sketches(nf, window_minutes).items()):
+        result.setdefault(dimension, {})[key] = sketch.summary()
+    return result
@@ -1,18 +1,58 @@
 import logging
-from db.setup_db import get_db_connection
+from db.connection_pool import get_read_connection
+from db.distinct_ue import fetch_distinct_ue
 
 logger = logging.getLogger(__name__)
 
+# SST → Slice type mapping (3GPP)
+SLICE_MAP = {
+    1: "eMBB",
+    2: "URLLC",
+    3: "mMTC"
+}
+
+def build_nssai_kpis(rows, unique_ue):
+    """
+    Shape per-slice session totals for the API.
+
+    Args:
+        rows (iterable): (slice, sessions) pairs.
+        unique_ue (dict): snssai → {"estimate", "standard_error"}.
+    """
+    result = {}
+
+    for slice_value, count in rows:
+        sst = int(slice_value.split("-")[0])
+        slice_name = SLICE_MAP.get(sst, f"Unknown(SST={sst})")
+
+        distinct = unique_ue.get(slice_value, {})
+        result[slice_name] = {
+            "sessions": count,
+            "nssai": slice_value,
+            "unique_ue": distinct.get("estimate", 0),
+            "unique_ue_error": distinct.get("standard_error")
+        }
+
+    return result
+
 def fetch_nssai_kpis():
+    """
+    Fetch per-slice session counts and approximate unique UEs.
+
+    "unique_ue" is a HyperLogLog estimate of distinct SUPIs on the slice;
+    "unique_ue_error" is its relative standard error.
+    """
     logger.info("Fetching NSSAI KPIs from database")
 
-    conn = get_db_connection()
+    unique_ue = fetch_distinct_ue("SMF", "snssai")
+
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     try:
         cursor.execute("""
-            SELECT slice, SUM(value) AS total_sessions
-            FROM snssai_kpis
+            SELECT slice, CAST(SUM(value) AS INTEGER) AS total_sessions
+            FROM kpi_rollups
             WHERE kpi_name = 'snssai_ue_count'
             GROUP BY slice
         """)
@@ -20,23 +60,7 @@ def fetch_nssai_kpis():
         rows = cursor.fetchall()
         logger.debug("Raw NSSAI rows fetched: %s", rows)
 
-        # SST → Slice type mapping (3GPP)
-        slice_map = {
-            1: "eMBB",
-            2: "URLLC",
-            3: "mMTC"
-        }
-
-        result = {}
-
-        for slice_value, count in rows:
-            sst = int(slice_value.split("-")[0])
-            slice_name = slice_map.get(sst, f"Unknown(SST={sst})")
-
-            result[slice_name] = {
-                "sessions": count,
-                "nssai": slice_value
-            }
+        result = build_nssai_kpis(rows, unique_ue)
 
         logger.info("Processed NSSAI KPIs for %d slices", len(result))
         logger.debug("Final NSSAI KPI result: %s", result)
@@ -0,0 +1,125 @@
+import json
+import logging
+from collections import OrderedDict
+
+from db.setup_db import get_db_connection
+from db.connection_pool import get_read_connection
+from log_parser.procedure_correlator import LAST_TS
+
+logger = logging.getLogger(__name__)
+
+# NF type → procedure the correlator tracks for it
+PROCEDURE_NAMES = {
+    "AMF": "registration",
+    "SMF": "pdu_session_establishment"
+}
+
+
+def load_procedure_fragments(nf: str, db_path: str = "db/5g_kpis.db"):
+    """
+    Load the procedures left in flight by the previous ingestion.
+
+    Returns:
+        tuple: (OrderedDict procedure_id → fragment, watermark)
+    """
+    conn = get_db_connection(db_path)
+
+    try:
+        rows = conn.execute(
+            "SELECT procedure_id, state FROM procedure_fragments WHERE nf = ?",
+            (nf,)
+        ).fetchall()
+
+        fragments = OrderedDict(
+            (row["procedure_id"], json.loads(row["state"])) for row in rows
+        )
+
+        # Restore least-recently-active-first order for timeout eviction
+        fragments = OrderedDict(sorted(fragments.items(), key=lambda item: item[1][LAST_TS]))
+        watermark = max((fragment[LAST_TS] for fragment in fragments.values()), default=0.0)
+
+        logger.info("Loaded %d in-flight %s procedures", len(fragments), nf)
+        return fragments, watermark
+
+    finally:
+        conn.close()
+
+
+def write_procedure_fragments(conn, nf: str, fragments):
+    """
+    Replace the stored in-flight procedures of an NF on an open connection.
+
+    The caller owns the transaction (see db.insert_kpis.KpiWriter).
+
+    Returns:
+        int: Number of fragments written.
+    """
+    conn.execute("DELETE FROM procedure_fragments WHERE nf = ?", (nf,))
+    conn.executemany(
+        "INSERT INTO procedure_fragments (nf, procedure_id, state) VALUES (?, ?, ?)",
+        [(nf, procedure_id, json.dumps(fragment)) for procedure_id, fragment in fragments.items()]
+    )
+    logger.info("Saved %d in-flight %s procedures", len(fragments), nf)
+    return len(fragments)
+
+
+def save_procedure_fragments(nf: str, fragments, db_path: str = "db/5g_kpis.db"):
+    """
+    Replace the stored in-flight procedures of an NF.
+    """
+    conn = get_db_connection(db_path)
+
+    try:
+        write_procedure_fragments(conn, nf, fragments)
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        logger.exception("Failed to save in-flight %s procedures", nf)
+        raise
+
+    finally:
+        conn.close()
+
+
+def fetch_procedure_latency():
+    logger.info("Fetching procedure latency from database")
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("""
+            SELECT nf, outcome, procedures,
+                   total_duration_ms / procedures AS avg_duration_ms,
+                   max_duration_ms,
+                   CAST(total_steps AS REAL) / procedures AS avg_steps,
+                   retries
+            FROM procedure_rollups
+        """)
+
+        rows = cursor.fetchall()
+        logger.debug("Raw procedure rows fetched: %s", rows)
+
+        result = {}
+
+        for row in rows:
+            procedure = PROCEDURE_NAMES.get(row["nf"], row["nf"])
+            result.setdefault(procedure, {})[row["outcome"]] = {
+                "procedures": row["procedures"],
+                "avg_duration_ms": round(row["avg_duration_ms"], 2),
+                "max_duration_ms": round(row["max_duration_ms"], 2),
+                "avg_steps": round(row["avg_steps"], 2),
+                "retries": row["retries"]
+            }
+
+        logger.info("Processed procedure latency for %d procedures", len(result))
+        return result
+
+    except Exception:
+        logger.exception("Failed to fetch procedure latency")
+        raise
+
+    finally:
+        conn.close()
+        logger.debug("Database connection closed after procedure latency fetch")
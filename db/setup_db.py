@@ -6,8 +6,21 @@ Database setup and connection utilities for the
 import sqlite3
 import logging
 
+from log_parser.distinct_sketch import HyperLogLog
+from log_parser.latency_sketch import LatencySketch
+from log_parser.time_buckets import ALL_TIME_RESOLUTION, BUCKET_RESOLUTIONS
+
 logger = logging.getLogger(__name__)
 
+# Pragmas for ingestion connections: WAL lets API reads run during a write,
+# and with WAL synchronous=NORMAL only fsyncs at checkpoints, not every commit
+WRITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,   # 64 MiB
+    "temp_store": "MEMORY"
+}
+
 
 def setup_database(db_path = "db/5g_kpis.db"):
     """
@@ -21,6 +34,9 @@ def setup_database(db_path = "db/5g_kpis.db"):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
+    # WAL is persistent, so every later connection uses it too
+    cursor.execute("PRAGMA journal_mode = WAL")
+
     # AMF KPIs
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS amf_kpis (
@@ -46,19 +62,290 @@ def setup_database(db_path = "db/5g_kpis.db"):
         CREATE TABLE IF NOT EXISTS snssai_kpis (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
-            nf_type TEXT NOT NULL,
+            nf TEXT NOT NULL,
             kpi_name TEXT NOT NULL,
-            kpi_value REAL NOT NULL,
+            value INTEGER NOT NULL,
             slice TEXT NOT NULL
         )
     """)
 
+    # Event-time KPI buckets (resolution = bucket width in seconds,
+    # bucket_start = epoch seconds); the primary key serves range scans
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS amf_kpi_buckets (
+            resolution INTEGER NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            kpi_name TEXT NOT NULL,
+            kpi_value REAL NOT NULL,
+            PRIMARY KEY (resolution, bucket_start, kpi_name)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS smf_kpi_buckets (
+            resolution INTEGER NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            kpi_name TEXT NOT NULL,
+            kpi_value REAL NOT NULL,
+            PRIMARY KEY (resolution, bucket_start, kpi_name)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS snssai_kpi_buckets (
+            resolution INTEGER NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            nf TEXT NOT NULL,
+            kpi_name TEXT NOT NULL,
+            slice TEXT NOT NULL,
+            value INTEGER NOT NULL,
+            PRIMARY KEY (resolution, bucket_start, nf, kpi_name, slice)
+        ) WITHOUT ROWID
+    """)
+
+    # Latency sketches per event-time bucket (dimension = event/step/snssai,
+    # sketch = LatencySketch blob); merged on every upsert
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS latency_sketches (
+            nf TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            resolution INTEGER NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            sketch BLOB NOT NULL,
+            PRIMARY KEY (nf, dimension, resolution, bucket_start, key)
+        ) WITHOUT ROWID
+    """)
+
+    # Distinct-SUPI HyperLogLog sketches per event-time bucket
+    # (dimension = snssai/ran_id); unioned on every upsert
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS distinct_ue_sketches (
+            nf TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            resolution INTEGER NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            estimate INTEGER NOT NULL,
+            sketch BLOB NOT NULL,
+            PRIMARY KEY (nf, dimension, resolution, bucket_start, key)
+        ) WITHOUT ROWID
+    """)
+
+    # Correlated procedures (registration / PDU session establishment)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS procedure_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nf TEXT NOT NULL,
+            procedure_id TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            start_time REAL NOT NULL,
+            duration_ms REAL NOT NULL,
+            steps INTEGER NOT NULL,
+            retries INTEGER NOT NULL
+        )
+    """)
+
+    # Procedures still in flight at the end of the last ingestion
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS procedure_fragments (
+            nf TEXT NOT NULL,
+            procedure_id TEXT NOT NULL,
+            state TEXT NOT NULL,
+            PRIMARY KEY (nf, procedure_id)
+        ) WITHOUT ROWID
+    """)
+
+    # Ingestion checkpoints (per log file read position)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+            path TEXT PRIMARY KEY,
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
     conn.commit()
-    conn.close()
+
+    try:
+        migrate_database(conn)
+    finally:
+        conn.close()
 
     logger.info("Database tables created successfully")
 
 
+def _add_rollup_tables(cursor):
+    """
+    Migration 2: totals maintained at insert time, plus covering indexes.
+
+    The API reads these instead of summing the raw per-run rows, so its
+    latency no longer grows with the history.
+    """
+    # KPI totals per NF, KPI and slice ('' for NF-level KPIs)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS kpi_rollups (
+            nf TEXT NOT NULL,
+            kpi_name TEXT NOT NULL,
+            slice TEXT NOT NULL DEFAULT '',
+            value REAL NOT NULL,
+            PRIMARY KEY (nf, kpi_name, slice)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        INSERT INTO kpi_rollups (nf, kpi_name, slice, value)
+        SELECT 'AMF', kpi_name, '', SUM(kpi_value) FROM amf_kpis GROUP BY kpi_name
+        UNION ALL
+        SELECT 'SMF', kpi_name, '', SUM(kpi_value) FROM smf_kpis GROUP BY kpi_name
+        UNION ALL
+        SELECT nf, kpi_name, slice, SUM(value) FROM snssai_kpis GROUP BY nf, kpi_name, slice
+    """)
+
+    # Procedure totals per NF and outcome
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS procedure_rollups (
+            nf TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            procedures INTEGER NOT NULL,
+            total_duration_ms REAL NOT NULL,
+            max_duration_ms REAL NOT NULL,
+            total_steps INTEGER NOT NULL,
+            retries INTEGER NOT NULL,
+            PRIMARY KEY (nf, outcome)
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        INSERT INTO procedure_rollups
+        (nf, outcome, procedures, total_duration_ms, max_duration_ms, total_steps, retries)
+        SELECT nf, outcome, COUNT(*), SUM(duration_ms), MAX(duration_ms), SUM(steps), SUM(retries)
+        FROM procedure_records
+        GROUP BY nf, outcome
+    """)
+
+    # Time-ranged procedure queries are answered from the index alone
+    cursor.execute("DROP INDEX IF EXISTS idx_procedure_records_nf_start")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_procedure_records_covering
+        ON procedure_records (nf, start_time, outcome, duration_ms, steps, retries)
+    """)
+
+
+def _add_ingestion_generation(cursor):
+    """
+    Migration 3: a counter bumped by every committed ingestion.
+
+    API response caches compare it to decide whether data has changed.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingestion_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+
+    cursor.execute("INSERT OR IGNORE INTO ingestion_generation (id, generation) VALUES (1, 0)")
+
+
+def _add_checkpoint_fingerprints(cursor):
+    """
+    Migration 4: identify checkpointed logs by content as well as path.
+
+    The fingerprint (see log_parser.log_reader.log_fingerprint) lets a
+    checkpoint follow its log when logrotate renames or compresses it.
+    compression is NULL for plain logs, whose offsets are decompressed
+    bytes. Existing checkpoints are fingerprinted on their next save.
+    """
+    cursor.execute("ALTER TABLE ingestion_checkpoints ADD COLUMN fingerprint TEXT")
+    cursor.execute("ALTER TABLE ingestion_checkpoints ADD COLUMN compression TEXT")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ingestion_checkpoints_fingerprint
+        ON ingestion_checkpoints (fingerprint)
+    """)
+
+
+def _add_all_time_sketches(cursor):
+    """
+    Migration 5: an all-time sketch row per dimension and key.
+
+    KpiWriter keeps them merged at resolution ALL_TIME_RESOLUTION with
+    bucket_start 0; existing ones are built from the 1h buckets.
+    """
+    sketch_tables = {
+        "latency_sketches": (LatencySketch, "count", lambda sketch: sketch.count),
+        "distinct_ue_sketches": (HyperLogLog, "estimate", lambda sketch: round(sketch.estimate()))
+    }
+
+    for table, (sketch_type, summary_column, summarize) in sketch_tables.items():
+        cursor.execute(f"""
+            SELECT nf, dimension, key, sketch FROM {table}
+            WHERE resolution = ?
+        """, (BUCKET_RESOLUTIONS["1h"],))
+
+        merged = {}
+        for nf, dimension, key, blob in cursor.fetchall():
+            sketch = merged.get((nf, dimension, key))
+            if sketch is None:
+                sketch = merged[(nf, dimension, key)] = sketch_type()
+            sketch.merge(sketch_type.from_bytes(blob))
+
+        cursor.executemany(
+            f"""
+            INSERT OR REPLACE INTO {table}
+            (nf, dimension, resolution, bucket_start, key, {summary_column}, sketch)
+            VALUES (?, ?, ?, 0, ?, ?, ?)
+            """,
+            [
+                (nf, dimension, ALL_TIME_RESOLUTION, key, summarize(sketch), sketch.to_bytes())
+                for (nf, dimension, key), sketch in merged.items()
+            ]
+        )
+
+
+# Schema version → migration; applied in order to databases below that version
+MIGRATIONS = {
+    2: _add_rollup_tables,
+    3: _add_ingestion_generation,
+    4: _add_checkpoint_fingerprints,
+    5: _add_all_time_sketches
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def migrate_database(conn):
+    """
+    Apply pending schema migrations, each in its own transaction.
+
+    The schema version is kept in PRAGMA user_version. The tables created
+    by setup_database are version 1.
+
+    Args:
+        conn (sqlite3.Connection): Open connection to the database.
+    """
+    # Transactions are issued explicitly below
+    conn.isolation_level = None
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for target in range(max(version, 1) + 1, SCHEMA_VERSION + 1):
+        logger.info("Migrating database schema to version %d", target)
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            MIGRATIONS[target](cursor)
+            cursor.execute(f"PRAGMA user_version = {target}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            logger.exception("Schema migration to version %d failed", target)
+            raise
+
+
 def get_db_connection(db_path: str = "db/5g_kpis.db"):
     """
     Create and return a SQLite database connection.
@@ -72,3 +359,23 @@ def get_db_connection(db_path: str = "db/5g_kpis.db"):
     connection = sqlite3.connect(db_path)
     connection.row_factory = sqlite3.Row
     return connection
+
+
+def get_write_connection(db_path: str = "db/5g_kpis.db"):
+    """
+    Create a SQLite connection tuned for bulk ingestion.
+
+    Transactions are not opened implicitly; callers issue BEGIN/COMMIT
+    themselves (see db.insert_kpis.KpiWriter).
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: SQLite connection with WRITE_PRAGMAS applied.
+    """
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    for pragma, value in WRITE_PRAGMAS.items():
+        connection.execute(f"PRAGMA {pragma} = {value}")
+    return connection
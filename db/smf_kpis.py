@@ -1,39 +1,54 @@
 import logging
-import sqlite3
-from db.setup_db import get_db_connection
+from db.connection_pool import get_read_connection
+from log_parser.kpi_spec import KPI_SPECS
+from log_parser.time_buckets import BASE_RESOLUTION, window_start
 
 logger = logging.getLogger(__name__)
 
-def fetch_smf_kpis():
-    logger.info("Fetching SMF KPIs from database")
-
-    conn = get_db_connection()
-    conn.row_factory = sqlite3.Row
+def build_smf_kpis(smf):
+    """
+    Shape raw SMF KPI totals ({kpi_name: value}) for the API, using the
+    API names from kpi_spec.json.
+    """
+    return KPI_SPECS["SMF"].build_api_kpis(smf)
+
+def fetch_smf_kpis(window_minutes=None):
+    """
+    Fetch SMF KPI totals.
+
+    Args:
+        window_minutes (int): If set, only count events whose own timestamp
+            falls in the trailing window, read from the 1m bucket table;
+            otherwise read the all-time totals from kpi_rollups.
+    """
+    logger.info("Fetching SMF KPIs from database (window=%s min)", window_minutes)
+
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
-            SELECT kpi_name, SUM(kpi_value) AS value
-            FROM smf_kpis
-            GROUP BY kpi_name
-        """)
+        if window_minutes:
+            # Index range scan over the event-time buckets
+            cursor.execute("""
+                SELECT kpi_name, SUM(kpi_value) AS value
+                FROM smf_kpi_buckets
+                WHERE resolution = ? AND bucket_start >= ?
+                GROUP BY kpi_name
+            """, (BASE_RESOLUTION, window_start(window_minutes)))
+        else:
+            # Totals maintained at insert time; a primary key prefix lookup
+            cursor.execute("""
+                SELECT kpi_name, value
+                FROM kpi_rollups
+                WHERE nf = 'SMF' AND slice = ''
+            """)
 
         rows = cursor.fetchall()
         smf = {row["kpi_name"]: row["value"] for row in rows}
 
         logger.debug("SMF KPI raw data: %s", smf)
 
-        return {
-            "pdu_session_establishment_request": smf.get("pdu_session_create_request", 0),
-            "sm_policy_association_request": smf.get("policy_association_request", 0),
-            "sm_policy_association_response": smf.get("policy_association_response", 0),
-            "sm_policy_association_failure": smf.get("policy_association_failure", 0),
-            "pfcp_session_establishment_request": smf.get("pfcp_session_establishment_request", 0),
-            "pfcp_session_establishment_response": smf.get("pfcp_session_establishment_response", 0),
-            "pdu_session_establishment_complete": smf.get("pdu_session_est_complete", 0),
-            "pdu_session_establishment_reject": smf.get("pdu_session_est_reject", 0),
-            "pfcp_session_establishment_failure": smf.get("pfcp_session_establishment_failure", 0)
-        }
+        return build_smf_kpis(smf)
 
     except Exception:
         logger.exception("Failed to fetch SMF KPIs")
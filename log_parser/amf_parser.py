@@ -1,30 +1,46 @@
-import re
-
-def parse_amf_logs(lines):
-    kpis = {
-        "registration_request": 0,
-        "registration_success": 0,
-        "authentication_request": 0,
-        "authentication_success": 0,
-        "authentication_failure": 0,
-        "authentication_retry": 0,
-        "registration_reject": 0
-    }
-
-    regex_map = {
-        r"registration_request": "registration_request",
-        r"registration_complete": "registration_success",
-        r"authentication_request": "authentication_request",
-        r"authentication_success": "authentication_success",
-        r"authentication_failure": "authentication_failure",
-        r"authentication_retry": "authentication_retry",
-        r"registration_reject": "registration_reject"
-    }
-
-    for line in lines:
-        for pattern, key in regex_map.items():
-            if re.search(pattern, line):
-                kpis[key] += 1
-                break
-
-    return kpis
\ No newline at end of file
+from log_parser.kpi_spec import KPI_SPECS
+
+# AMF KPI definitions compiled from kpi_spec.json
+AMF_SPEC = KPI_SPECS["AMF"]
+
+# AMF event_name → KPI key
+EVENT_KPI_MAP = AMF_SPEC.event_kpi_map
+
+# Registration procedure boundaries used for end-to-end correlation
+PROCEDURE_START_EVENTS = AMF_SPEC.procedure_start_events
+PROCEDURE_OUTCOMES = AMF_SPEC.procedure_outcomes
+
+
+def parse_amf_logs(lines, series=None):
+    """
+    Count AMF KPIs in a stream of log lines.
+
+    Args:
+        lines (iterable[str]): AMF log lines.
+        series (dict): Optional {(minute, kpi_key): count} to fill with
+            per-minute counts keyed by the event's own timestamp.
+
+    Returns:
+        dict: KPI key → count.
+    """
+    kpis, _ = AMF_SPEC.parse_lines(lines, series)
+    return kpis
+
+
+def parse_amf_events(lines, store=None):
+    """
+    Parse AMF log lines into a columnar EventStore.
+
+    Unlike parse_amf_logs, every spec event is kept with its timestamp,
+    procedure id, latency, result, SUPI and gNB, so further KPIs and
+    slices can be computed without reparsing the text. The JSON keys read
+    are the AMF record fields of kpi_spec.json.
+
+    Args:
+        lines (iterable[str]): AMF log lines (JSON, one record per line).
+        store (EventStore): Store to append to; a new one if omitted.
+
+    Returns:
+        EventStore: Store holding the parsed events.
+    """
+    return AMF_SPEC.parse_events(lines, store)
@@ -0,0 +1,367 @@
+"""
+Columnar event store for the
+5G Core Analytics & Insights Platform.
+
+Parsed AMF/SMF events are kept as typed arrays (one per field) instead
+of per-line dicts. String fields are dictionary-encoded into small
+integer codes, so KPI counts, rates and groupings can be computed as
+NumPy reductions over the columns without reparsing the log text.
+"""
+
+from array import array
+from datetime import datetime, timezone
+import time
+import warnings
+
+import numpy as np
+
+# Numeric column → array typecode
+NUMERIC_COLUMNS = {
+    "timestamp": "d",   # epoch seconds (naive log timestamps are taken as UTC)
+    "latency_ms": "f",
+    "retry_count": "q",
+    "step_seq": "q"
+}
+
+# Dictionary-encoded string columns (stored as int32 codes)
+ENCODED_COLUMNS = ("event", "result", "procedure", "supi", "slice", "ran_id", "cause")
+
+# Lengths of naive "YYYY-MM-DDTHH:MM:SS[.fff[fff]]" timestamps
+FIXED_TIMESTAMP_LENGTHS = {19, 23, 26}
+
+
+def parse_timestamp(text):
+    """
+    Convert an ISO-8601 log timestamp into epoch seconds.
+
+    Args:
+        text (str): Timestamp as written by the NF.
+
+    Returns:
+        float: Seconds since the epoch; naive timestamps are treated as UTC.
+    """
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_timestamps(texts):
+    """
+    Convert many ISO-8601 log timestamps into epoch seconds at once.
+
+    Fixed-width naive timestamps, as the NFs write them, are parsed by
+    NumPy in one call; any other form goes through parse_timestamp.
+
+    Args:
+        texts (list[str]): Timestamps as written by the NF.
+
+    Returns:
+        numpy.ndarray: float64 seconds since the epoch, one per text.
+
+    Raises:
+        ValueError: If a text is not a valid timestamp.
+    """
+    if set(map(len, texts)) <= FIXED_TIMESTAMP_LENGTHS:
+        try:
+            # NumPy only warns about timezone designators; datetime handles them
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                stamps = np.array(texts, dtype="datetime64[us]")
+        except (ValueError, Warning):
+            stamps = None
+
+        if stamps is not None and not np.isnat(stamps).any():
+            return stamps.astype(np.int64) / 1e6
+
+    return np.array([parse_timestamp(text) for text in texts], dtype=np.float64)
+
+
+def convert_numeric_columns(columns):
+    """
+    Convert the numeric text columns of an EventStore.extend() batch.
+
+    Returns:
+        dict: Column name → NumPy array (float64 or int64).
+
+    Raises:
+        ValueError, OverflowError: If a value does not convert.
+    """
+    numbers = {"timestamp": parse_timestamps(columns["timestamp"])}
+    for name, typecode in NUMERIC_COLUMNS.items():
+        if name != "timestamp" and name in columns:
+            numbers[name] = np.array(columns[name], dtype=np.int64 if typecode == "q" else np.float64)
+    return numbers
+
+
+def row_converts(columns, index):
+    """
+    Check whether one row of an EventStore.extend() batch converts.
+    """
+    try:
+        convert_numeric_columns({name: values[index:index + 1] for name, values in columns.items()})
+    except (ValueError, OverflowError):
+        return False
+    return True
+
+
+class StringDictionary:
+    """
+    Dictionary encoding for one string column.
+
+    Each distinct value is assigned the next integer code on first sight.
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self._codes = {}
+        for value in values:
+            self.encode(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def encode(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def encode_all(self, values):
+        """
+        Encode a list of values.
+
+        Returns:
+            array.array: int32 codes, one per value.
+        """
+        codes = self._codes
+        new_values = [value for value in dict.fromkeys(values) if value not in codes]
+        codes.update(zip(new_values, range(len(self.values), len(self.values) + len(new_values))))
+        self.values.extend(new_values)
+        return array("i", map(codes.__getitem__, values))
+
+    def code(self, value):
+        """
+        Return the code of a value, or -1 if it has never been seen.
+        """
+        return self._codes.get(value, -1)
+
+
+class EventStore:
+    """
+    Columnar, append-only store of parsed events for one NF type.
+    """
+
+    def __init__(self, nf_type, event_names=()):
+        """
+        Args:
+            nf_type (str): "AMF" or "SMF".
+            event_names (iterable[str]): Known event names, encoded first so
+                their codes are stable across stores of the same NF type.
+        """
+        self.nf_type = nf_type
+        self.dictionaries = {name: StringDictionary() for name in ENCODED_COLUMNS}
+        self.dictionaries["event"] = StringDictionary(event_names)
+
+        self._columns = {name: array(typecode) for name, typecode in NUMERIC_COLUMNS.items()}
+        self._columns.update({name: array("i") for name in ENCODED_COLUMNS})
+
+        # Lines that named an event but could not be parsed, and were skipped
+        self.skipped = 0
+
+    def __len__(self):
+        return len(self._columns["timestamp"])
+
+    def append(
+        self,
+        timestamp,
+        event,
+        result="",
+        procedure="",
+        supi="",
+        slice_id="",
+        ran_id="",
+        cause="",
+        latency_ms=0.0,
+        retry_count=0,
+        step_seq=0):
+        """
+        Append one parsed event.
+
+        Raises:
+            TypeError, OverflowError: If a field does not fit its column
+                (e.g. an unhashable value or an out-of-range integer); the
+                columns are left unchanged.
+        """
+        columns = self._columns
+        dictionaries = self.dictionaries
+
+        count = len(columns["timestamp"])
+        try:
+            columns["timestamp"].append(timestamp)
+            columns["latency_ms"].append(latency_ms)
+            columns["retry_count"].append(retry_count)
+            columns["step_seq"].append(step_seq)
+
+            columns["event"].append(dictionaries["event"].encode(event))
+            columns["result"].append(dictionaries["result"].encode(result))
+            columns["procedure"].append(dictionaries["procedure"].encode(procedure))
+            columns["supi"].append(dictionaries["supi"].encode(supi))
+            columns["slice"].append(dictionaries["slice"].encode(slice_id))
+            columns["ran_id"].append(dictionaries["ran_id"].encode(ran_id))
+            columns["cause"].append(dictionaries["cause"].encode(cause))
+        except (TypeError, OverflowError):
+            # Keep the columns aligned
+            for column in columns.values():
+                del column[count:]
+            raise
+
+    def extend(self, columns):
+        """
+        Append parsed events given as columns of log text.
+
+        Numeric columns are converted with one NumPy call each and string
+        columns encoded in bulk. Rows holding a value that does not
+        convert (e.g. a malformed timestamp or an out-of-range integer)
+        are skipped and counted in skipped.
+
+        Args:
+            columns (dict): Column name → list of text values, one per
+                event. "timestamp" and "event" are required; columns left
+                out hold "" (or 0 if numeric).
+        """
+        count = len(columns["timestamp"])
+        try:
+            numbers = convert_numeric_columns(columns)
+        except (ValueError, OverflowError):
+            keep = [index for index in range(count) if row_converts(columns, index)]
+            self.skipped += count - len(keep)
+            columns = {name: [values[index] for index in keep] for name, values in columns.items()}
+            count = len(keep)
+            numbers = convert_numeric_columns(columns)
+
+        for name, typecode in NUMERIC_COLUMNS.items():
+            values = numbers.get(name)
+            if values is None:
+                values = np.zeros(count)
+            # Like array.append, a latency too large for float32 becomes inf
+            with np.errstate(over="ignore"):
+                values = values.astype(np.dtype(typecode))
+            self._columns[name].frombytes(values.tobytes())
+
+        for name in ENCODED_COLUMNS:
+            dictionary = self.dictionaries[name]
+            values = columns.get(name)
+            if values is None:
+                self._columns[name].extend([dictionary.encode("")] * count)
+            else:
+                self._columns[name].extend(dictionary.encode_all(values))
+
+    def column(self, name):
+        """
+        Return a column as a NumPy array (a copy, so appends stay possible).
+
+        Args:
+            name (str): Column name from NUMERIC_COLUMNS or ENCODED_COLUMNS.
+
+        Returns:
+            numpy.ndarray: Column values; codes for dictionary-encoded columns.
+        """
+        return np.array(self._columns[name])
+
+    def event_code(self, event):
+        """
+        Return the integer code of an event name (-1 if unknown).
+        """
+        return self.dictionaries["event"].code(event)
+
+    def event_counts(self, by=None):
+        """
+        Count events, optionally grouped by a dictionary-encoded column.
+
+        Args:
+            by (str): Column to group by (e.g. "slice", "ran_id"), or None.
+
+        Returns:
+            numpy.ndarray: Counts indexed by event code, or a
+            (group code, event code) matrix when grouped.
+        """
+        events = self.column("event")
+        event_count = len(self.dictionaries["event"])
+
+        if by is None:
+            return np.bincount(events, minlength=event_count)
+
+        group_count = len(self.dictionaries[by])
+        flat = self.column(by).astype(np.int64) * event_count + events
+        return np.bincount(flat, minlength=group_count * event_count).reshape(
+            group_count, event_count
+        )
+
+    def minute_counts(self, by="event"):
+        """
+        Count events per event-time minute and value of a column.
+
+        Args:
+            by (str): Dictionary-encoded column (e.g. "event", "slice").
+
+        Returns:
+            dict: {(minute, value): count}, the minute as a UTC
+            "YYYY-MM-DDTHH:MM" key like the parsers' per-minute series.
+        """
+        if not len(self):
+            return {}
+
+        values = self.dictionaries[by].values
+        minutes = np.floor_divide(self.column("timestamp"), 60).astype(np.int64)
+        keys, counts = np.unique(minutes * len(values) + self.column(by), return_counts=True)
+
+        labels = {}
+        result = {}
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            minute, code = divmod(key, len(values))
+            label = labels.get(minute)
+            if label is None:
+                label = labels[minute] = time.strftime("%Y-%m-%dT%H:%M", time.gmtime(minute * 60))
+            result[(label, values[code])] = count
+        return result
+
+    def select_event(self, counts, event):
+        """
+        Pick one event's counts out of an event_counts() result.
+
+        Args:
+            counts (numpy.ndarray): Result of event_counts().
+            event (str): Event name.
+
+        Returns:
+            numpy.ndarray: Count (or per-group counts); zeros if the event is unknown.
+        """
+        code = self.event_code(event)
+        if code < 0:
+            return np.zeros(counts.shape[:-1], dtype=np.int64)
+        return counts[..., code]
+
+    def merge(self, other):
+        """
+        Append every event of another store of the same NF type.
+
+        Codes from the other store are remapped into this store's
+        dictionaries, so shard-local stores can be combined in order.
+        """
+        for name, column in self._columns.items():
+            if name in NUMERIC_COLUMNS:
+                column.extend(other._columns[name])
+                continue
+
+            mapping = np.array(
+                [self.dictionaries[name].encode(value) for value in other.dictionaries[name].values],
+                dtype=np.int32
+            )
+            if len(mapping):
+                column.frombytes(mapping[other.column(name)].tobytes())
+
+        self.skipped += other.skipped
+        return self
@@ -0,0 +1,192 @@
+"""
+Pipeline instrumentation for the
+5G Core Analytics & Insights Platform.
+
+A RunReport times each stage of an ingestion run and records its
+throughput (lines/sec, bytes/sec, rows/sec) and memory: process RSS,
+the RSS high-water mark during the stage and, optionally, the peak of
+Python allocations traced by tracemalloc. The report is logged and
+written as JSON so throughput can be compared across runs.
+"""
+
+from contextlib import contextmanager
+import cProfile
+import io
+import json
+import logging
+import os
+import platform
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+# Written by the kernel on Linux; "5" resets the RSS high-water mark
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+STATUS_PATH = "/proc/self/status"
+
+# Functions listed in the log when a stage is profiled
+PROFILE_TOP_FUNCTIONS = 20
+
+MB = 1024 * 1024
+
+
+def read_rss():
+    """
+    Return (current RSS, RSS high-water mark) in bytes.
+
+    Falls back to getrusage (high-water mark only) where /proc is missing.
+    """
+    try:
+        with open(STATUS_PATH) as status:
+            fields = dict(line.split(":", 1) for line in status if ":" in line)
+        return int(fields["VmRSS"].split()[0]) * 1024, int(fields["VmHWM"].split()[0]) * 1024
+    except (OSError, KeyError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak *= 1 if sys.platform == "darwin" else 1024
+        return None, peak
+
+
+def reset_peak_rss():
+    """
+    Reset the RSS high-water mark so it covers the next stage only.
+
+    Returns:
+        bool: False where the platform cannot reset it (the mark then
+        covers the whole run so far).
+    """
+    try:
+        with open(CLEAR_REFS_PATH, "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class RunReport:
+    """
+    Per-stage timings, throughput and memory of one ingestion run.
+    """
+
+    def __init__(self, mode, trace_memory=False, **details):
+        """
+        Args:
+            mode (str): "batch" or "follow".
+            trace_memory (bool): Also record tracemalloc peaks per stage
+                (slows the run down noticeably).
+            **details: Extra run settings included in the report.
+        """
+        self.trace_memory = trace_memory
+        self.report = {
+            "mode": mode,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "pid": os.getpid(),
+            **details,
+            "stages": []
+        }
+        self._started = time.perf_counter()
+
+        if trace_memory:
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, profile_path=None):
+        """
+        Measure one stage.
+
+        The block receives the stage's dict and may set "lines", "bytes"
+        and "rows" on it; rates are derived from them when the stage ends.
+
+        Args:
+            name (str): Stage name.
+            profile_path (str): If set, run the stage under cProfile and
+                dump the stats to this file.
+        """
+        stats = {"name": name, "lines": 0, "bytes": 0, "rows": 0}
+        per_stage_peak = reset_peak_rss()
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile() if profile_path else None
+        started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield stats
+        finally:
+            if profiler:
+                profiler.disable()
+            seconds = time.perf_counter() - started
+
+            rss, peak_rss = read_rss()
+            stats["seconds"] = round(seconds, 4)
+            for unit in ("lines", "bytes", "rows"):
+                stats[f"{unit}_per_sec"] = round(stats[unit] / seconds, 1) if seconds and stats[unit] else 0
+            stats["rss_mb"] = round(rss / MB, 1) if rss is not None else None
+            stats["peak_rss_mb"] = round(peak_rss / MB, 1)
+            stats["peak_rss_scope"] = "stage" if per_stage_peak else "run"
+            if self.trace_memory:
+                stats["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / MB, 1)
+
+            if profiler:
+                self._dump_profile(profiler, name, profile_path)
+                stats["profile"] = profile_path
+
+            self.report["stages"].append(stats)
+            logger.info(
+                "Stage %-10s %8.3fs  %10.0f lines/s  %8.1f MB/s  %8.0f rows/s  peak RSS %.1f MB",
+                name, seconds, stats["lines_per_sec"], stats["bytes_per_sec"] / MB,
+                stats["rows_per_sec"], stats["peak_rss_mb"]
+            )
+
+    def add_files(self, files):
+        """
+        Add per-file parse statistics to the report.
+
+        Args:
+            files (list[dict]): One dict per log file (path, lines, bytes,
+                seconds, rates).
+        """
+        self.report.setdefault("files", []).extend(files)
+
+    def _dump_profile(self, profiler, name, profile_path):
+        directory = os.path.dirname(profile_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(profile_path)
+
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        logger.info("Profile of stage %s written to %s\n%s", name, profile_path, summary.getvalue())
+
+    def finish(self, path=None):
+        """
+        Close the report and optionally write it as JSON.
+
+        Args:
+            path (str): File to write the report to.
+
+        Returns:
+            dict: The report.
+        """
+        self.report["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self.report["total_seconds"] = round(time.perf_counter() - self._started, 4)
+        if self.trace_memory:
+            tracemalloc.stop()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w") as report_file:
+                json.dump(self.report, report_file, indent=2)
+            logger.info("Run report written to %s", path)
+
+        return self.report
@@ -0,0 +1,474 @@
+"""
+Declarative KPI definitions for the
+5G Core Analytics & Insights Platform.
+
+kpi_spec.json is the single definition of every KPI. For each NF type it
+lists the log record format and the fields read from each record, the
+log events that are counted, the counters they feed (stored name → API
+name), the dimensions counted per line (e.g. snssai), the procedure
+boundaries used for correlation and the success/failure rate formulas.
+It is validated and compiled once at import into a KpiSpec per NF type,
+which the parsers, the database layer and the API all use.
+
+Both parsers of each NF are generated from the spec as Python source.
+The event parser, which the ingestion pipeline uses, filters lines on
+the event pattern and then captures each record field with its own
+regex, without decoding the rest of the line; the captured text is
+converted into the columns of an EventStore a chunk at a time, and KPI
+counts and series are reduced from the store. The counting parser does
+one event search and one dispatch-table lookup per line, plus one search
+per dimension, with the per-minute bucketing compiled into a separate
+loop. Events added to the spec therefore cost no extra work per line in
+either parser.
+"""
+
+from collections import Counter
+import json
+import logging
+import os
+import re
+
+from log_parser.event_store import ENCODED_COLUMNS, NUMERIC_COLUMNS, EventStore
+
+logger = logging.getLogger(__name__)
+
+# Spec shipped with the package
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kpi_spec.json")
+
+# Keys every NF entry of the spec must define
+REQUIRED_KEYS = ("event_pattern", "minute_pattern", "record", "events", "counters", "rates")
+
+# Log record formats: one JSON object per line, or space-separated
+# tokens of which key=value pairs are fields and others are positional
+RECORD_FORMATS = ("json", "key_value")
+
+
+def compile_pattern(nf_type, name, pattern):
+    """
+    Compile a spec regex that must capture exactly one group.
+    """
+    try:
+        compiled = re.compile(pattern)
+    except (TypeError, re.error) as exc:
+        raise ValueError(f"{nf_type} {name} is not a valid regex: {exc}") from exc
+
+    if compiled.groups != 1:
+        raise ValueError(f"{nf_type} {name} must capture exactly one group")
+    return compiled
+
+
+def generate_parser_source(function_name, dimensions):
+    """
+    Generate the source of a single-pass counting parser.
+
+    The function takes (lines, series=None, dimension_series=None) and
+    returns (counter → count, {dimension: Counter of value → count}).
+    Dimension loops are unrolled, and the bucketed loop is only entered
+    when a series dict was passed, so the plain loop does nothing else.
+
+    Args:
+        function_name (str): Name of the generated function.
+        dimensions (list[str]): Dimension names, in spec order.
+
+    Returns:
+        str: Python source defining the function. It expects SEARCH_EVENT,
+        SEARCH_MINUTE, SEARCH_DIMENSIONS, EVENT_KPIS, COUNTERS and Counter
+        in its globals.
+    """
+    indexes = range(len(dimensions))
+
+    def count_event(indent, bucketed):
+        pad = " " * indent
+        body = [
+            f"{pad}match = search_event(line)",
+            f"{pad}if match:",
+            f"{pad}    key = event_kpis(match.group(1))",
+            f"{pad}    if key:",
+            f"{pad}        kpis[key] += 1",
+        ]
+        if bucketed == "lazy":
+            # Without dimensions the minute is only needed for counted events
+            body += [
+                f"{pad}        minute = search_minute(line)",
+                f"{pad}        if minute:",
+                f"{pad}            bucket = (minute.group(1), key)",
+                f"{pad}            series[bucket] = series.get(bucket, 0) + 1",
+            ]
+        elif bucketed:
+            body += [
+                f"{pad}        if minute:",
+                f"{pad}            bucket = (minute, key)",
+                f"{pad}            series[bucket] = series.get(bucket, 0) + 1",
+            ]
+        return body
+
+    def count_dimension(indent, bucketed, index):
+        pad = " " * indent
+        body = [
+            f"{pad}match = search_{index}(line)",
+            f"{pad}if match:",
+            f"{pad}    value = match.group(1)",
+            f"{pad}    counts_{index}[value] += 1",
+        ]
+        if bucketed:
+            body += [
+                f"{pad}    if minute:",
+                f"{pad}        bucket = (minute, value)",
+                f"{pad}        series_{index}[bucket] = series_{index}.get(bucket, 0) + 1",
+            ]
+        return body
+
+    source = [
+        f"def {function_name}(lines, series=None, dimension_series=None):",
+        "    kpis = dict.fromkeys(COUNTERS, 0)",
+        "    search_event = SEARCH_EVENT",
+        "    search_minute = SEARCH_MINUTE",
+        "    event_kpis = EVENT_KPIS.get",
+    ]
+    if dimensions:
+        source += ["    if dimension_series is None:", "        dimension_series = {}"]
+    for index, name in zip(indexes, dimensions):
+        source += [
+            f"    search_{index} = SEARCH_DIMENSIONS[{index}]",
+            f"    counts_{index} = Counter()",
+            f"    series_{index} = dimension_series.get({name!r})",
+        ]
+
+    unbucketed = " and ".join(["series is None"] + [f"series_{index} is None" for index in indexes])
+    source += [f"    if {unbucketed}:", "        for line in lines:"]
+    source += count_event(12, False)
+    for index in indexes:
+        source += count_dimension(12, False, index)
+
+    # Missing series are filled into throwaway dicts, keeping the loop free of checks
+    source.append("    else:")
+    if dimensions:
+        source += ["        if series is None:", "            series = {}"]
+    for index in indexes:
+        source += [f"        if series_{index} is None:", f"            series_{index} = {{}}"]
+    source.append("        for line in lines:")
+    if not dimensions:
+        source += count_event(12, "lazy")
+    else:
+        source += [
+            "            minute = search_minute(line)",
+            "            if minute:",
+            "                minute = minute.group(1)",
+        ]
+        source += count_event(12, True)
+    for index in indexes:
+        source += count_dimension(12, True, index)
+
+    results = ", ".join(f"{name!r}: counts_{index}" for index, name in zip(indexes, dimensions))
+    source.append(f"    return kpis, {{{results}}}")
+    return "\n".join(source) + "\n"
+
+
+def field_pattern(record_format, column, key, unit=None):
+    """
+    Build the regex that captures one record field from a log line.
+
+    Args:
+        record_format (str): One of RECORD_FORMATS.
+        column (str): EventStore column the field fills.
+        key (str | int): JSON key, key=value key or (key_value only)
+            token position.
+        unit (str): Unit suffix left out of the captured value.
+
+    Returns:
+        str: Pattern whose group 1 is the field's text, or does not
+        participate when the field is null.
+    """
+    if isinstance(key, int):
+        return r"^\s*" + r"(?:\S+\s+)" * key + r"(\S+)"
+    if record_format == "key_value":
+        value = r"(\S*?)(?:" + re.escape(unit) + r")?(?!\S)" if unit else r"(\S*)"
+        return " " + re.escape(key) + "=" + value
+
+    key = re.escape(json.dumps(key))
+    if column in NUMERIC_COLUMNS and column != "timestamp":
+        # The raw number; a quoted or malformed one fails conversion
+        return key + r"\s*:\s*(?:null|([^\s,}\]]+))"
+    return key + r'\s*:\s*(?:null|"([^"\\]*(?:\\.[^"\\]*)*)")'
+
+
+def generate_event_parser_source(function_name, columns):
+    """
+    Generate the source of an event parser that fills an EventStore.
+
+    The function takes (lines, store=None) and returns the store. Lines
+    are filtered on the event pattern first: lines without a spec event
+    cost one search. Each other field is then captured by its own regex,
+    and the captured text is converted column by column in
+    EventStore.extend. Lines without a timestamp, or with a value that
+    does not convert, are counted in store.skipped.
+
+    Args:
+        function_name (str): Name of the generated function.
+        columns (list[str]): EventStore columns read from the record,
+            timestamp first; SEARCH_FIELDS holds their searches in order.
+
+    Returns:
+        str: Python source defining the function. It expects NF_TYPE,
+        EVENT_KPIS, EventStore, SEARCH_EVENT and SEARCH_FIELDS in its
+        globals.
+    """
+    source = [
+        f"def {function_name}(lines, store=None):",
+        "    if store is None:",
+        "        store = EventStore(NF_TYPE, EVENT_KPIS)",
+        "    search_event = SEARCH_EVENT",
+        "    events = EVENT_KPIS",
+        "    column_event = []",
+        "    append_event = column_event.append",
+    ]
+    for index, column in enumerate(columns):
+        source += [
+            f"    search_{column} = SEARCH_FIELDS[{index}]",
+            f"    column_{column} = []",
+            f"    append_{column} = column_{column}.append",
+        ]
+    source += [
+        "    skipped = 0",
+        "",
+        "    for line in lines:",
+        "        match = search_event(line)",
+        "        if match is None:",
+        "            continue",
+        "        event = match[1]",
+        "        if event not in events:",
+        "            continue",
+        "",
+        "        match = search_timestamp(line)",
+        "        if match is None or not match[1]:",
+        "            skipped += 1",
+        "            continue",
+        "        append_timestamp(match[1])",
+        "        append_event(event)",
+    ]
+    for column in columns[1:]:
+        default = '"0"' if column in NUMERIC_COLUMNS else '""'
+        source += [
+            f"        match = search_{column}(line)",
+            f"        append_{column}((match[1] or {default}) if match else {default})",
+        ]
+    source += ["", "    store.skipped += skipped", "    store.extend({"]
+    source += [f"        {column!r}: column_{column}," for column in ["event"] + columns]
+    source += ["    })", "    return store"]
+    return "\n".join(source) + "\n"
+
+
+class KpiSpec:
+    """
+    Compiled KPI definitions of one NF type.
+    """
+
+    def __init__(self, nf_type, spec):
+        """
+        Validate one NF entry of the spec and compile it.
+
+        Args:
+            nf_type (str): NF type, e.g. "AMF".
+            spec (dict): The NF's entry in kpi_spec.json.
+
+        Raises:
+            ValueError: If the entry is incomplete or refers to unknown
+                events or counters.
+        """
+        missing = [key for key in REQUIRED_KEYS if key not in spec]
+        if missing:
+            raise ValueError(f"{nf_type} KPI spec is missing {', '.join(missing)}")
+
+        self.nf_type = nf_type
+
+        # Stored counter name → API name, in API order
+        self.counters = dict(spec["counters"])
+
+        # Event name → stored counter name (the parser's dispatch table)
+        self.event_kpi_map = dict(spec["events"])
+        unknown = sorted(set(self.event_kpi_map.values()) - set(self.counters))
+        if unknown:
+            raise ValueError(f"{nf_type} events feed undefined counters: {', '.join(unknown)}")
+
+        self.counter_events = {counter: [] for counter in self.counters}
+        for event, counter in self.event_kpi_map.items():
+            self.counter_events[counter].append(event)
+
+        record = spec["record"]
+        self.record_format = record.get("format")
+        if self.record_format not in RECORD_FORMATS:
+            raise ValueError(f"{nf_type} record format must be one of: {', '.join(RECORD_FORMATS)}")
+
+        # EventStore column → JSON key, key=value key or token position;
+        # the event is read with event_pattern
+        self.record_fields = dict(record.get("fields", {}))
+        self.record_units = dict(record.get("units", {}))
+        columns = (set(NUMERIC_COLUMNS) | set(ENCODED_COLUMNS)) - {"event"}
+        unknown = sorted(set(self.record_fields) - columns)
+        if unknown or "timestamp" not in self.record_fields:
+            raise ValueError(f"{nf_type} record fields must map timestamp and other non-event EventStore columns")
+        for column, key in self.record_fields.items():
+            if not isinstance(key, (str, int)) or isinstance(key, int) and self.record_format == "json":
+                raise ValueError(f"{nf_type} record field {column!r} must be a key"
+                                 + (" or token position" if self.record_format == "key_value" else ""))
+        unknown = sorted(set(self.record_units) - (set(self.record_fields) & set(NUMERIC_COLUMNS)))
+        if unknown or self.record_units and self.record_format == "json":
+            raise ValueError(f"{nf_type} record units must refer to numeric key_value fields")
+
+        self.event_pattern = compile_pattern(nf_type, "event_pattern", spec["event_pattern"])
+        self.minute_pattern = compile_pattern(nf_type, "minute_pattern", spec["minute_pattern"])
+        self.dimension_patterns = {
+            name: compile_pattern(nf_type, f"dimension {name}", pattern)
+            for name, pattern in spec.get("dimensions", {}).items()
+        }
+
+        procedure = spec.get("procedure", {})
+        self.procedure_start_events = set(procedure.get("start", ()))
+        self.procedure_outcomes = dict(procedure.get("outcomes", {}))
+        unknown = sorted((self.procedure_start_events | set(self.procedure_outcomes)) - set(self.event_kpi_map))
+        if unknown:
+            raise ValueError(f"{nf_type} procedure refers to undefined events: {', '.join(unknown)}")
+
+        # Rate name → (numerator counters, denominator counters)
+        self.rates = {}
+        for name, formula in spec["rates"].items():
+            terms = (tuple(formula.get("numerator", ())), tuple(formula.get("denominator", ())))
+            unknown = sorted(set(terms[0] + terms[1]) - set(self.counters))
+            if unknown or not terms[1]:
+                raise ValueError(f"{nf_type} rate {name!r} needs a denominator of defined counters")
+            self.rates[name] = terms
+
+        self.parse_lines = self._compile_parser()
+        self.parse_events = self._compile_event_parser()
+
+    def _compile_parser(self):
+        """
+        Generate, compile and return this NF's counting parser.
+        """
+        function_name = f"parse_{self.nf_type.lower()}_lines"
+        self.parser_source = generate_parser_source(function_name, list(self.dimension_patterns))
+
+        namespace = {
+            "Counter": Counter,
+            "COUNTERS": tuple(self.counters),
+            "EVENT_KPIS": self.event_kpi_map,
+            "SEARCH_EVENT": self.event_pattern.search,
+            "SEARCH_MINUTE": self.minute_pattern.search,
+            "SEARCH_DIMENSIONS": tuple(pattern.search for pattern in self.dimension_patterns.values()),
+        }
+        exec(compile(self.parser_source, f"<kpi_spec {self.nf_type}>", "exec"), namespace)
+        return namespace[function_name]
+
+    def _compile_event_parser(self):
+        """
+        Generate, compile and return this NF's EventStore parser.
+        """
+        # Timestamp first: lines without one are skipped before the other searches
+        columns = sorted(self.record_fields, key=lambda column: column != "timestamp")
+        searches = []
+        for column in columns:
+            pattern = field_pattern(
+                self.record_format, column, self.record_fields[column], self.record_units.get(column)
+            )
+            searches.append(compile_pattern(self.nf_type, f"record field {column}", pattern).search)
+
+        function_name = f"parse_{self.nf_type.lower()}_events"
+        self.event_parser_source = generate_event_parser_source(function_name, columns)
+
+        namespace = {
+            "NF_TYPE": self.nf_type,
+            "EVENT_KPIS": self.event_kpi_map,
+            "EventStore": EventStore,
+            "SEARCH_EVENT": self.event_pattern.search,
+            "SEARCH_FIELDS": tuple(searches),
+        }
+        exec(compile(self.event_parser_source, f"<kpi_spec {self.nf_type} events>", "exec"), namespace)
+        return namespace[function_name]
+
+    def build_api_kpis(self, raw):
+        """
+        Shape stored KPI totals ({counter: value}) for the API.
+        """
+        return {api_name: raw.get(counter, 0) for counter, api_name in self.counters.items()}
+
+    def calculate_rates(self, data):
+        """
+        Evaluate the rate formulas over API-shaped KPI totals.
+
+        Args:
+            data (dict): KPI totals as returned by build_api_kpis.
+
+        Returns:
+            dict: Rate name → percentage rounded to 2 places (0 when the
+            denominator is 0).
+        """
+        counters = self.counters
+        rates = {}
+        for name, (numerator, denominator) in self.rates.items():
+            part = sum(data.get(counters[counter], 0) for counter in numerator)
+            total = sum(data.get(counters[counter], 0) for counter in denominator)
+            rates[name] = round((part / total) * 100, 2) if total else 0
+        return rates
+
+    def count_kpis(self, store):
+        """
+        Count KPIs from a columnar EventStore with one bincount.
+
+        Args:
+            store (EventStore): Parsed events of this NF type.
+
+        Returns:
+            dict: Counter → count, in counter order.
+        """
+        counts = store.event_counts()
+        kpis = dict.fromkeys(self.counters, 0)
+        for event, counter in self.event_kpi_map.items():
+            kpis[counter] += int(store.select_event(counts, event))
+        return kpis
+
+    def count_series(self, store, series):
+        """
+        Add per-minute KPI counts of a columnar EventStore to a series.
+
+        Args:
+            store (EventStore): Parsed events of this NF type.
+            series (dict): {(minute, counter): count} to update in place.
+
+        Returns:
+            dict: The updated series.
+        """
+        event_kpis = self.event_kpi_map
+        for (minute, event), count in store.minute_counts("event").items():
+            counter = event_kpis.get(event)
+            if counter:
+                bucket = (minute, counter)
+                series[bucket] = series.get(bucket, 0) + count
+        return series
+
+
+def load_kpi_specs(path=DEFAULT_SPEC_PATH):
+    """
+    Load and compile a KPI spec file.
+
+    Args:
+        path (str): Path to a JSON spec (see kpi_spec.json).
+
+    Returns:
+        dict: NF type → KpiSpec.
+
+    Raises:
+        ValueError: If the file is not valid JSON or fails validation.
+    """
+    with open(path, encoding="utf-8") as f:
+        try:
+            spec = json.load(f)
+        except ValueError as exc:
+            raise ValueError(f"{path} is not valid JSON: {exc}") from exc
+
+    specs = {nf_type: KpiSpec(nf_type, entry) for nf_type, entry in spec.items()}
+    logger.debug("Compiled KPI spec %s for %s", path, ", ".join(specs))
+    return specs
+
+
+# Compiled once at import; every layer shares these definitions
+KPI_SPECS = load_kpi_specs()
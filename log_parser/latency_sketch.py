@@ -0,0 +1,302 @@
+"""
+Mergeable latency sketches for the
+5G Core Analytics & Insights Platform.
+
+A LatencySketch is a log-bucketed histogram (as used by HDR histograms
+and DDSketch): each latency is counted in the bucket
+ceil(log_gamma(latency)), so every quantile it reports is within
+RELATIVE_ACCURACY of a real latency value. Sketches only hold bucket
+counts, so they are small, and two sketches merge exactly by adding
+counts - across shards, micro-batches and time buckets alike.
+"""
+
+from bisect import bisect_left
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from log_parser.time_buckets import BASE_RESOLUTION
+
+# Quantiles are reported within this relative error of a real value
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Quantiles reported by the latency endpoints
+REPORTED_QUANTILES = {
+    "p50": 0.5,
+    "p90": 0.9,
+    "p99": 0.99,
+    "p99.9": 0.999
+}
+
+# NF type → latency dimension → EventStore column it is grouped by
+LATENCY_DIMENSIONS = {
+    "AMF": {"event": "event"},
+    "SMF": {"step": "event", "snssai": "slice"}
+}
+
+# Blob layout: version, zero count, min, max, bucket count, then
+# zlib-compressed int16 bucket indices followed by uint64 counts
+BLOB_VERSION = 1
+BLOB_HEADER = struct.Struct("<BQddI")
+
+
+def bucket_indices(latencies):
+    """
+    Map positive latencies to their sketch bucket indices.
+    """
+    return np.ceil(np.log(latencies) / LOG_GAMMA).astype(np.int64)
+
+
+class LatencySketch:
+    """
+    Log-bucketed latency histogram with bounded relative error.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.zero_count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def count(self):
+        return self.zero_count + sum(self.buckets.values())
+
+    def add(self, latencies):
+        """
+        Add an array of latencies (milliseconds); values <= 0 count as zero.
+        """
+        latencies = np.asarray(latencies, dtype=np.float64)
+        if not len(latencies):
+            return self
+
+        positive = latencies[latencies > 0]
+        self.zero_count += len(latencies) - len(positive)
+        self.min = min(self.min, float(latencies.min()))
+        self.max = max(self.max, float(latencies.max()))
+
+        indices, counts = np.unique(bucket_indices(positive), return_counts=True)
+        self.add_buckets(indices.tolist(), counts.tolist())
+        return self
+
+    def add_buckets(self, indices, counts):
+        """
+        Add precomputed bucket counts (see bucket_indices).
+        """
+        buckets = self.buckets
+        for index, count in zip(indices, counts):
+            buckets[index] = buckets.get(index, 0) + count
+
+    def merge(self, other):
+        """
+        Add every count of another sketch into this one, in place.
+        """
+        self.add_buckets(other.buckets.keys(), other.buckets.values())
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        """
+        Return the latency at quantile q (0..1), or None if the sketch is empty.
+        """
+        total = self.count
+        if not total:
+            return None
+
+        rank = q * (total - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Bucket midpoint in relative terms, clamped to the observed range
+                value = 2 * GAMMA ** index / (GAMMA + 1)
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    def cumulative_counts(self, bounds):
+        """
+        Count latencies at or below each bound, as for a histogram's "le" buckets.
+
+        A log bucket is counted under the first bound whose own bucket is at
+        or above it, so a latency equal to a bound always lands in that
+        bound's bucket and counts are exact to within RELATIVE_ACCURACY of
+        each bound.
+
+        Args:
+            bounds (list[float]): Ascending upper bounds in milliseconds.
+
+        Returns:
+            list[int]: Cumulative counts, one per bound.
+        """
+        # Bounds are bucketed like latencies, so a value on a bound shares its index
+        bound_indices = bucket_indices(bounds).tolist()
+        counts = [0] * len(bounds)
+        for index, count in self.buckets.items():
+            position = bisect_left(bound_indices, index)
+            if position < len(bounds):
+                counts[position] += count
+
+        cumulative, total = [], self.zero_count
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def approximate_sum(self):
+        """
+        Estimate the sum of all latencies from the bucket midpoints.
+        """
+        return sum(
+            count * 2 * GAMMA ** index / (GAMMA + 1)
+            for index, count in self.buckets.items()
+        )
+
+    def summary(self):
+        """
+        Return the count, reported quantiles and max, rounded for display.
+        """
+        result = {"count": self.count}
+        for name, q in REPORTED_QUANTILES.items():
+            value = self.quantile(q)
+            result[name] = round(value, 2) if value is not None else None
+        result["max"] = round(self.max, 2) if self.count else None
+        return result
+
+    def to_bytes(self):
+        """
+        Serialize the sketch into a compact blob.
+        """
+        indices = sorted(self.buckets)
+        counts = [self.buckets[index] for index in indices]
+        header = BLOB_HEADER.pack(
+            BLOB_VERSION, self.zero_count, self.min, self.max, len(indices)
+        )
+        body = (
+            np.array(indices, dtype=np.int16).tobytes()
+            + np.array(counts, dtype=np.uint64).tobytes()
+        )
+        return header + zlib.compress(body)
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """
+        Rebuild a sketch from a blob written by to_bytes.
+        """
+        version, zero_count, low, high, size = BLOB_HEADER.unpack_from(blob)
+        if version != BLOB_VERSION:
+            raise ValueError(f"Unsupported latency sketch version: {version}")
+
+        body = zlib.decompress(blob[BLOB_HEADER.size:])
+        indices = np.frombuffer(body, dtype=np.int16, count=size)
+        counts = np.frombuffer(body, dtype=np.uint64, count=size, offset=2 * size)
+
+        sketch = cls()
+        sketch.buckets = dict(zip(indices.tolist(), counts.tolist()))
+        sketch.zero_count = zero_count
+        sketch.min = low
+        sketch.max = high
+        return sketch
+
+
+def merge_sketches(target, sketches):
+    """
+    Merge one {key: LatencySketch} dict into another in place.
+
+    Sketches from `sketches` may be adopted by reference.
+    """
+    for key, sketch in sketches.items():
+        existing = target.get(key)
+        if existing is None:
+            target[key] = sketch
+        else:
+            existing.merge(sketch)
+    return target
+
+
+def sketch_store_latencies(store, dimensions, sketches=None):
+    """
+    Build per-minute latency sketches from an EventStore.
+
+    Args:
+        store (EventStore): Parsed events.
+        dimensions (dict): Dimension name → EventStore column to group by
+            (see LATENCY_DIMENSIONS).
+        sketches (dict): Optional dict to add into.
+
+    Returns:
+        dict: {(minute_start, dimension, key): LatencySketch}, minute_start
+        in epoch seconds.
+    """
+    if sketches is None:
+        sketches = {}
+    if not len(store):
+        return sketches
+
+    latencies = store.column("latency_ms").astype(np.float64)
+    minutes = (store.column("timestamp") // BASE_RESOLUTION).astype(np.int64)
+    first_minute = int(minutes.min())
+    minutes -= first_minute
+
+    # Bucket slot per event: 0 for zero latencies, 1.. for the log buckets
+    positive = latencies > 0
+    indices = bucket_indices(latencies[positive])
+    lowest = int(indices.min()) if len(indices) else 0
+    slots = np.zeros(len(latencies), dtype=np.int64)
+    slots[positive] = indices - lowest + 1
+    slot_count = int(slots.max()) + 1
+
+    for dimension, column in dimensions.items():
+        names = store.dictionaries[column].values
+        groups = minutes * len(names) + store.column(column)
+
+        # Count events per (minute, key, slot) with one flat key
+        keys, counts = np.unique(groups * slot_count + slots, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            group, slot = divmod(key, slot_count)
+            sketch = _group_sketch(sketches, dimension, names, group, first_minute)
+            if sketch is None:
+                continue
+            if slot:
+                index = slot - 1 + lowest
+                sketch.buckets[index] = sketch.buckets.get(index, 0) + count
+            else:
+                sketch.zero_count += count
+
+        # Exact extremes per (minute, key)
+        group_ids, inverse = np.unique(groups, return_inverse=True)
+        lows = np.full(len(group_ids), np.inf)
+        highs = np.full(len(group_ids), -np.inf)
+        np.minimum.at(lows, inverse, latencies)
+        np.maximum.at(highs, inverse, latencies)
+
+        for group, low, high in zip(group_ids.tolist(), lows.tolist(), highs.tolist()):
+            sketch = _group_sketch(sketches, dimension, names, group, first_minute)
+            if sketch is not None:
+                sketch.min = min(sketch.min, low)
+                sketch.max = max(sketch.max, high)
+
+    return sketches
+
+
+def _group_sketch(sketches, dimension, names, group, first_minute):
+    # Decode a (minute, key) group id; events without a key are not sketched
+    minute, code = divmod(group, len(names))
+    name = names[code]
+    if not name:
+        return None
+
+    key = ((first_minute + minute) * BASE_RESOLUTION, dimension, name)
+    sketch = sketches.get(key)
+    if sketch is None:
+        sketch = sketches[key] = LatencySketch()
+    return sketch
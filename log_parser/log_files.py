@@ -0,0 +1,185 @@
+"""
+Log file discovery for the
+5G Core Analytics & Insights Platform.
+
+Resolves directories, globs and paths into the AMF and SMF log files to
+ingest, works out each file's NF type, and orders them so that results
+merge deterministically: per NF instance, oldest rotation first.
+"""
+
+import glob
+import logging
+import os
+import re
+
+from log_parser.log_reader import open_log
+
+logger = logging.getLogger(__name__)
+
+NF_TYPES = ("AMF", "SMF")
+
+# Default logs when no paths are given
+DEFAULT_LOG_FILES = {"AMF": ["logs/amf.log"], "SMF": ["logs/smf.log"]}
+
+# Files picked up from a directory: amf.log, smf.log.1, amf-3.log.2.gz, smf.log-20260101.xz, ...
+LOG_FILE_NAME = re.compile(r"\.log([.-]\d+)*(\.(gz|bz2|xz))?$")
+
+# Compression extension, then a rotation suffix (".3" index or "-20260101" date)
+COMPRESSION_EXTENSION = re.compile(r"\.(gz|bz2|xz)$")
+ROTATION_SUFFIX = re.compile(r"[.-](\d+)$")
+
+# Rotation suffixes this long are dates, shorter ones are rotation indexes
+DATE_SUFFIX_DIGITS = 8
+
+
+def expand_pattern(pattern):
+    """
+    Expand a path, directory or glob into a sorted list of files.
+
+    Directories are searched recursively for log files (see
+    LOG_FILE_NAME); globs and plain paths are taken as given.
+
+    Args:
+        pattern (str): File path, directory or glob (** is recursive).
+
+    Returns:
+        list[str]: Matching files.
+    """
+    if os.path.isdir(pattern):
+        files = []
+        for directory, subdirectories, names in os.walk(pattern):
+            subdirectories.sort()
+            files.extend(
+                os.path.join(directory, name)
+                for name in sorted(names)
+                if LOG_FILE_NAME.search(name)
+            )
+        return files
+
+    if glob.has_magic(pattern):
+        return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+    if os.path.isfile(pattern):
+        return [pattern]
+
+    logger.warning("Log path %s does not exist; skipping it", pattern)
+    return []
+
+
+def detect_nf_type(file_path):
+    """
+    Work out whether a log file holds AMF or SMF events.
+
+    The file name is checked first (amf / smf); otherwise the first line
+    is inspected: AMF logs are JSON, SMF logs are "<timestamp> SMF ..."
+    lines.
+
+    Args:
+        file_path (str): Path to a plain or compressed log.
+
+    Returns:
+        str | None: "AMF", "SMF", or None if it cannot be told.
+    """
+    name = os.path.basename(file_path).lower()
+    for nf_type in NF_TYPES:
+        if nf_type.lower() in name:
+            return nf_type
+
+    try:
+        with open_log(file_path) as f:
+            first_line = f.readline(64 * 1024)
+    except (OSError, EOFError, UnicodeDecodeError, ValueError):
+        return None
+
+    if first_line.lstrip().startswith("{") and '"nf_type": "AMF"' in first_line:
+        return "AMF"
+    if " SMF " in first_line:
+        return "SMF"
+    return None
+
+
+def instance_key(file_path):
+    """
+    Identify the NF instance that wrote a log: its directory and base
+    file name with compression and rotation suffixes removed.
+    """
+    directory, name = os.path.split(file_path)
+    base = ROTATION_SUFFIX.sub("", COMPRESSION_EXTENSION.sub("", name))
+    return directory, base
+
+
+def rotation_rank(file_path):
+    """
+    Sort key placing a rotated log before newer ones of the same instance.
+
+    Dated rotations sort by date, numbered ones from the highest index
+    (oldest) down, and the live file comes last.
+    """
+    name = COMPRESSION_EXTENSION.sub("", os.path.basename(file_path))
+    match = ROTATION_SUFFIX.search(name)
+    if match is None:
+        return (2, 0)
+
+    suffix = match.group(1)
+    if len(suffix) >= DATE_SUFFIX_DIGITS:
+        return (0, int(suffix))
+    return (1, -int(suffix))
+
+
+def resolve_log_files(amf=None, smf=None, logs=None):
+    """
+    Resolve the log files to ingest per NF type.
+
+    Args:
+        amf (list[str]): Paths, directories or globs of AMF logs.
+        smf (list[str]): Paths, directories or globs of SMF logs.
+        logs (list[str]): Paths, directories or globs of logs whose NF
+            type is detected per file.
+
+    Returns:
+        dict: NF type → list of files, in merge order (instances sorted by
+        directory and name, rotations oldest first). Defaults to
+        DEFAULT_LOG_FILES when no pattern is given.
+    """
+    if not (amf or smf or logs):
+        amf, smf = DEFAULT_LOG_FILES["AMF"], DEFAULT_LOG_FILES["SMF"]
+
+    assigned = {}
+    sources = [("AMF", pattern) for pattern in amf or []]
+    sources += [("SMF", pattern) for pattern in smf or []]
+    sources += [(None, pattern) for pattern in logs or []]
+
+    for forced_type, pattern in sources:
+        for file_path in expand_pattern(pattern):
+            key = os.path.realpath(file_path)
+            if key in assigned:
+                continue
+
+            nf_type = forced_type or detect_nf_type(file_path)
+            if nf_type is None:
+                logger.warning("Cannot tell the NF type of %s; skipping it", file_path)
+                continue
+            assigned[key] = (nf_type, file_path)
+
+    log_files = {nf_type: [] for nf_type in NF_TYPES}
+    for nf_type, file_path in assigned.values():
+        log_files[nf_type].append(file_path)
+
+    for nf_type, paths in log_files.items():
+        paths.sort(key=lambda path: (instance_key(path), rotation_rank(path), path))
+        logger.info("Found %d %s log file(s)", len(paths), nf_type)
+
+    return log_files
+
+
+def group_by_instance(file_paths):
+    """
+    Split ordered log files into per-instance runs (see resolve_log_files).
+
+    Returns:
+        list[list[str]]: Files of each NF instance, in merge order.
+    """
+    groups = {}
+    for file_path in file_paths:
+        groups.setdefault(instance_key(file_path), []).append(file_path)
+    return list(groups.values())
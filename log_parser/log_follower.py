@@ -0,0 +1,161 @@
+"""
+Live log tailing for the
+5G Core Analytics & Insights Platform.
+
+LogFollower behaves like `tail -F`: it keeps reading a log as the NF
+appends to it, and reopens the path when the file is rotated (new
+inode) or truncated.
+"""
+
+import asyncio
+import logging
+import os
+
+from log_parser.log_reader import DEFAULT_BUFFER_SIZE, FINGERPRINT_BYTES, fingerprint_data
+
+logger = logging.getLogger(__name__)
+
+
+class LogFollower:
+    """
+    Async iterator over batches of complete lines appended to a log file.
+
+    Each iteration yields the lines read in one chunk. When no new data
+    arrives within poll_interval an empty list is yielded, so consumers
+    can run time-based work (such as flushing) without a second task.
+
+    After every yield, `inode`, `offset`, `size` and `fingerprint` (see
+    log_reader.fingerprint_data) describe the position just past the last
+    yielded line, suitable for an ingestion checkpoint.
+    """
+
+    def __init__(
+        self,
+        file_path,
+        start=0,
+        poll_interval=0.5,
+        read_size=DEFAULT_BUFFER_SIZE):
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+
+        self.inode = None
+        self.offset = start
+        self.size = 0
+        self.fingerprint = None
+
+        self._file = None
+        self._partial = b""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            if self._file is None and not self._open():
+                await asyncio.sleep(self.poll_interval)
+                return []
+
+            chunk = self._file.read(self.read_size)
+            if chunk:
+                return self._split_lines(chunk)
+
+            # At EOF: check whether the path now points at a new or shorter file
+            lines = self._check_rotation()
+            if lines is not None:
+                return lines
+
+            await asyncio.sleep(self.poll_interval)
+            return []
+
+    def close(self):
+        """
+        Close the underlying file handle.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        try:
+            self._file = open(self.file_path, "rb")
+        except FileNotFoundError:
+            return False
+
+        stat = os.fstat(self._file.fileno())
+        if self.inode is not None and stat.st_ino != self.inode:
+            self.offset = 0
+        elif stat.st_size < self.offset:
+            logger.warning("%s is shorter than offset %d; reading from start",
+                           self.file_path, self.offset)
+            self.offset = 0
+
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.fingerprint = None
+        self._partial = b""
+        self._file.seek(self.offset)
+
+        logger.info("Following %s from offset %d", self.file_path, self.offset)
+        return True
+
+    def _split_lines(self, chunk):
+        data = self._partial + chunk
+        last_newline = data.rfind(b"\n")
+
+        if last_newline == -1:
+            self._partial = data
+            return []
+
+        complete = data[:last_newline + 1]
+        self._partial = data[last_newline + 1:]
+        self.offset += len(complete)
+        self.size = max(self.size, self.offset + len(self._partial))
+        if self.fingerprint is None:
+            self.fingerprint = self._read_fingerprint()
+
+        return complete.decode("utf-8").splitlines(keepends=True)
+
+    def _check_rotation(self):
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            # Rotated away and not yet recreated; keep the old handle for now
+            return None
+
+        if stat.st_ino != self.inode:
+            logger.warning("%s was rotated; reopening", self.file_path)
+            lines = self._take_partial()
+            self.close()
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.fingerprint = None
+            return lines
+
+        if stat.st_size < self.offset + len(self._partial):
+            logger.warning("%s was truncated; reading from start", self.file_path)
+            self._partial = b""
+            self.offset = 0
+            self.fingerprint = None
+            self._file.seek(0)
+            return []
+
+        self.size = stat.st_size
+        return None
+
+    def _read_fingerprint(self):
+        # Read the first line through the open handle, which may be a rotated file
+        position = self._file.tell()
+        self._file.seek(0)
+        data = self._file.read(FINGERPRINT_BYTES)
+        self._file.seek(position)
+        return fingerprint_data(data)
+
+    def _take_partial(self):
+        # The rotated file will not grow again, so its unterminated tail is complete
+        if not self._partial:
+            return []
+
+        line = self._partial.decode("utf-8")
+        self._partial = b""
+        return [line]
@@ -1,3 +1,617 @@
-def read_log(file_path):
-    with open(file_path, "r") as f:
-        return f.readlines()
\ No newline at end of file
+"""
+Log reading utilities for the
+5G Core Analytics & Insights Platform.
+
+gzip, bz2 and xz logs are detected by their magic bytes and decompressed
+while streaming, so rotated archives never have to be unpacked to disk.
+Multi-member gzip files can also be read one member range at a time,
+which lets the parser pool decompress them in parallel.
+"""
+
+import bz2
+import gzip
+import hashlib
+from itertools import islice
+import io
+import lzma
+import os
+import zlib
+
+# Read-buffer size used when streaming log files (1 MiB)
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Leading bytes of each supported compression format
+COMPRESSION_MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00"
+}
+COMPRESSED_FILES = {"gzip": gzip.GzipFile, "bz2": bz2.BZ2File, "xz": lzma.LZMAFile}
+
+# A gzip member header: ID1, ID2 and CM=8 (deflate)
+GZIP_MEMBER_HEADER = b"\x1f\x8b\x08"
+
+# Compressed bytes inflated to confirm a candidate gzip member header
+GZIP_PROBE_SIZE = 64 * 1024
+
+# Compressed bytes inflated to estimate a gzip log's decompressed size
+GZIP_SAMPLE_SIZE = 256 * 1024
+
+# zlib window bits for a gzip wrapper
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# Leading (decompressed) bytes searched for the first line of a log
+FINGERPRINT_BYTES = 4096
+
+
+def detect_compression(file_path):
+    """
+    Identify the compression of a log file from its magic bytes.
+
+    Args:
+        file_path (str): Path to the log file.
+
+    Returns:
+        str | None: "gzip", "bz2", "xz", or None for a plain log.
+    """
+    with open(file_path, "rb") as f:
+        magic = f.read(max(len(prefix) for prefix in COMPRESSION_MAGIC.values()))
+
+    for compression, prefix in COMPRESSION_MAGIC.items():
+        if magic.startswith(prefix):
+            return compression
+    return None
+
+
+def open_log(file_path, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Open a log file for text reading, decompressing it if needed.
+
+    Args:
+        file_path (str): Path to a plain, gzip, bz2 or xz log.
+        buffer_size (int): Size of the underlying read buffer in bytes.
+
+    Returns:
+        io.TextIOBase: Text stream of the (decompressed) log.
+    """
+    compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, "r", buffering=buffer_size)
+
+    decompressed = COMPRESSED_FILES[compression](file_path, "rb")
+    return io.TextIOWrapper(io.BufferedReader(decompressed, buffer_size), encoding="utf-8")
+
+
+def fingerprint_data(data):
+    """
+    Fingerprint a log from its leading bytes.
+
+    The fingerprint is a hash of the first line (at most FINGERPRINT_BYTES),
+    which no longer changes once written, so it identifies the log while
+    it grows, after it is renamed and after it is compressed.
+
+    Args:
+        data (bytes): The first FINGERPRINT_BYTES (decompressed) bytes, or
+            the whole log if it is shorter.
+
+    Returns:
+        str | None: Hex digest, or None while the first line is incomplete.
+    """
+    newline = data.find(b"\n", 0, FINGERPRINT_BYTES)
+    if newline != -1:
+        data = data[:newline + 1]
+    elif len(data) < FINGERPRINT_BYTES:
+        return None
+    return hashlib.sha1(data[:FINGERPRINT_BYTES]).hexdigest()
+
+
+def log_fingerprint(file_path):
+    """
+    Fingerprint a plain or compressed log (see fingerprint_data).
+
+    Returns:
+        str | None: Hex digest, or None if the first line cannot be read
+        yet, e.g. from an archive whose first block is still being written.
+    """
+    compression = detect_compression(file_path)
+    try:
+        if compression is None:
+            with open(file_path, "rb") as f:
+                data = f.read(FINGERPRINT_BYTES)
+        else:
+            with COMPRESSED_FILES[compression](file_path, "rb") as f:
+                data = f.read(FINGERPRINT_BYTES)
+    except (EOFError, OSError, zlib.error, lzma.LZMAError):
+        return None
+    return fingerprint_data(data)
+
+
+def read_log(file_path, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Stream lines from a log file one at a time.
+
+    Only one read buffer is held in memory, so peak memory stays flat
+    regardless of file size. Compressed logs are decompressed on the fly
+    (see open_log).
+
+    Args:
+        file_path (str): Path to the log file.
+        buffer_size (int): Size of the underlying read buffer in bytes.
+
+    Yields:
+        str: Log lines, including the trailing newline.
+    """
+    if detect_compression(file_path) == "gzip":
+        # Inflating with zlib directly is faster than GzipFile's line reading
+        yield from read_log_range(file_path, 0, os.path.getsize(file_path), buffer_size)
+        return
+
+    with open_log(file_path, buffer_size) as f:
+        yield from f
+
+
+class LineCounter:
+    """
+    Iterator wrapper that counts lines as a consumer pulls them through.
+
+    Lets callers report line counts for a streamed log after it has been
+    parsed, without materialising the lines.
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self.count = 0
+
+    def __iter__(self):
+        for line in self._lines:
+            self.count += 1
+            yield line
+
+
+def read_log_range(file_path, start, end, buffer_size=DEFAULT_BUFFER_SIZE, skip=0):
+    """
+    Stream the lines of a log file that start within a byte range.
+
+    The range is expected to be aligned to line boundaries (see
+    split_log_ranges), so every line is yielded by exactly one range.
+
+    For a compressed log the offsets are compressed bytes and the range
+    must start at 0 or at a gzip member / bz2 or xz stream boundary. gzip
+    ranges stop at end (see split_gzip_members); bz2 and xz ranges are
+    decompressed to the end of the file.
+
+    Args:
+        file_path (str): Path to the log file.
+        start (int): Byte offset of the first line to read.
+        end (int): Byte offset at which reading stops.
+        buffer_size (int): Size of the underlying read buffer in bytes.
+        skip (int): Leading bytes of the (decompressed) range to drop,
+            e.g. the part of a compressed log ingested before rotation.
+            Must fall on a line boundary.
+
+    Yields:
+        str: Log lines, including the trailing newline.
+    """
+    if start >= end:
+        return
+    if skip:
+        for line in read_log_range(file_path, start, end, buffer_size):
+            if skip > 0:
+                skip -= len(line.encode("utf-8"))
+            else:
+                yield line
+        return
+
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        for line in GzipRangeReader(file_path, start, end, buffer_size).lines(edges=True):
+            yield line.decode("utf-8")
+        return
+    if compression is not None:
+        with open(file_path, "rb") as raw:
+            raw.seek(start)
+            with COMPRESSED_FILES[compression](raw) as decompressed:
+                with io.TextIOWrapper(io.BufferedReader(decompressed, buffer_size), encoding="utf-8") as f:
+                    yield from f
+        return
+
+    with open(file_path, "rb", buffering=buffer_size) as f:
+        f.seek(start)
+        remaining = end - start
+
+        for raw_line in f:
+            if remaining <= 0:
+                break
+            remaining -= len(raw_line)
+            yield raw_line.decode("utf-8")
+
+
+def split_log_ranges(file_path, shard_count, start=0, end=None):
+    """
+    Split a log file into byte ranges aligned to line boundaries.
+
+    Args:
+        file_path (str): Path to the log file.
+        shard_count (int): Desired number of ranges.
+        start (int): Byte offset where the first range begins.
+        end (int): Byte offset where the last range ends (file size if None).
+
+    Returns:
+        list[tuple[int, int]]: Non-empty (start, end) byte ranges in file order.
+    """
+    with open(file_path, "rb") as f:
+        if end is None:
+            f.seek(0, 2)
+            end = f.tell()
+
+        shard_size = max((end - start) // max(shard_count, 1), 1)
+        boundaries = [start]
+
+        for shard in range(1, shard_count):
+            offset = start + shard * shard_size
+            if offset <= boundaries[-1]:
+                continue
+            if offset >= end:
+                break
+
+            # Advance to the start of the next line
+            f.seek(offset - 1)
+            f.readline()
+            boundary = min(f.tell(), end)
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+
+        boundaries.append(end)
+
+    return [
+        (range_start, range_end)
+        for range_start, range_end in zip(boundaries, boundaries[1:])
+        if range_end > range_start
+    ]
+
+
+def find_gzip_member(f, offset, end, chunk_size=DEFAULT_BUFFER_SIZE):
+    """
+    Find the first gzip member that starts at or after an offset.
+
+    A candidate header is only accepted if a probe of the bytes after it
+    inflates without error, which rules out header-like byte sequences
+    inside compressed data in practice.
+
+    Args:
+        f (file): Gzip file opened in binary mode.
+        offset (int): Byte offset to search from.
+        end (int): Byte offset where the search stops.
+        chunk_size (int): Bytes scanned per read.
+
+    Returns:
+        int | None: Offset of the member, or None if there is none.
+    """
+    position = offset
+    while position < end:
+        f.seek(position)
+        # Overlap reads so a header straddling two chunks is still found
+        chunk = f.read(min(chunk_size, end - position) + len(GZIP_MEMBER_HEADER) - 1)
+        candidate = chunk.find(GZIP_MEMBER_HEADER)
+
+        while candidate != -1 and position + candidate < end:
+            f.seek(position + candidate)
+            if is_gzip_member(f.read(GZIP_PROBE_SIZE)):
+                return position + candidate
+            candidate = chunk.find(GZIP_MEMBER_HEADER, candidate + 1)
+
+        position += chunk_size
+
+    return None
+
+
+def is_gzip_member(data):
+    """
+    Check whether bytes look like the start of a gzip member.
+    """
+    # FLG bits 5-7 are reserved and must be zero
+    if len(data) < 10 or data[3] & 0xE0:
+        return False
+    try:
+        zlib.decompressobj(GZIP_WBITS).decompress(data)
+    except zlib.error:
+        return False
+    return True
+
+
+def split_gzip_members(file_path, shard_count, start=0, end=None):
+    """
+    Split a multi-member gzip log into byte ranges of whole members.
+
+    Ranges follow the same contract as split_log_ranges, but are aligned
+    to member boundaries instead of lines. A single-member file yields a
+    single range.
+
+    Args:
+        file_path (str): Path to the gzip log.
+        shard_count (int): Desired number of ranges.
+        start (int): Byte offset of the first member.
+        end (int): Byte offset where the last member ends (file size if None).
+
+    Returns:
+        list[tuple[int, int]]: Non-empty (start, end) byte ranges in file order.
+    """
+    if end is None:
+        end = os.path.getsize(file_path)
+
+    shard_size = max((end - start) // max(shard_count, 1), 1)
+    boundaries = [start]
+
+    with open(file_path, "rb") as f:
+        for shard in range(1, shard_count):
+            offset = max(start + shard * shard_size, boundaries[-1] + 1)
+            if offset >= end:
+                break
+
+            boundary = find_gzip_member(f, offset, end)
+            if boundary is None:
+                break
+            boundaries.append(boundary)
+
+    boundaries.append(end)
+
+    return [
+        (range_start, range_end)
+        for range_start, range_end in zip(boundaries, boundaries[1:])
+        if range_end > range_start
+    ]
+
+
+def estimate_gzip_size(file_path, start=0, end=None):
+    """
+    Estimate the decompressed size of the gzip members in a byte range.
+
+    The compression ratio of a sample from the start of the range is
+    applied to the whole range. Data that is not valid gzip is counted
+    at its compressed size.
+
+    Args:
+        file_path (str): Path to the gzip log.
+        start (int): Byte offset of the first member.
+        end (int): Byte offset where the last member ends (file size if None).
+
+    Returns:
+        int: Estimated decompressed bytes in the range.
+    """
+    if end is None:
+        end = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        sample = f.read(min(GZIP_SAMPLE_SIZE, end - start))
+    if not sample:
+        return 0
+
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    inflated = 0
+    data = sample.lstrip(b"\x00")
+    try:
+        while data:
+            inflated += len(decompressor.decompress(data))
+            if not decompressor.eof:
+                break
+            data = decompressor.unused_data.lstrip(b"\x00")
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+    except zlib.error:
+        return end - start
+
+    return (end - start) * inflated // len(sample)
+
+
+class GzipRangeReader:
+    """
+    Lines of the gzip members in a byte range.
+
+    Iterating yields the complete lines inside the range as bytes. A
+    range split from a larger file usually starts and ends mid-line, so
+    the bytes up to and including the first newline are kept in `head`
+    and the bytes after the last one in `tail`; the caller joins a
+    range's tail with the next range's head. If the range holds no
+    newline at all, every byte ends up in `head` and `tail` stays None.
+    """
+
+    def __init__(self, file_path, start, end, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.file_path = file_path
+        self.start = start
+        self.end = end
+        self.buffer_size = buffer_size
+        self.head = b""
+        self.tail = None
+
+    def chunks(self):
+        """
+        Yield the decompressed bytes of every member in the range, in
+        chunks of at most buffer_size bytes.
+
+        Raises:
+            ValueError: If the range does not start and end on member
+                boundaries, or the data is not valid gzip.
+        """
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        at_boundary = True
+        remaining = self.end - self.start
+
+        with open(self.file_path, "rb") as f:
+            f.seek(self.start)
+            try:
+                while remaining > 0:
+                    data = f.read(min(self.buffer_size, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    if at_boundary:
+                        data = data.lstrip(b"\x00")
+
+                    pending = False
+                    while data or pending:
+                        at_boundary = False
+                        # Inflate at most buffer_size bytes per call; the input
+                        # left over waits in unconsumed_tail
+                        chunk = decompressor.decompress(data, self.buffer_size)
+                        yield chunk
+                        if not decompressor.eof:
+                            data = decompressor.unconsumed_tail
+                            # A full chunk may leave output buffered in zlib
+                            pending = len(chunk) == self.buffer_size
+                            continue
+                        # Member finished; the next one starts in unused_data,
+                        # after any zero padding (skipped like GzipFile does)
+                        data = decompressor.unused_data.lstrip(b"\x00")
+                        decompressor = zlib.decompressobj(GZIP_WBITS)
+                        at_boundary = True
+                        pending = False
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip data in {self.file_path} "
+                                 f"(bytes {self.start}-{self.end}): {e}")
+
+        if not at_boundary:
+            raise ValueError(f"{self.file_path}: byte {self.end} is not a gzip member boundary")
+
+    def lines(self, edges=False):
+        """
+        Yield the lines of the range as bytes.
+
+        Args:
+            edges (bool): Also yield head first and tail last, for a range
+                read on its own (such as a whole file).
+        """
+        pending = None
+        for chunk in self.chunks():
+            if pending is None:
+                newline = chunk.find(b"\n")
+                if newline == -1:
+                    self.head += chunk
+                    continue
+                self.head += chunk[:newline + 1]
+                chunk = chunk[newline + 1:]
+                pending = b""
+                if edges:
+                    yield self.head
+
+            last_newline = chunk.rfind(b"\n")
+            if last_newline == -1:
+                pending += chunk
+                continue
+            yield from io.BytesIO(pending + chunk[:last_newline + 1])
+            pending = chunk[last_newline + 1:]
+
+        self.tail = pending
+        if edges:
+            edge = self.head if pending is None else pending
+            if edge:
+                yield edge
+
+    def __iter__(self):
+        return self.lines()
+
+
+def find_last_line_end(file_path, start, end, chunk_size=64 * 1024):
+    """
+    Find the byte offset just past the last complete line in a range.
+
+    A trailing line still being written (no newline yet) is left for a
+    later run.
+
+    Args:
+        file_path (str): Path to the log file.
+        start (int): Byte offset where the range begins.
+        end (int): Byte offset where the range ends.
+        chunk_size (int): Bytes read per backwards step.
+
+    Returns:
+        int: Offset after the last newline in [start, end), or start if none.
+    """
+    with open(file_path, "rb") as f:
+        position = end
+
+        while position > start:
+            read_from = max(start, position - chunk_size)
+            f.seek(read_from)
+            chunk = f.read(position - read_from)
+
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                return read_from + newline + 1
+
+            position = read_from
+
+    return start
+
+
+def find_last_member_end(file_path, start, end, buffer_size=DEFAULT_BUFFER_SIZE):
+    """
+    Find the byte offset just past the last complete gzip member in a range.
+
+    Every member from start is inflated (and the output discarded) to
+    find where it ends. A trailing member still being written, e.g. by
+    logrotate compressing a rotated log, is left for a later run, as is
+    anything after data that is not valid gzip. Zero padding after a
+    member is skipped.
+
+    Args:
+        file_path (str): Path to the gzip log.
+        start (int): Byte offset of the first member.
+        end (int): Byte offset where the range ends.
+        buffer_size (int): Compressed bytes inflated per read.
+
+    Returns:
+        int: Offset after the last complete member (and its padding) in
+        [start, end), or start if none.
+    """
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    at_boundary = True
+    boundary = position = start
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        try:
+            while position < end:
+                data = f.read(min(buffer_size, end - position))
+                if not data:
+                    break
+                position += len(data)
+
+                while data:
+                    if at_boundary:
+                        padded = len(data)
+                        data = data.lstrip(b"\x00")
+                        boundary += padded - len(data)
+                        if not data:
+                            break
+                        at_boundary = False
+
+                    decompressor.decompress(data)
+                    if not decompressor.eof:
+                        break
+                    data = decompressor.unused_data
+                    boundary = position - len(data)
+                    decompressor = zlib.decompressobj(GZIP_WBITS)
+                    at_boundary = True
+        except zlib.error:
+            pass
+
+    return boundary
+
+
+def iter_chunks(lines, chunk_size):
+    """
+    Group a line stream into lists of at most chunk_size lines.
+
+    Args:
+        lines (iterable[str]): Log lines.
+        chunk_size (int): Maximum lines per chunk.
+
+    Yields:
+        list[str]: Consecutive lines.
+    """
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,450 @@
+"""
+Multi-core sharded log parsing for the
+5G Core Analytics & Insights Platform.
+
+Each log is split into line-aligned byte ranges, the ranges are parsed
+by a process pool, and the partial KPI dicts, slice counters, latency
+and distinct-UE sketches and procedure fragments are merged back in file order so the
+result matches a serial run.
+
+Multi-member gzip logs are split at member boundaries instead, so the
+pool decompresses them in parallel; lines that straddle two members are
+stitched back together when the results are merged. bz2 and xz logs are
+decompressed by a single worker.
+
+Many files (a cluster's rotated logs) share one pool: their ranges run
+side by side and each file's progress and throughput are logged as it
+finishes.
+"""
+
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from log_parser.log_reader import (
+    GzipRangeReader,
+    LineCounter,
+    detect_compression,
+    estimate_gzip_size,
+    iter_chunks,
+    read_log_range,
+    split_gzip_members,
+    split_log_ranges
+)
+from log_parser.kpi_spec import KPI_SPECS
+from log_parser.procedure_correlator import PROCEDURE_EVENTS, ProcedureCorrelator
+from log_parser.latency_sketch import LATENCY_DIMENSIONS, merge_sketches, sketch_store_latencies
+from log_parser.distinct_sketch import (
+    DISTINCT_DIMENSIONS,
+    merge_distinct_sketches,
+    sketch_store_distinct
+)
+from log_parser.time_buckets import merge_counts
+
+logger = logging.getLogger(__name__)
+
+# Ranges per worker; oversplitting keeps the pool busy when ranges finish unevenly
+SHARDS_PER_WORKER = 4
+
+# Lines per chunk loaded into an EventStore at a time
+CHUNK_LINES = 65536
+
+# Smallest byte range worth a worker of its own
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+MB = 1024 * 1024
+
+
+def empty_result(nf_type, fragments=None, watermark=0.0):
+    """
+    Create an empty parse result, optionally seeded with in-flight procedures.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        fragments (dict): procedure_id → fragment carried over from earlier data.
+        watermark (float): Latest event time seen in that earlier data.
+
+    Returns:
+        dict: Parse result with no lines (see parse_lines).
+    """
+    return {
+        "nf_type": nf_type,
+        "kpis": {},
+        "snssai": Counter(),
+        "lines": 0,
+        "skipped": 0,
+        "series": {},
+        "slice_series": {},
+        "latency": {},
+        "distinct_ue": {},
+        "procedures": [],
+        "fragments": OrderedDict(fragments or {}),
+        "watermark": watermark
+    }
+
+
+def parse_lines(nf_type, lines):
+    """
+    Parse an iterable of AMF or SMF log lines.
+
+    Lines are processed in chunks: each chunk is parsed once into a
+    columnar EventStore, from which the KPI counts, per-minute series and
+    slice counts are reduced and which feeds the latency and distinct-UE
+    sketches and the procedure correlator, so memory stays bounded by the
+    chunk size.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        lines (iterable[str]): Log lines.
+
+    Returns:
+        dict: {"nf_type": str, "kpis": dict, "snssai": Counter, "lines": int,
+               "skipped": int (malformed event lines),
+               "series": {(minute, kpi): count},
+               "slice_series": {(minute, snssai): count},
+               "latency": {(minute_start, dimension, key): LatencySketch},
+               "distinct_ue": {(minute_start, dimension, key): HyperLogLog},
+               "procedures": [procedure record], "fragments": {procedure_id: fragment},
+               "watermark": float}
+    """
+    if nf_type not in PROCEDURE_EVENTS:
+        raise ValueError(f"Unsupported NF type: {nf_type}")
+
+    lines = LineCounter(lines)
+    result = empty_result(nf_type)
+    correlator = ProcedureCorrelator(nf_type, require_start=True)
+
+    spec = KPI_SPECS[nf_type]
+    result["kpis"] = dict.fromkeys(spec.counters, 0)
+
+    for chunk in iter_chunks(lines, CHUNK_LINES):
+        store = spec.parse_events(chunk)
+        if "snssai" in spec.dimension_patterns:
+            count_slices(store, result["snssai"], result["slice_series"])
+
+        merge_counts(result["kpis"], spec.count_kpis(store))
+        spec.count_series(store, result["series"])
+        result["skipped"] += store.skipped
+        sketch_store_latencies(store, LATENCY_DIMENSIONS[nf_type], result["latency"])
+        sketch_store_distinct(store, DISTINCT_DIMENSIONS[nf_type], result["distinct_ue"])
+        correlator.consume(store)
+
+    result["lines"] = lines.count
+    result["procedures"] = correlator.take_records()
+    result["fragments"] = correlator.handoff()
+    result["watermark"] = correlator.watermark
+
+    return result
+
+
+def count_slices(store, snssai, slice_series):
+    """
+    Add the SMF events per slice, in total and per minute, of an EventStore.
+
+    Args:
+        store (EventStore): Parsed SMF events.
+        snssai (Counter): snssai → count, updated in place.
+        slice_series (dict): {(minute, snssai): count}, updated in place.
+    """
+    for (minute, slice_id), count in store.minute_counts("slice").items():
+        if slice_id:
+            snssai[slice_id] += count
+            bucket = (minute, slice_id)
+            slice_series[bucket] = slice_series.get(bucket, 0) + count
+
+
+def carry_over(result):
+    """
+    Return an empty result that keeps only the in-flight procedures of another.
+    """
+    return empty_result(result["nf_type"], result["fragments"], result["watermark"])
+
+
+def parse_log_range(nf_type, file_path, start, end, skip=0):
+    """
+    Parse one line-aligned byte range of an AMF or SMF log.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        file_path (str): Path to the log file.
+        start (int): Byte offset where the range begins.
+        end (int): Byte offset where the range ends.
+        skip (int): Leading decompressed bytes to leave out (see
+            read_log_range).
+
+    Returns:
+        dict: Parse result (see parse_lines).
+    """
+    return parse_lines(nf_type, read_log_range(file_path, start, end, skip=skip))
+
+
+def parse_gzip_range(nf_type, file_path, start, end):
+    """
+    Parse the lines that lie wholly inside a range of gzip members.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        file_path (str): Path to the gzip log.
+        start (int): Byte offset of the first member.
+        end (int): Byte offset where the last member ends.
+
+    Returns:
+        dict: Parse result (see parse_lines) plus the partial lines at the
+        range edges in "head" and "tail" (see GzipRangeReader).
+    """
+    reader = GzipRangeReader(file_path, start, end)
+    result = parse_lines(nf_type, (line.decode("utf-8") for line in reader))
+    result["head"] = reader.head
+    result["tail"] = reader.tail
+    return result
+
+
+def stitch_gzip_results(nf_type, results):
+    """
+    Put the lines split across gzip ranges back between the range results.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        results (iterable[dict]): Results from parse_gzip_range, in file order.
+
+    Yields:
+        dict: Parse results in file order, ready for merge_parse_results.
+    """
+    carry = b""
+    for result in results:
+        carry += result.pop("head")
+        tail = result.pop("tail")
+        if tail is None:
+            # No newline in this range; the line continues into the next one
+            yield result
+            continue
+
+        if carry:
+            yield parse_lines(nf_type, [carry.decode("utf-8")])
+        yield result
+        carry = tail
+
+    if carry:
+        yield parse_lines(nf_type, [carry.decode("utf-8")])
+
+
+def merge_parse_results(nf_type, results):
+    """
+    Merge partial parse results in file order.
+
+    Counts are summed and sketches merged; procedure fragments are
+    stitched together so a procedure that spans two ranges yields a
+    single record.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        results (iterable[dict]): Results from parse_lines, in file order;
+            their sketches and the first in-flight map are reused, not copied.
+
+    Returns:
+        dict: Merged result with the same keys as parse_lines.
+    """
+    merged = empty_result(nf_type)
+    correlator = ProcedureCorrelator(nf_type)
+
+    for index, result in enumerate(results):
+        merge_counts(merged["kpis"], result["kpis"])
+        merged["snssai"].update(result["snssai"])
+        merged["lines"] += result["lines"]
+        merged["skipped"] += result["skipped"]
+        merge_counts(merged["series"], result["series"])
+        merge_counts(merged["slice_series"], result["slice_series"])
+        merge_sketches(merged["latency"], result["latency"])
+        merge_distinct_sketches(merged["distinct_ue"], result["distinct_ue"])
+
+        correlator.records.extend(result["procedures"])
+        if index == 0:
+            # Adopt the first in-flight map rather than copying a possibly large state
+            correlator.in_flight = result["fragments"]
+            correlator.watermark = result["watermark"]
+        else:
+            correlator.absorb(result["fragments"], result["watermark"])
+
+    merged["procedures"] = correlator.take_records()
+    merged["fragments"] = correlator.in_flight
+    merged["watermark"] = correlator.watermark
+
+    return merged
+
+
+def plan_file(file_path, start, end, shard_count, skip=0):
+    """
+    Decide how to split one log for parsing.
+
+    Plain logs are split into line-aligned ranges and multi-member gzip
+    logs at member boundaries, with no range holding less than
+    MIN_RANGE_BYTES of log text (estimated for gzip, see
+    estimate_gzip_size); bz2 and xz logs, and logs read with a skip, are
+    parsed as a whole.
+
+    Returns:
+        tuple: (parse function, [(start, end)] ranges, bytes to parse)
+    """
+    if end is None:
+        end = os.path.getsize(file_path)
+    compression = detect_compression(file_path)
+
+    text_bytes = end - start
+    if compression == "gzip" and not skip:
+        text_bytes = estimate_gzip_size(file_path, start, end)
+    shard_count = max(1, min(shard_count, text_bytes // MIN_RANGE_BYTES))
+
+    if skip:
+        # Only a single range knows how many decompressed bytes precede it
+        ranges = [(start, end)]
+        parse_range = partial(parse_log_range, skip=skip)
+    elif compression == "gzip":
+        ranges = split_gzip_members(file_path, shard_count, start, end)
+        parse_range = parse_gzip_range
+    elif compression is not None:
+        ranges = [(start, end)]
+        parse_range = parse_log_range
+    else:
+        ranges = split_log_ranges(file_path, shard_count, start, end)
+        parse_range = parse_log_range
+
+    return parse_range, ranges or [(start, start)], end - start
+
+
+def timed_parse(parse_range, nf_type, file_path, start, end):
+    """
+    Run a range parser and return (seconds, result).
+    """
+    started = time.perf_counter()
+    result = parse_range(nf_type, file_path, start, end)
+    return time.perf_counter() - started, result
+
+
+def finish_file(nf_type, file_path, parse_range, timed_results, size):
+    """
+    Merge the range results of one log and describe its throughput.
+
+    Returns:
+        tuple: (merged result, file stats dict)
+    """
+    results = [result for _, result in timed_results]
+    if parse_range is parse_gzip_range:
+        results = stitch_gzip_results(nf_type, results)
+    result = merge_parse_results(nf_type, results)
+
+    seconds = sum(seconds for seconds, _ in timed_results)
+    if result["skipped"]:
+        logger.warning("Skipped %d malformed %s lines in %s", result["skipped"], nf_type, file_path)
+
+    stats = {
+        "nf_type": nf_type,
+        "path": file_path,
+        "ranges": len(timed_results),
+        "lines": result["lines"],
+        "skipped": result["skipped"],
+        "bytes": size,
+        "seconds": round(seconds, 4),
+        "lines_per_sec": round(result["lines"] / seconds, 1) if seconds else 0,
+        "bytes_per_sec": round(size / seconds, 1) if seconds else 0
+    }
+    return result, stats
+
+
+def log_file_progress(done, total, stats):
+    logger.info(
+        "[%d/%d] Parsed %s log %s: %d lines, %.1f MB in %.3fs (%.0f lines/s, %.1f MB/s)",
+        done, total, stats["nf_type"], stats["path"], stats["lines"], stats["bytes"] / MB,
+        stats["seconds"], stats["lines_per_sec"], stats["bytes_per_sec"] / MB
+    )
+
+
+def parse_log_files(log_files, workers=1, byte_ranges=None):
+    """
+    Parse a set of NF log files, on a process pool if workers > 1.
+
+    Args:
+        log_files (list[tuple[str, str]]): (NF type, file path) pairs.
+        workers (int): Number of worker processes (1 parses serially).
+        byte_ranges (dict): Optional file path → (start, end, skip)
+            limiting which bytes of each file are parsed (whole file if
+            omitted); the first skip decompressed bytes are left out.
+
+    Returns:
+        tuple: ({file path: merged result (see parse_lines)},
+                [per-file stats, in log_files order])
+    """
+    byte_ranges = byte_ranges or {}
+    if workers > 1:
+        return parse_logs_parallel(log_files, workers, byte_ranges)
+
+    results, stats = {}, []
+    for done, (nf_type, file_path) in enumerate(log_files, start=1):
+        start, end, skip = byte_ranges.get(file_path, (0, None, 0))
+        parse_range, _, size = plan_file(file_path, start, end, 1, skip)
+
+        # A single range: the whole pending part of the file
+        if end is None:
+            end = start + size
+        timed_result = timed_parse(parse_range, nf_type, file_path, start, end)
+
+        results[file_path], file_stats = finish_file(nf_type, file_path, parse_range, [timed_result], size)
+        stats.append(file_stats)
+        log_file_progress(done, len(log_files), file_stats)
+
+    return results, stats
+
+
+def parse_logs_parallel(log_files, workers, byte_ranges):
+    """
+    Parse several NF logs on a shared process pool.
+
+    Every range of every file is submitted up front, so small files run
+    side by side and large ones are split across the pool. Each file is
+    merged as soon as its last range finishes; merging within a file
+    follows file order, so the result does not depend on scheduling.
+
+    Args:
+        log_files (list[tuple[str, str]]): (NF type, file path) pairs.
+        workers (int): Number of worker processes.
+        byte_ranges (dict): File path → (start, end, skip); whole file if absent.
+
+    Returns:
+        tuple: Same as parse_log_files.
+    """
+    shard_count = workers * SHARDS_PER_WORKER
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        plans = {}
+        future_files = {}
+
+        for nf_type, file_path in log_files:
+            start, end, skip = byte_ranges.get(file_path, (0, None, 0))
+            parse_range, ranges, size = plan_file(file_path, start, end, shard_count, skip)
+            logger.info("Parsing %s log %s in %d ranges", nf_type, file_path, len(ranges))
+
+            futures = [
+                executor.submit(timed_parse, parse_range, nf_type, file_path, range_start, range_end)
+                for range_start, range_end in ranges
+            ]
+            plans[file_path] = (nf_type, parse_range, futures, size)
+            future_files.update((future, file_path) for future in futures)
+
+        remaining = {file_path: len(plan[2]) for file_path, plan in plans.items()}
+        results, stats = {}, {}
+
+        for future in as_completed(future_files):
+            file_path = future_files[future]
+            remaining[file_path] -= 1
+            if remaining[file_path]:
+                continue
+
+            nf_type, parse_range, futures, size = plans[file_path]
+            results[file_path], stats[file_path] = finish_file(
+                nf_type, file_path, parse_range, [future.result() for future in futures], size
+            )
+            log_file_progress(len(results), len(plans), stats[file_path])
+
+    return results, [stats[file_path] for _, file_path in log_files]
@@ -0,0 +1,247 @@
+"""
+Procedure correlation for the
+5G Core Analytics & Insights Platform.
+
+Events are grouped by procedure id (AMF procedure_id, SMF proc_id) and
+each finished procedure is emitted as one record with its outcome,
+end-to-end duration, step count and retries. In-flight procedures are
+held in a bounded, insertion-ordered map: idle procedures are evicted
+after a timeout measured in event time, and the least recently active
+one is evicted whenever the capacity is reached.
+"""
+
+from collections import OrderedDict
+import logging
+
+from log_parser import amf_parser, smf_parser
+
+logger = logging.getLogger(__name__)
+
+# Event-time seconds without activity before an in-flight procedure is dropped
+DEFAULT_TIMEOUT = 60.0
+
+# Upper bound on in-flight procedures held per correlator
+DEFAULT_MAX_IN_FLIGHT = 1_000_000
+
+# Outcomes assigned to procedures that never reached a terminal event
+OUTCOME_TIMEOUT = "TIMEOUT"
+OUTCOME_EVICTED = "EVICTED"
+
+# NF type → (start events, terminal event → outcome)
+PROCEDURE_EVENTS = {
+    "AMF": (amf_parser.PROCEDURE_START_EVENTS, amf_parser.PROCEDURE_OUTCOMES),
+    "SMF": (smf_parser.PROCEDURE_START_EVENTS, smf_parser.PROCEDURE_OUTCOMES)
+}
+
+# Result value marking a retried step (AMF authentication_retry)
+RETRY_RESULT = "RETRY"
+
+# Fragment layout: the partial state of one procedure
+(FIRST_TS, FIRST_LATENCY, LAST_TS, STEPS, RETRIES, STARTED, OUTCOME,
+ FIRST_STEP_SEQ, LAST_STEP_SEQ) = range(9)
+
+
+def make_record(procedure_id, fragment, outcome=None):
+    """
+    Build a procedure record from a fragment.
+
+    Duration runs from the start of the first step (its timestamp minus
+    its own latency) to the timestamp of the last step.
+
+    Returns:
+        tuple: (procedure_id, outcome, start_time, duration_ms, steps, retries)
+    """
+    start_time = fragment[FIRST_TS] - fragment[FIRST_LATENCY] / 1000
+    duration_ms = round((fragment[LAST_TS] - start_time) * 1000, 3)
+
+    return (
+        procedure_id,
+        outcome or fragment[OUTCOME],
+        start_time,
+        duration_ms,
+        fragment[STEPS],
+        fragment[RETRIES]
+    )
+
+
+def merge_fragments(earlier, later):
+    """
+    Combine two consecutive fragments of the same procedure.
+    """
+    # A step sequence that does not advance across the boundary is a retry too
+    boundary_retry = 0 < later[FIRST_STEP_SEQ] <= earlier[LAST_STEP_SEQ]
+
+    return [
+        earlier[FIRST_TS],
+        earlier[FIRST_LATENCY],
+        later[LAST_TS],
+        earlier[STEPS] + later[STEPS],
+        earlier[RETRIES] + later[RETRIES] + boundary_retry,
+        earlier[STARTED],
+        later[OUTCOME],
+        earlier[FIRST_STEP_SEQ],
+        later[LAST_STEP_SEQ]
+    ]
+
+
+class ProcedureCorrelator:
+    """
+    Streaming correlator with bounded state for one NF type.
+
+    Completed procedures are appended to `records`. Shard-local
+    correlators (require_start=True) only emit procedures whose start
+    event they saw; everything else is handed to the parent as a fragment
+    (see handoff) that it merges in file order with absorb().
+    """
+
+    def __init__(
+        self,
+        nf_type,
+        timeout=DEFAULT_TIMEOUT,
+        max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+        require_start=False):
+        self.nf_type = nf_type
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.require_start = require_start
+
+        self.start_events, self.outcomes = PROCEDURE_EVENTS[nf_type]
+        self.in_flight = OrderedDict()
+        # Shard mode: evicted fragments of procedures started before the shard,
+        # bounded by max_in_flight like in_flight
+        self.carried = OrderedDict()
+        self.records = []
+        self.watermark = 0.0
+
+    def consume(self, store):
+        """
+        Feed every event of a columnar EventStore, in order.
+
+        Args:
+            store (EventStore): Parsed events of this correlator's NF type.
+        """
+        if not len(store):
+            return
+
+        events = store.dictionaries["event"].values
+        procedures = store.dictionaries["procedure"].values
+        retry_code = store.dictionaries["result"].code(RETRY_RESULT)
+        in_flight = self.in_flight
+        outcomes = self.outcomes
+        start_events = self.start_events
+
+        rows = zip(
+            store.column("timestamp").tolist(),
+            store.column("event").tolist(),
+            store.column("procedure").tolist(),
+            store.column("latency_ms").tolist(),
+            store.column("result").tolist(),
+            store.column("step_seq").tolist()
+        )
+
+        for timestamp, event_code, procedure_code, latency, result_code, step_seq in rows:
+            procedure_id = procedures[procedure_code]
+            if not procedure_id:
+                continue
+
+            event = events[event_code]
+            fragment = in_flight.get(procedure_id)
+
+            if fragment is None:
+                fragment = [timestamp, latency, timestamp, 0, 0, event in start_events, None, step_seq, 0]
+                in_flight[procedure_id] = fragment
+            else:
+                in_flight.move_to_end(procedure_id)
+                # SMF: a step sequence that does not advance is a retried step
+                if 0 < step_seq <= fragment[LAST_STEP_SEQ]:
+                    fragment[RETRIES] += 1
+
+            # AMF: retried steps are logged with result=RETRY
+            if result_code == retry_code:
+                fragment[RETRIES] += 1
+
+            fragment[LAST_TS] = timestamp
+            fragment[STEPS] += 1
+            fragment[LAST_STEP_SEQ] = step_seq
+
+            outcome = outcomes.get(event)
+            if outcome:
+                fragment[OUTCOME] = outcome
+                if fragment[STARTED] or not self.require_start:
+                    del in_flight[procedure_id]
+                    self.records.append(make_record(procedure_id, fragment))
+
+            if timestamp > self.watermark:
+                self.watermark = timestamp
+
+        self._evict()
+
+    def absorb(self, fragments, watermark=0.0):
+        """
+        Merge fragments that follow this correlator's state in file order.
+
+        Args:
+            fragments (dict): procedure_id → fragment (e.g. from a shard).
+            watermark (float): Latest event time seen by the source.
+        """
+        in_flight = self.in_flight
+
+        for procedure_id, fragment in fragments.items():
+            earlier = in_flight.pop(procedure_id, None)
+            if earlier is not None:
+                fragment = merge_fragments(earlier, fragment)
+
+            if fragment[OUTCOME]:
+                self.records.append(make_record(procedure_id, fragment))
+            else:
+                in_flight[procedure_id] = fragment
+
+        self.watermark = max(self.watermark, watermark)
+        self._evict()
+
+    def handoff(self):
+        """
+        Return every fragment the parent still has to merge, oldest first.
+
+        Shard mode never turns a procedure it did not see start into a
+        record, even when it goes idle, because the parent holds its start.
+        """
+        fragments = self.carried
+        for procedure_id, fragment in self.in_flight.items():
+            earlier = fragments.pop(procedure_id, None)
+            fragments[procedure_id] = merge_fragments(earlier, fragment) if earlier else fragment
+
+        self.carried = OrderedDict()
+        return fragments
+
+    def take_records(self):
+        """
+        Return and clear the records emitted so far.
+        """
+        records, self.records = self.records, []
+        return records
+
+    def _evict(self):
+        in_flight = self.in_flight
+        expire_before = self.watermark - self.timeout
+
+        # Least recently active procedures sit at the front
+        while in_flight:
+            procedure_id, fragment = next(iter(in_flight.items()))
+            timed_out = fragment[LAST_TS] < expire_before
+            if not timed_out and len(in_flight) <= self.max_in_flight:
+                break
+
+            del in_flight[procedure_id]
+            if self.require_start and not fragment[STARTED]:
+                self.carried[procedure_id] = fragment
+                continue
+
+            outcome = fragment[OUTCOME] or (OUTCOME_TIMEOUT if timed_out else OUTCOME_EVICTED)
+            self.records.append(make_record(procedure_id, fragment, outcome))
+
+        # Carried fragments share the in-flight bound (e.g. logs missing start events)
+        carried = self.carried
+        while len(carried) > self.max_in_flight:
+            procedure_id, fragment = carried.popitem(last=False)
+            self.records.append(make_record(procedure_id, fragment, fragment[OUTCOME] or OUTCOME_EVICTED))
@@ -1,41 +1,48 @@
-import re
-from collections import defaultdict
-
-def parse_smf_logs(lines):
-    kpis = {
-        "pdu_session_create_request":0,
-        "pfcp_session_establishment_request":0,
-        "pfcp_session_establishment_failure":0,
-        "pfcp_session_establishment_response":0,
-        "policy_association_request":0,
-        "policy_association_response":0,
-        "policy_association_failure":0,
-        "pdu_session_est_complete":0,
-        "pdu_session_est_reject":0
-    }
-    snssai_counter=defaultdict(int)
-
-    regex_map = {
-        r"SM_CONTEXT_CREATE_REQUEST": "pdu_session_create_request",
-        r"SM_POLICY_ASSOCIATION_REQUEST": "policy_association_request",
-        r"SM_POLICY_ASSOCIATION_RESPONSE": "policy_association_response",
-        r"PFCP_SESSION_EST_REQUEST": "pfcp_session_establishment_request",
-        r"PFCP_SESSION_EST_RESPONSE": "pfcp_session_establishment_response",
-        r"PDU_SESSION_EST_COMPLETE": "pdu_session_est_complete",
-        r"PDU_SESSION_EST_REJECT": "pdu_session_est_reject",
-        r"PFCP_SESSION_EST_FAILURE": "pfcp_session_establishment_failure",
-        r"SM_POLICY_ASSOCIATION_FAILURE": "policy_association_failure",
-    }
-
-    for line in lines:
-        for pattern, key in regex_map.items():
-            match = re.search(pattern, line)
-            if match:
-                kpis[key] += 1
-            if key == "pdu_session_est_complete":
-                match_snssai = re.search(r"snssai=(\d+-[0-9A-Fa-f]+)", line)
-                if match_snssai:
-                    snssai = match_snssai.group(1)
-                    snssai_counter[snssai] += 1
-
-    return kpis, snssai_counter
+from log_parser.kpi_spec import KPI_SPECS
+
+# SMF KPI definitions compiled from kpi_spec.json
+SMF_SPEC = KPI_SPECS["SMF"]
+
+# SMF step → KPI key
+STEP_KPI_MAP = SMF_SPEC.event_kpi_map
+
+# PDU session establishment boundaries used for end-to-end correlation
+PROCEDURE_START_EVENTS = SMF_SPEC.procedure_start_events
+PROCEDURE_OUTCOMES = SMF_SPEC.procedure_outcomes
+
+
+def parse_smf_logs(lines, series=None, slice_series=None):
+    """
+    Count SMF KPIs and per-slice lines in a stream of log lines.
+
+    Args:
+        lines (iterable[str]): SMF log lines.
+        series (dict): Optional {(minute, kpi_key): count} to fill with
+            per-minute counts keyed by the event's own timestamp.
+        slice_series (dict): Optional {(minute, snssai): count} to fill
+            with per-minute slice counts.
+
+    Returns:
+        tuple: (KPI key → count, Counter of snssai → count)
+    """
+    kpis, dimensions = SMF_SPEC.parse_lines(lines, series, {"snssai": slice_series})
+    return kpis, dimensions["snssai"]
+
+
+def parse_smf_events(lines, store=None):
+    """
+    Parse SMF log lines into a columnar EventStore.
+
+    Unlike parse_smf_logs, every spec step is kept with its timestamp,
+    procedure id, step sequence, latency, result, SUPI, slice and cause,
+    so further KPIs and slices can be computed without reparsing the text.
+    The keys read are the SMF record fields of kpi_spec.json.
+
+    Args:
+        lines (iterable[str]): SMF log lines (space-separated key=value).
+        store (EventStore): Store to append to; a new one if omitted.
+
+    Returns:
+        EventStore: Store holding the parsed events.
+    """
+    return SMF_SPEC.parse_events(lines, store)
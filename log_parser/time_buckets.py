@@ -0,0 +1,136 @@
+"""
+Event-time bucketing utilities for the
+5G Core Analytics & Insights Platform.
+
+Parsers count events per minute of the log's own timestamp; those
+minute counts are rolled up into fixed 1m/5m/1h buckets for storage.
+"""
+
+from functools import lru_cache
+import time
+
+from log_parser.event_store import parse_timestamp
+
+# Bucket label → width in seconds
+BUCKET_RESOLUTIONS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600
+}
+
+# Finest resolution; minute counts map onto it one-to-one
+BASE_RESOLUTION = BUCKET_RESOLUTIONS["1m"]
+
+# Resolution of the all-time sketch rows (bucket_start 0): one row per
+# dimension and key, so all-time reads need not union every bucket
+ALL_TIME_RESOLUTION = 0
+
+
+@lru_cache(maxsize=65536)
+def minute_to_epoch(minute):
+    """
+    Convert a "YYYY-MM-DDTHH:MM" minute key into epoch seconds.
+    """
+    return int(parse_timestamp(minute))
+
+
+def merge_counts(target, counts):
+    """
+    Add one {key: count} dict into another in place.
+    """
+    for key, count in counts.items():
+        target[key] = target.get(key, 0) + count
+    return target
+
+
+def rollup_minute_counts(minute_counts, resolutions=BUCKET_RESOLUTIONS.values()):
+    """
+    Roll per-minute counts up into every bucket resolution.
+
+    Args:
+        minute_counts (dict): {(minute, *key): count} from the parsers.
+        resolutions (iterable[int]): Bucket widths in seconds.
+
+    Returns:
+        dict: {(resolution, bucket_start, *key): count}
+    """
+    buckets = {}
+
+    for (minute, *key), count in minute_counts.items():
+        epoch = minute_to_epoch(minute)
+        for resolution in resolutions:
+            bucket = (resolution, epoch - epoch % resolution, *key)
+            buckets[bucket] = buckets.get(bucket, 0) + count
+
+    return buckets
+
+
+def window_start(window_minutes, now=None):
+    """
+    Return the first 1m bucket covered by a trailing window.
+
+    Args:
+        window_minutes (int): Window length in minutes.
+        now (float): Reference time in epoch seconds (defaults to now).
+
+    Returns:
+        int: Epoch seconds of the oldest bucket in the window.
+    """
+    now = time.time() if now is None else now
+    start = int(now) - window_minutes * 60
+    return start - start % BASE_RESOLUTION
+
+
+# Step suffix → seconds, e.g. "15m", "6h", "1d"
+STEP_UNITS = {
+    "m": 60,
+    "h": 3600,
+    "d": 86400
+}
+
+
+def parse_step(step):
+    """
+    Convert a step such as "5m" or "1h" into seconds.
+
+    Raises:
+        ValueError: If the step is malformed or not a whole number of minutes.
+    """
+    count, unit = step[:-1], step[-1:]
+    if not count.isdigit() or unit not in STEP_UNITS or int(count) == 0:
+        raise ValueError(f"Invalid step '{step}', expected e.g. 1m, 15m, 1h or 1d")
+    return int(count) * STEP_UNITS[unit]
+
+
+def series_resolution(step_seconds):
+    """
+    Return the coarsest stored bucket resolution a step is a multiple of.
+    """
+    return max(
+        resolution for resolution in BUCKET_RESOLUTIONS.values()
+        if step_seconds % resolution == 0
+    )
+
+
+def parse_time(value):
+    """
+    Convert an API time parameter (epoch seconds or ISO-8601) into epoch seconds.
+
+    Raises:
+        ValueError: If the value is neither.
+    """
+    try:
+        return int(float(value))
+    except ValueError:
+        pass
+    try:
+        return int(parse_timestamp(value.replace("Z", "+00:00")))
+    except ValueError:
+        raise ValueError(f"Invalid time '{value}', expected epoch seconds or ISO-8601")
+
+
+def format_epoch(epoch):
+    """
+    Format epoch seconds as an ISO-8601 UTC timestamp.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
@@ -2,31 +2,49 @@
 Main entry point for the 5G Core Analytics & Insights Platform.
 
 Responsibilities:
-- Read AMF and SMF logs
+- Resolve the AMF and SMF log files (paths, directories, globs) to ingest
+- Stream the log bytes appended to each file since the last run
 - Parse KPIs from logs
 - Initialize database schema
-- Persist KPIs into the database
+- Persist KPIs into the database and advance ingestion checkpoints
+- Optionally keep following the logs and flush KPI deltas in micro-batches
+- Time each stage and write a JSON run report
 """
 
+import argparse
+import asyncio
 import logging
+import time
 
-from log_parser.log_reader import read_log
-from log_parser.amf_parser import parse_amf_logs
-from log_parser.smf_parser import parse_smf_logs
+from log_parser.instrumentation import RunReport
+from log_parser.log_files import NF_TYPES, group_by_instance, resolve_log_files
+from log_parser.log_follower import LogFollower
+from log_parser.log_reader import detect_compression
+from log_parser.parallel_parser import (
+    carry_over,
+    empty_result,
+    merge_parse_results,
+    parse_lines,
+    parse_log_files
+)
 
 from db.setup_db import setup_database
-from db.insert_kpis import (
-    insert_amf_kpis,
-    insert_smf_kpis,
-    insert_nssai_kpis
-)
+from db.checkpoints import get_pending_range
+from db.procedures import load_procedure_fragments
+from db.insert_kpis import KpiWriter
 
 
 # ---------------- Configuration ----------------
-AMF_LOG_PATH = "logs/amf.log"
-SMF_LOG_PATH = "logs/smf.log"
 DB_PATH = "db/5g_kpis.db"
 
+# Follow mode: flush when this many lines are pending or this many seconds passed
+FOLLOW_BATCH_LINES = 10000
+FOLLOW_FLUSH_INTERVAL = 2.0
+FOLLOW_POLL_INTERVAL = 0.5
+
+# Run reports (JSON) and parse profiles are written here
+REPORT_DIR = "reports"
+
 
 # ---------------- Logging Setup ----------------
 logging.basicConfig(
@@ -37,38 +55,341 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main():
+def parse_args():
+    """
+    Parse command-line options for the ingestion pipeline.
+    """
+    parser = argparse.ArgumentParser(description="5G Core Analytics ingestion pipeline")
+    parser.add_argument(
+        "--amf",
+        action="append",
+        metavar="PATH",
+        help="AMF log file, directory or glob; repeatable (default logs/amf.log when "
+             "no log option is given)"
+    )
+    parser.add_argument(
+        "--smf",
+        action="append",
+        metavar="PATH",
+        help="SMF log file, directory or glob; repeatable (default logs/smf.log)"
+    )
+    parser.add_argument(
+        "--logs",
+        action="append",
+        metavar="PATH",
+        help="Log file, directory or glob whose NF type is detected per file "
+             "(from its name or first line); repeatable"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of parser processes; above 1, files are parsed concurrently "
+             "and large ones are split into line-aligned byte ranges"
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep tailing the logs (like tail -F) and flush KPI deltas in micro-batches"
+    )
+    parser.add_argument(
+        "--batch-lines",
+        type=int,
+        default=FOLLOW_BATCH_LINES,
+        help="Follow mode: flush once this many new lines are pending"
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=FOLLOW_FLUSH_INTERVAL,
+        help="Follow mode: flush pending lines at least this often (seconds)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=f"{REPORT_DIR}/parse.prof",
+        default=None,
+        metavar="PATH",
+        help="Run the parse stage under cProfile and dump the stats (default "
+             f"{REPORT_DIR}/parse.prof); with --workers above 1 only the "
+             "coordinating process is profiled"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record the peak of Python allocations per stage with tracemalloc (slower)"
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        metavar="PATH",
+        help=f"Where to write the JSON run report (default {REPORT_DIR}/run-<UTC time>.json)"
+    )
+    return parser.parse_args()
+
+
+def store_result(writer, nf_type, result):
+    """
+    Persist one NF's parsed KPIs, procedures and in-flight fragments.
+
+    Args:
+        writer (KpiWriter): Open writer; its transaction also covers the
+            checkpoints of the files the result was parsed from.
+        nf_type (str): "AMF" or "SMF".
+        result (dict): Parse result (see log_parser.parallel_parser.parse_lines).
+    """
+    # Files with no new lines add nothing
+    if result["lines"]:
+        if nf_type == "AMF":
+            writer.insert_amf_kpis(result["kpis"])
+            writer.insert_kpi_buckets("amf_kpi_buckets", result["series"])
+        else:
+            writer.insert_smf_kpis(result["kpis"])
+            writer.insert_nssai_kpis(nf_type, result["snssai"])
+            writer.insert_kpi_buckets("smf_kpi_buckets", result["series"])
+            writer.insert_nssai_kpi_buckets(nf_type, result["slice_series"])
+        writer.insert_latency_sketches(nf_type, result["latency"])
+        writer.insert_distinct_ue_sketches(nf_type, result["distinct_ue"])
+
+    writer.insert_procedure_records(nf_type, result["procedures"])
+    writer.save_procedure_fragments(nf_type, result["fragments"])
+
+
+def flush_result(nf_type, result, positions):
+    """
+    Store one NF's result and its files' checkpoints in one transaction.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        result (dict): Parse result (see store_result).
+        positions (list[tuple]): (file path, inode, size, offset, fingerprint)
+            per file.
+    """
+    with KpiWriter(DB_PATH) as writer:
+        store_result(writer, nf_type, result)
+        for file_path, inode, size, offset, fingerprint in positions:
+            writer.save_checkpoint(file_path, inode=inode, size=size, offset=offset, fingerprint=fingerprint)
+
+
+async def follow_nf(nf_type, file_paths, batch_lines, flush_interval):
+    """
+    Tail every log of one NF type and flush KPI deltas in micro-batches.
+
+    The files feed one pending result, so the NF's in-flight procedures
+    are kept (and stored) in one place. A flush happens when batch_lines
+    lines are pending or flush_interval seconds have passed since the
+    last one, whichever comes first.
+    """
+    followers = [
+        LogFollower(
+            file_path,
+            start=get_pending_range(file_path, DB_PATH)["start"],
+            poll_interval=FOLLOW_POLL_INTERVAL
+        )
+        for file_path in file_paths
+    ]
+
+    pending = empty_result(nf_type, *load_procedure_fragments(nf_type, DB_PATH))
+    last_flush = time.monotonic()
+    flush_lock = asyncio.Lock()
+
+    async def flush():
+        nonlocal pending, last_flush
+        async with flush_lock:
+            if not pending["lines"]:
+                return
+
+            # Swap before awaiting so lines read meanwhile go to the next batch
+            deltas = dict(pending, kpis={key: value for key, value in pending["kpis"].items() if value})
+            positions = [
+                (follower.file_path, follower.inode, follower.size, follower.offset, follower.fingerprint)
+                for follower in followers
+                if follower.inode is not None
+            ]
+            pending = carry_over(pending)
+            last_flush = time.monotonic()
+
+            started = time.perf_counter()
+            await asyncio.to_thread(flush_result, nf_type, deltas, positions)
+            logger.info("Flushed %d %s lines from %d file(s) in %.3fs",
+                        deltas["lines"], nf_type, len(positions), time.perf_counter() - started)
+            if deltas["skipped"]:
+                logger.warning("Skipped %d malformed %s lines", deltas["skipped"], nf_type)
+
+    async def pump(follower):
+        nonlocal pending
+        async for lines in follower:
+            if lines:
+                pending = merge_parse_results(nf_type, [pending, parse_lines(nf_type, lines)])
+
+            due = time.monotonic() - last_flush >= flush_interval
+            if pending["lines"] >= batch_lines or (pending["lines"] and due):
+                await flush()
+
+    try:
+        await asyncio.gather(*(pump(follower) for follower in followers))
+
+    finally:
+        # Do not drop parsed lines on shutdown
+        await flush()
+        for follower in followers:
+            follower.close()
+
+
+async def follow(log_files, batch_lines, flush_interval):
+    """
+    Follow the logs of every NF type concurrently until cancelled.
+
+    Compressed files are rotated archives and are not followed.
+    """
+    followed = {}
+    for nf_type, file_paths in log_files.items():
+        followed[nf_type] = [
+            file_path for file_path in file_paths
+            if not detect_compression(file_path)
+        ]
+        skipped = len(file_paths) - len(followed[nf_type])
+        if skipped:
+            logger.info("Not following %d compressed %s log(s); ingest them with a batch run",
+                        skipped, nf_type)
+
+    await asyncio.gather(*(
+        follow_nf(nf_type, file_paths, batch_lines, flush_interval)
+        for nf_type, file_paths in followed.items()
+        if file_paths
+    ))
+
+
+def main(workers=1, follow_logs=False,
+         batch_lines=FOLLOW_BATCH_LINES, flush_interval=FOLLOW_FLUSH_INTERVAL,
+         profile_path=None, trace_memory=False, report_path=None,
+         amf=None, smf=None, logs=None):
     """
     Execute the KPI ingestion and persistence workflow.
+
+    Args:
+        workers (int): Number of parser processes (1 parses serially).
+        follow_logs (bool): Keep tailing the logs instead of exiting.
+        batch_lines (int): Follow mode flush size in lines.
+        flush_interval (float): Follow mode flush interval in seconds.
+        profile_path (str): Dump cProfile stats of the parse stage here.
+        trace_memory (bool): Record tracemalloc peaks per stage.
+        report_path (str): JSON run report path (defaults to a
+            timestamped file in REPORT_DIR).
+        amf (list[str]): AMF log paths, directories or globs.
+        smf (list[str]): SMF log paths, directories or globs.
+        logs (list[str]): Paths, directories or globs of logs of either
+            NF type (see log_parser.log_files.resolve_log_files).
     """
     logger.info("Starting 5G Core Analytics pipeline")
 
+    report = RunReport(
+        "follow" if follow_logs else "batch",
+        trace_memory=trace_memory,
+        workers=workers
+    )
+    if report_path is None:
+        report_path = f"{REPORT_DIR}/run-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}.json"
+
     # Initialize database
-    setup_database(db_path=DB_PATH)
+    with report.stage("setup"):
+        setup_database(db_path=DB_PATH)
     logger.info("Database initialized successfully")
 
-    # Read log files
-    amf_log_lines = read_log(AMF_LOG_PATH)
-    smf_log_lines = read_log(SMF_LOG_PATH)
-    logger.info("Log files loaded (AMF=%d lines, SMF=%d lines)",
-                len(amf_log_lines), len(smf_log_lines))
+    log_files = resolve_log_files(amf, smf, logs)
+    file_list = [(nf_type, file_path) for nf_type in NF_TYPES for file_path in log_files[nf_type]]
+
+    if follow_logs:
+        # Flush timings are logged per micro-batch; the report covers setup only
+        report.finish(report_path)
+        logger.info("Following logs (batch=%d lines, interval=%.1fs)", batch_lines, flush_interval)
+        try:
+            asyncio.run(follow(log_files, batch_lines, flush_interval))
+        except KeyboardInterrupt:
+            logger.info("Follow mode stopped")
+        return
 
-    # Parse KPIs
-    amf_kpis = parse_amf_logs(amf_log_lines)
-    smf_kpis, nssai_kpis = parse_smf_logs(smf_log_lines)
+    # Work out which bytes were appended since the last run
+    with report.stage("checkpoint"):
+        pending = {
+            file_path: get_pending_range(file_path, DB_PATH)
+            for _, file_path in file_list
+        }
+    byte_ranges = {
+        file_path: (pending_range["start"], pending_range["end"], pending_range["skip"])
+        for file_path, pending_range in pending.items()
+    }
+
+    # Parse KPIs; logs are streamed, so reading is part of this stage
+    with report.stage("parse", profile_path=profile_path) as stage:
+        if workers > 1:
+            logger.info("Parsing %d log file(s) on %d worker processes", len(file_list), workers)
+        parsed, file_stats = parse_log_files(file_list, workers, byte_ranges)
+        stage["lines"] = sum(result["lines"] for result in parsed.values())
+        stage["bytes"] = sum(end - start for start, end, _ in byte_ranges.values())
+    report.add_files(file_stats)
+
+    # Continue procedures left in flight by the previous run, then follow
+    # each NF instance through its rotated files in order
+    with report.stage("correlate"):
+        results = {
+            nf_type: merge_parse_results(nf_type, [
+                empty_result(nf_type, *load_procedure_fragments(nf_type, DB_PATH)),
+                *(
+                    merge_parse_results(nf_type, [parsed[file_path] for file_path in instance_files])
+                    for instance_files in group_by_instance(log_files[nf_type])
+                )
+            ])
+            for nf_type in NF_TYPES
+        }
+
+    amf_kpis = results["AMF"]["kpis"]
+    smf_kpis = results["SMF"]["kpis"]
+    nssai_kpis = results["SMF"]["snssai"]
+
+    logger.info("Log files loaded (AMF=%d lines, SMF=%d lines)",
+                results["AMF"]["lines"], results["SMF"]["lines"])
 
     logger.info("Parsed AMF KPIs: %s", amf_kpis)
     logger.info("Parsed SMF KPIs: %s", smf_kpis)
     logger.info("Parsed NSSAI KPIs: %s", nssai_kpis)
+    logger.info("Correlated procedures (AMF=%d, SMF=%d, in flight AMF=%d, SMF=%d)",
+                len(results["AMF"]["procedures"]), len(results["SMF"]["procedures"]),
+                len(results["AMF"]["fragments"]), len(results["SMF"]["fragments"]))
 
-    # Persist KPIs
-    insert_amf_kpis(amf_kpis)
-    insert_smf_kpis(smf_kpis)
-    insert_nssai_kpis(nf="SMF", nssai_kpis=nssai_kpis)
+    # Persist KPIs and advance checkpoints in one transaction
+    with report.stage("store") as stage:
+        with KpiWriter(DB_PATH) as writer:
+            for nf_type in NF_TYPES:
+                store_result(writer, nf_type, results[nf_type])
+            for file_path, pending_range in pending.items():
+                writer.save_checkpoint(
+                    file_path,
+                    inode=pending_range["inode"],
+                    size=pending_range["size"],
+                    offset=pending_range["end"],
+                    fingerprint=pending_range["fingerprint"],
+                    compression=pending_range["compression"],
+                    moved_from=pending_range["moved_from"]
+                )
+        stage["rows"] = writer.rows
 
     logger.info("All KPIs successfully stored in database")
+    report.finish(report_path)
     logger.info("5G Core Analytics pipeline completed")
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(
+        workers=args.workers,
+        follow_logs=args.follow,
+        batch_lines=args.batch_lines,
+        flush_interval=args.flush_interval,
+        profile_path=args.profile,
+        trace_memory=args.trace_memory,
+        report_path=args.report,
+        amf=args.amf,
+        smf=args.smf,
+        logs=args.logs
+    )
@@ -1,9 +1,25 @@
+import asyncio
 import logging
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from db.connection_pool import read_pool
+from server.response_cache import ResponseCache, etag_matches
 from db.db_summary import get_kpi_summary_from_db
 from db.amf_kpis import fetch_amf_kpis
 from db.smf_kpis import fetch_smf_kpis
 from db.nssai_kpis import fetch_nssai_kpis
+from db.procedures import fetch_procedure_latency
+from db.latency import fetch_latency_percentiles, fetch_latency_sketches
+from db.distinct_ue import fetch_distinct_ue
+from db.dashboard import DASHBOARD_SECTIONS, fetch_dashboard
+from db.kpi_series import DEFAULT_PAGE_STEPS, MAX_PAGE_STEPS, fetch_kpi_series
+from db.export import EXPORT_DATASETS, build_export_query, iter_export_batches
+from server.export_formats import EXPORT_FORMATS, encode_export
+from server.live_updates import KpiBroadcaster
+from server.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
 from server.amf_kpi_calculator import calculate_amf_rates
 from server.smf_kpi_calculator import calculate_smf_rates
 
@@ -15,7 +31,96 @@ logging.basicConfig(
 )
 
 # -------------------- FastAPI --------------------
-app = FastAPI(title="5G Core Analytics API")
+@asynccontextmanager
+async def lifespan(app):
+    # Handlers borrow pooled read connections instead of opening one per request
+    with read_pool() as pool:
+        app.state.read_pool = pool
+
+        # One task computes live KPI updates for every /live subscriber,
+        # another rebuilds the /metrics registry after each ingestion commit
+        tasks = [
+            asyncio.create_task(broadcaster.run()),
+            asyncio.create_task(metrics_registry.run(compute_metrics))
+        ]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+
+app = FastAPI(title="5G Core Analytics API", lifespan=lifespan)
+
+def error_response(message, status_code):
+    # Failures keep the {"error": ...} body, with a status so they are never cached
+    return JSONResponse({"error": message}, status_code=status_code)
+
+# Pushes dashboard deltas to /live subscribers after each ingestion commit
+broadcaster = KpiBroadcaster(lambda: build_dashboard())
+
+# Prometheus metrics, served from memory
+metrics_registry = MetricsRegistry()
+
+def compute_metrics():
+    latency = {nf: fetch_latency_sketches(nf) for nf in ("AMF", "SMF")}
+    return build_dashboard(), latency
+
+# -------------------- Response Cache --------------------
+# Endpoints whose responses only change when new data is ingested
+CACHED_PATHS = {
+    "/summary", "/amf", "/smf", "/snssai", "/dashboard",
+    "/amf/latency", "/smf/latency", "/ran", "/procedures"
+}
+
+response_cache = ResponseCache()
+
+@app.middleware("http")
+async def cache_responses(request: Request, call_next):
+    if request.method != "GET" or request.url.path not in CACHED_PATHS:
+        return await call_next(request)
+
+    generation = await response_cache.generation()
+    if generation is None:
+        return await call_next(request)
+
+    params = request.query_params
+    key = (request.url.path, tuple(sorted(params.multi_items())))
+    if "window_minutes" in params or (SERIES_PARAMS & params.keys() and "to" not in params):
+        # Trailing windows and ranges ending now also move with the clock
+        key += (int(time.time() // 60),)
+
+    cached = response_cache.get(key, generation)
+    if cached is None:
+        # Concurrent misses for the same key wait for one computation
+        async with response_cache.fill_lock(key):
+            cached = response_cache.get(key, generation)
+            if cached is None:
+                response = await call_next(request)
+                body = b"".join([chunk async for chunk in response.body_iterator])
+
+                # Only successful responses are cached and tagged
+                if response.status_code != 200:
+                    return Response(body, status_code=response.status_code, headers=dict(response.headers))
+
+                media_type = response.headers.get("content-type")
+                cached = (response_cache.put(key, generation, body, media_type), body, media_type)
+
+    etag, body, media_type = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+@app.get("/health")
+def health():
+    healthy = app.state.read_pool.health_check()
+    return {"status": "ok" if healthy else "unavailable", "database": healthy}
+
+@app.get("/metrics")
+def metrics():
+    # Rendered when data is ingested; a scrape never queries the database
+    return Response(metrics_registry.exposition(), media_type=METRICS_CONTENT_TYPE)
 
 @app.get("/summary")
 def summary():
@@ -25,13 +130,45 @@ def summary():
         return data
     except Exception:
         logger.exception("Failed to fetch summary")
-        return {"error": "Failed to fetch KPI summary"}
+        return error_response("Failed to fetch KPI summary", 500)
+
+# Trailing event-time window, e.g. ?window_minutes=15 for the last 15 minutes
+WINDOW_QUERY = Query(None, ge=1, description="Only count events from the last N minutes")
+
+# Time series instead of totals, e.g. ?from=2026-01-01T00:00:00Z&to=2026-01-08T00:00:00Z&step=1m;
+# long ranges are paged, pass the returned "next" as ?cursor= for the following page;
+# /snssai?slice= alone is also a series ending now
+SERIES_PARAMS = {"from", "to", "step", "cursor", "slice"}
+FROM_QUERY = Query(None, alias="from", description="Series start, epoch seconds or ISO-8601")
+TO_QUERY = Query(None, alias="to", description="Series end (exclusive), defaults to now")
+STEP_QUERY = Query(None, description="Series step, e.g. 1m, 15m, 1h, 1d (default 1m)")
+CURSOR_QUERY = Query(None, description="'next' value of the previous page")
+LIMIT_QUERY = Query(DEFAULT_PAGE_STEPS, ge=1, le=MAX_PAGE_STEPS, description="Steps per page")
+
+def get_kpi_series(source, start, end, step, cursor, limit, slice_id=None):
+    try:
+        return fetch_kpi_series(source, start, end, step or "1m", cursor, limit, slice_id)
+    except ValueError as e:
+        logger.warning("Invalid %s series request: %s", source, e)
+        return error_response(str(e), 400)
+    except Exception:
+        logger.exception("Failed to fetch %s KPI series", source)
+        return error_response(f"Failed to fetch {source} KPI series", 500)
 
 @app.get("/amf")
-def get_amf_metrics():
-    logger.info("Request received: /amf")
+def get_amf_metrics(
+    window_minutes: Optional[int] = WINDOW_QUERY,
+    start: Optional[str] = FROM_QUERY,
+    end: Optional[str] = TO_QUERY,
+    step: Optional[str] = STEP_QUERY,
+    cursor: Optional[int] = CURSOR_QUERY,
+    limit: int = LIMIT_QUERY
+):
+    logger.info("Request received: /amf (window_minutes=%s)", window_minutes)
+    if any(param is not None for param in (start, end, step, cursor)):
+        return get_kpi_series("AMF", start, end, step, cursor, limit)
     try:
-        kpis = fetch_amf_kpis()
+        kpis = fetch_amf_kpis(window_minutes=window_minutes)
         if not kpis:
             logger.warning("No AMF KPI data available")
             return {"message": "No AMF KPI data available"}
@@ -40,13 +177,35 @@ def get_amf_metrics():
         return {"kpis": kpis, "rates": rates}
     except Exception:
         logger.exception("Failed to fetch AMF KPIs")
-        return {"error": "Failed to fetch AMF KPI data"}
+        return error_response("Failed to fetch AMF KPI data", 500)
+
+@app.get("/amf/latency")
+def get_amf_latency(window_minutes: Optional[int] = WINDOW_QUERY):
+    logger.info("Request received: /amf/latency (window_minutes=%s)", window_minutes)
+    try:
+        latency = fetch_latency_percentiles("AMF", window_minutes=window_minutes)
+        if not latency:
+            logger.warning("No AMF latency data available")
+            return {"message": "No AMF latency data available"}
+        return latency
+    except Exception:
+        logger.exception("Failed to fetch AMF latency")
+        return error_response("Failed to fetch AMF latency data", 500)
 
 @app.get("/smf")
-def get_smf_metrics():
-    logger.info("Request received: /smf")
+def get_smf_metrics(
+    window_minutes: Optional[int] = WINDOW_QUERY,
+    start: Optional[str] = FROM_QUERY,
+    end: Optional[str] = TO_QUERY,
+    step: Optional[str] = STEP_QUERY,
+    cursor: Optional[int] = CURSOR_QUERY,
+    limit: int = LIMIT_QUERY
+):
+    logger.info("Request received: /smf (window_minutes=%s)", window_minutes)
+    if any(param is not None for param in (start, end, step, cursor)):
+        return get_kpi_series("SMF", start, end, step, cursor, limit)
     try:
-        kpis = fetch_smf_kpis()
+        kpis = fetch_smf_kpis(window_minutes=window_minutes)
         if not kpis:
             logger.warning("No SMF KPI data available")
             return {"message": "No SMF KPI data available"}
@@ -55,13 +214,149 @@ def get_smf_metrics():
         return {"kpis": kpis, "rates": rates}
     except Exception:
         logger.exception("Failed to fetch SMF KPIs")
-        return {"error": "Failed to fetch SMF KPI data"}
+        return error_response("Failed to fetch SMF KPI data", 500)
+
+@app.get("/smf/latency")
+def get_smf_latency(window_minutes: Optional[int] = WINDOW_QUERY):
+    logger.info("Request received: /smf/latency (window_minutes=%s)", window_minutes)
+    try:
+        latency = fetch_latency_percentiles("SMF", window_minutes=window_minutes)
+        if not latency:
+            logger.warning("No SMF latency data available")
+            return {"message": "No SMF latency data available"}
+        return latency
+    except Exception:
+        logger.exception("Failed to fetch SMF latency")
+        return error_response("Failed to fetch SMF latency data", 500)
 
 @app.get("/snssai")
-def get_snssai_metrics():
+def get_snssai_metrics(
+    start: Optional[str] = FROM_QUERY,
+    end: Optional[str] = TO_QUERY,
+    step: Optional[str] = STEP_QUERY,
+    cursor: Optional[int] = CURSOR_QUERY,
+    limit: int = LIMIT_QUERY,
+    slice_id: Optional[str] = Query(None, alias="slice", description="Only this S-NSSAI, e.g. 1-000001")
+):
     logger.info("Request received: /snssai")
+    if any(param is not None for param in (start, end, step, cursor, slice_id)):
+        return get_kpi_series("SNSSAI", start, end, step, cursor, limit, slice_id)
     try:
         return fetch_nssai_kpis()
     except Exception:
         logger.exception("Failed to fetch NSSAI KPIs")
-        return {"error": "Failed to fetch NSSAI KPI data"}
+        return error_response("Failed to fetch NSSAI KPI data", 500)
+
+@app.get("/ran")
+def get_ran_metrics(window_minutes: Optional[int] = WINDOW_QUERY):
+    logger.info("Request received: /ran (window_minutes=%s)", window_minutes)
+    try:
+        unique_ue = fetch_distinct_ue("AMF", "ran_id", window_minutes=window_minutes)
+        if not unique_ue:
+            logger.warning("No gNB data available")
+            return {"message": "No gNB data available"}
+        return unique_ue
+    except Exception:
+        logger.exception("Failed to fetch gNB unique UEs")
+        return error_response("Failed to fetch gNB data", 500)
+
+@app.get("/procedures")
+def get_procedure_latency():
+    logger.info("Request received: /procedures")
+    try:
+        return fetch_procedure_latency()
+    except Exception:
+        logger.exception("Failed to fetch procedure latency")
+        return error_response("Failed to fetch procedure latency data", 500)
+
+# Comma-separated subset of DASHBOARD_SECTIONS, e.g. ?fields=summary,snssai
+FIELDS_QUERY = Query(None, description="Comma-separated sections: " + ", ".join(DASHBOARD_SECTIONS))
+
+def build_dashboard(sections=DASHBOARD_SECTIONS):
+    data = fetch_dashboard(sections)
+    if "amf" in data:
+        data["amf"] = {"kpis": data["amf"], "rates": calculate_amf_rates(data["amf"])}
+    if "smf" in data:
+        data["smf"] = {"kpis": data["smf"], "rates": calculate_smf_rates(data["smf"])}
+    return data
+
+@app.get("/dashboard")
+def get_dashboard(fields: Optional[str] = FIELDS_QUERY):
+    logger.info("Request received: /dashboard (fields=%s)", fields)
+
+    sections = [field.strip() for field in fields.split(",") if field.strip()] if fields else DASHBOARD_SECTIONS
+    unknown = sorted(set(sections) - set(DASHBOARD_SECTIONS))
+    if unknown:
+        logger.warning("Unknown dashboard fields requested: %s", unknown)
+        return error_response(f"Unknown dashboard fields: {', '.join(unknown)}", 400)
+
+    try:
+        return build_dashboard(sections)
+    except Exception:
+        logger.exception("Failed to fetch dashboard")
+        return error_response("Failed to fetch dashboard data", 500)
+
+# Seconds of silence after which a comment line keeps idle connections open
+LIVE_KEEPALIVE = 15.0
+
+@app.get("/live")
+async def live_updates(request: Request):
+    """
+    Server-Sent Events stream of the /dashboard data.
+
+    The first event is a "snapshot" of every section; each ingestion
+    commit then sends a "delta" holding only the values that changed
+    (null for removed keys). A client that falls behind receives a new
+    "snapshot" instead of the deltas it missed.
+    """
+    logger.info("Request received: /live")
+    queue = await broadcaster.subscribe()
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), LIVE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+        finally:
+            broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    export_format: str = Query("ndjson", alias="format", description="ndjson or csv"),
+    gzip: bool = Query(False, description="Gzip-compress the download"),
+    resolution: str = Query("1m", description="Bucket resolution of *_series exports"),
+    start: Optional[str] = FROM_QUERY,
+    end: Optional[str] = TO_QUERY
+):
+    logger.info("Request received: /export/%s (format=%s, gzip=%s)", dataset, export_format, gzip)
+
+    if export_format not in EXPORT_FORMATS:
+        return error_response(
+            f"Unknown export format '{export_format}', expected one of: {', '.join(EXPORT_FORMATS)}", 400
+        )
+    try:
+        columns, sql, params = build_export_query(dataset, resolution, start, end)
+    except ValueError as e:
+        logger.warning("Invalid export request: %s", e)
+        return error_response(str(e), 404 if dataset not in EXPORT_DATASETS else 400)
+
+    # Rows are read and encoded batch by batch while the response is sent
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{dataset}.{extension}"
+    if gzip:
+        media_type, filename = "application/gzip", filename + ".gz"
+
+    return StreamingResponse(
+        encode_export(columns, iter_export_batches(columns, sql, params), export_format, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
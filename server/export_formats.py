@@ -0,0 +1,79 @@
+"""
+Streaming encoders for the /export endpoints.
+
+Each encoder turns batches of rows into chunks of bytes as they arrive,
+so an export never has to be held in memory.
+"""
+
+import csv
+import io
+import json
+import zlib
+
+# Format → (media type, file extension)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv")
+}
+
+# zlib window bits for a gzip container
+GZIP_WBITS = 31
+
+
+def ndjson_chunks(columns, batches):
+    """
+    Encode each row as one JSON object per line.
+    """
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n"
+            for row in rows
+        ).encode()
+
+
+def csv_chunks(columns, batches):
+    """
+    Encode rows as CSV with a header line.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compress a stream of byte chunks into one gzip stream.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_export(columns, batches, export_format, gzip=False):
+    """
+    Build the byte stream of an export.
+
+    Args:
+        columns (tuple): Column names.
+        batches (iterable[list[tuple]]): Row batches.
+        export_format (str): Key of EXPORT_FORMATS.
+        gzip (bool): Compress the stream.
+
+    Returns:
+        iterator[bytes]: Chunks to send.
+    """
+    encode = ndjson_chunks if export_format == "ndjson" else csv_chunks
+    chunks = encode(columns, batches)
+    return gzip_chunks(chunks) if gzip else chunks
@@ -0,0 +1,151 @@
+"""
+Live KPI updates for the
+5G Core Analytics & Insights Platform API.
+
+One background task watches the ingestion generation. When an ingestion
+commits, it recomputes the dashboard once, diffs it against the previous
+snapshot and fans the encoded delta out to every subscriber, so the
+database load does not grow with the number of viewers.
+
+Each subscriber has a bounded queue. A consumer that falls behind has
+its backlog replaced by one full snapshot, so it catches up in a single
+event instead of buffering deltas without limit.
+"""
+
+import asyncio
+import json
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from db.ingestion_generation import fetch_ingestion_generation
+
+logger = logging.getLogger(__name__)
+
+# Seconds between ingestion generation checks while anyone is subscribed
+POLL_INTERVAL = 1.0
+
+# Events buffered per subscriber before it is resynced with a snapshot
+SUBSCRIBER_QUEUE_SIZE = 16
+
+
+def compute_delta(old, new):
+    """
+    Return the parts of `new` that differ from `old`.
+
+    Nested dicts are diffed recursively; keys missing from `new` map to None.
+
+    Returns:
+        dict: Changed values only (empty if nothing changed).
+    """
+    delta = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = compute_delta(previous, value)
+            if nested:
+                delta[key] = nested
+        elif value != previous or key not in old:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+
+def format_event(event, generation, data):
+    """
+    Encode one Server-Sent Event.
+    """
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"event: {event}\nid: {generation}\ndata: {payload}\n\n".encode()
+
+
+class KpiBroadcaster:
+    """
+    Publishes KPI snapshots and deltas to live subscribers.
+    """
+
+    def __init__(self, compute, poll_interval=POLL_INTERVAL):
+        """
+        Args:
+            compute (callable): Blocking function returning the current
+                KPI state as a JSON-serializable dict.
+            poll_interval (float): Seconds between generation checks.
+        """
+        self.compute = compute
+        self.poll_interval = poll_interval
+
+        self.subscribers = set()
+        self.generation = None
+        self.state = None
+        self.snapshot_event = None
+
+        # run() and subscribe() both refresh; only one may diff and publish at a time
+        self._refresh_lock = asyncio.Lock()
+
+    async def _refresh(self):
+        # One computation per ingestion commit, however many subscribers.
+        # The generation is checked under the lock, so a refresh that waited
+        # for another one sees its result instead of publishing it again.
+        async with self._refresh_lock:
+            generation = await run_in_threadpool(fetch_ingestion_generation)
+            if generation is None or generation == self.generation:
+                return
+
+            state = await run_in_threadpool(self.compute)
+            previous, self.generation, self.state = self.state, generation, state
+            self.snapshot_event = format_event("snapshot", generation, state)
+
+            # Subscribers only exist once a snapshot has been taken
+            delta = compute_delta(previous, state) if previous is not None else None
+            if delta:
+                self._publish(format_event("delta", generation, delta))
+                logger.info("Published KPI delta for generation %s to %d subscribers",
+                            generation, len(self.subscribers))
+
+    def _publish(self, event):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and resync it with the latest snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self.snapshot_event)
+                logger.warning("Live subscriber fell behind; resyncing with a snapshot")
+
+    async def run(self):
+        """
+        Watch for ingestion commits until cancelled.
+        """
+        while True:
+            if self.subscribers:
+                try:
+                    await self._refresh()
+                except Exception:
+                    logger.exception("Failed to refresh live KPI state")
+            await asyncio.sleep(self.poll_interval)
+
+    async def subscribe(self):
+        """
+        Register a subscriber, seeded with the current snapshot.
+
+        Returns:
+            asyncio.Queue: Encoded events for this subscriber.
+        """
+        await self._refresh()
+
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self.snapshot_event is not None:
+            queue.put_nowait(self.snapshot_event)
+        self.subscribers.add(queue)
+
+        logger.info("Live subscriber connected (%d total)", len(self.subscribers))
+        return queue
+
+    def unsubscribe(self, queue):
+        """
+        Remove a subscriber.
+        """
+        self.subscribers.discard(queue)
+        logger.info("Live subscriber disconnected (%d total)", len(self.subscribers))
@@ -0,0 +1,186 @@
+"""
+Prometheus metrics for the
+5G Core Analytics & Insights Platform API.
+
+The KPI counters, success rates and latency histograms are kept in an
+in-memory registry. A background task rebuilds it once per ingestion
+commit, and each scrape returns the last rendered text, so Prometheus
+never causes a database query.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from db.ingestion_generation import fetch_ingestion_generation
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prefix of every exported metric
+NAMESPACE = "fivegc"
+
+# Seconds between ingestion generation checks
+POLL_INTERVAL = 1.0
+
+# Upper bounds (milliseconds) of the exported latency histogram buckets
+LATENCY_BOUNDS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def format_value(value):
+    """
+    Format a sample value; integral floats are written without a fraction.
+    """
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def escape_label_value(value):
+    """
+    Escape a label value for the text format.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels):
+    """
+    Format a label set as {name="value",...}.
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def metric_label(text):
+    """
+    Turn a display name such as "Registration Success Rate" into "registration_success".
+    """
+    text = re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+    return text[:-len("_rate")] if text.endswith("_rate") else text
+
+
+class MetricsRegistry:
+    """
+    Metric families rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self.generation = None
+        self._families = {}
+        self._text = b""
+        self._lock = threading.Lock()
+
+    def set_family(self, name, metric_type, help_text, samples):
+        """
+        Replace one metric family.
+
+        Args:
+            name (str): Metric name without NAMESPACE.
+            metric_type (str): "counter", "gauge" or "histogram".
+            help_text (str): HELP line.
+            samples (list[tuple]): (name suffix, labels dict, value).
+        """
+        self._families[f"{NAMESPACE}_{name}"] = (metric_type, help_text, samples)
+
+    def render(self):
+        """
+        Render every family and keep the text for scrapes.
+        """
+        lines = []
+        for name, (metric_type, help_text, samples) in sorted(self._families.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+
+        text = ("\n".join(lines) + "\n").encode()
+        with self._lock:
+            self._text = text
+
+    def exposition(self):
+        """
+        Return the last rendered text; never touches the database.
+        """
+        with self._lock:
+            return self._text
+
+    def update(self, generation, dashboard, latency):
+        """
+        Rebuild every family from freshly computed KPIs.
+
+        Args:
+            generation (int): Ingestion generation the data belongs to.
+            dashboard (dict): /dashboard payload (summary, amf, smf, snssai).
+            latency (dict): {nf: {(dimension, key): LatencySketch}}.
+        """
+        for nf in ("amf", "smf"):
+            self.set_family(
+                f"{nf}_events_total", "counter", f"{nf.upper()} procedure events by KPI.",
+                [("", {"kpi": kpi}, value) for kpi, value in sorted(dashboard[nf]["kpis"].items())]
+            )
+            self.set_family(
+                f"{nf}_rate_percent", "gauge", f"{nf.upper()} success and failure rates in percent.",
+                [("", {"rate": metric_label(rate)}, value) for rate, value in dashboard[nf]["rates"].items()]
+            )
+
+        slices = sorted(dashboard["snssai"].items())
+        self.set_family(
+            "slice_sessions_total", "counter", "PDU sessions per network slice.",
+            [("", {"snssai": data["nssai"], "slice_type": name}, data["sessions"]) for name, data in slices]
+        )
+        self.set_family(
+            "slice_unique_ues", "gauge", "Estimated distinct UEs per network slice (HyperLogLog).",
+            [("", {"snssai": data["nssai"], "slice_type": name}, data["unique_ue"]) for name, data in slices]
+        )
+
+        for nf, sketches in latency.items():
+            families = {}
+            for (dimension, key), sketch in sorted(sketches.items()):
+                samples = families.setdefault(dimension, [])
+                labels = {dimension: key}
+                for bound, count in zip(LATENCY_BOUNDS_MS, sketch.cumulative_counts(LATENCY_BOUNDS_MS)):
+                    samples.append(("_bucket", {**labels, "le": format_value(float(bound))}, count))
+                samples.append(("_bucket", {**labels, "le": "+Inf"}, sketch.count))
+                samples.append(("_sum", labels, round(sketch.approximate_sum(), 3)))
+                samples.append(("_count", labels, sketch.count))
+
+            for dimension, samples in families.items():
+                self.set_family(
+                    f"{nf.lower()}_{dimension}_latency_milliseconds", "histogram",
+                    f"{nf} latency by {dimension} in milliseconds.", samples
+                )
+
+        self.set_family("ingestion_generation", "gauge", "Ingestion commits seen by the API.",
+                        [("", {}, generation)])
+        self.set_family("metrics_refresh_timestamp_seconds", "gauge",
+                        "Unix time the metrics were last rebuilt.", [("", {}, round(time.time(), 3))])
+
+        self.generation = generation
+        self.render()
+
+    async def run(self, compute, poll_interval=POLL_INTERVAL):
+        """
+        Rebuild the registry after every ingestion commit until cancelled.
+
+        Args:
+            compute (callable): Blocking function returning (dashboard, latency)
+                as taken by update.
+            poll_interval (float): Seconds between generation checks.
+        """
+        while True:
+            try:
+                generation = await run_in_threadpool(fetch_ingestion_generation)
+                if generation is not None and generation != self.generation:
+                    dashboard, latency = await run_in_threadpool(compute)
+                    self.update(generation, dashboard, latency)
+                    logger.info("Metrics rebuilt for ingestion generation %s", generation)
+            except Exception:
+                logger.exception("Failed to rebuild metrics")
+            await asyncio.sleep(poll_interval)
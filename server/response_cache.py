@@ -0,0 +1,131 @@
+"""
+Response cache for the 5G Core Analytics API.
+
+KPI responses only change when main.py ingests, so they are cached per
+endpoint and query string and tagged with the ingestion generation they
+were computed at. A cached response is reused until the generation moves
+on. The generation itself is re-read at most every GENERATION_TTL
+seconds, so most repeat polls are answered without touching SQLite.
+"""
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+import hashlib
+import threading
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from db.ingestion_generation import fetch_ingestion_generation
+
+# Seconds a read of the ingestion generation is trusted
+GENERATION_TTL = 1.0
+
+# Cached responses kept (least recently used are dropped first)
+MAX_ENTRIES = 512
+
+
+def make_etag(generation, body):
+    """
+    Build a strong ETag for a response body computed at a generation.
+    """
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    return f'"{generation}-{digest}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Check an If-None-Match header value against an ETag.
+    """
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of response bodies, invalidated by generation.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, generation_ttl=GENERATION_TTL):
+        self.max_entries = max_entries
+        self.generation_ttl = generation_ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation_read_at = float("-inf")
+
+        # One in-flight computation per key; concurrent misses wait for it.
+        # key → [lock, requests holding or waiting for it]
+        self._fill_locks = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    async def generation(self):
+        """
+        Return the current ingestion generation (re-read at most every TTL).
+
+        The read borrows a pooled connection, which can wait while the pool
+        is exhausted, so it runs in the thread pool, off the event loop.
+        """
+        now = time.monotonic()
+        if now - self._generation_read_at >= self.generation_ttl:
+            self._generation = await run_in_threadpool(fetch_ingestion_generation)
+            self._generation_read_at = now
+        return self._generation
+
+    def get(self, key, generation):
+        """
+        Return the cached (etag, body, media_type) for a key, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def put(self, key, generation, body, media_type):
+        """
+        Cache a response body; returns its ETag.
+        """
+        etag = make_etag(generation, body)
+        with self._lock:
+            self._entries[key] = (generation, etag, body, media_type)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    @asynccontextmanager
+    async def fill_lock(self, key):
+        """
+        Hold the fill lock of a key while its response is computed.
+
+        The lock is dropped once released by the last request holding or
+        waiting for it, so a later miss never gets a second lock for a
+        key that is still being filled. Only used on the event loop.
+        """
+        entry = self._fill_locks.get(key)
+        if entry is None:
+            entry = self._fill_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._fill_locks[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation_read_at = float("-inf")
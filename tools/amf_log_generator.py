@@ -4,12 +4,13 @@ import uuid
 import random
 from datetime import datetime, timedelta
 
-def generate_registration_with_retry(start_log_id=1, max_retries=1):
-    procedure_id = f"reg-{uuid.uuid4().hex[:6]}"
-    ue_id = f"imsi-00101{random.randint(100000000, 999999999)}"
-    ran_id = f"gnb-{random.randint(100, 199)}"
+def generate_registration_with_retry(start_log_id=1, max_retries=1, rng=random, start_time=None, procedure_id=None):
+    # rng, start_time and procedure_id make the output reproducible
+    procedure_id = procedure_id or f"reg-{uuid.uuid4().hex[:6]}"
+    ue_id = f"imsi-00101{rng.randint(100000000, 999999999)}"
+    ran_id = f"gnb-{rng.randint(100, 199)}"
 
-    base_time = datetime.utcnow()
+    base_time = start_time or datetime.utcnow()
     logs = []
     log_id = start_log_id
     current_time = base_time
@@ -38,38 +39,39 @@ def generate_registration_with_retry(start_log_id=1, max_retries=1):
     add_log("registration_request", "SUCCESS", latency=6)
 
     # Step 2: Authentication Request
-    add_log("authentication_request", "SUCCESS", latency=random.randint(10, 18))
+    add_log("authentication_request", "SUCCESS", latency=rng.randint(10, 18))
 
     # Step 3: Authentication Failure(s)
     for retry in range(1, max_retries + 1):
         add_log(
             event="authentication_failure",
             result="FAILURE",
-            latency=random.randint(8, 15),
+            latency=rng.randint(8, 15),
             retry_count=retry,
             error_code="AUTH_REJECT"
         )
         add_log(
             event="authentication_retry",
             result="RETRY",
-            latency=random.randint(3, 6),
+            latency=rng.randint(3, 6),
             retry_count=retry
         )
 
     # Step 4: Authentication Success
-    add_log("authentication_success", "SUCCESS", latency=random.randint(10, 18))
+    add_log("authentication_success", "SUCCESS", latency=rng.randint(10, 18))
 
     # Step 5: Registration Complete
-    add_log("registration_complete", "SUCCESS", latency=random.randint(5, 10))
+    add_log("registration_complete", "SUCCESS", latency=rng.randint(5, 10))
 
     return logs
 
-def generate_registration_success(start_log_id=1):
-    procedure_id = f"reg-{uuid.uuid4().hex[:6]}"
-    ue_id = f"imsi-00101{random.randint(100000000, 999999999)}"
-    ran_id = f"gnb-{random.randint(100, 199)}"
+def generate_registration_success(start_log_id=1, rng=random, start_time=None, procedure_id=None):
+    # rng, start_time and procedure_id make the output reproducible
+    procedure_id = procedure_id or f"reg-{uuid.uuid4().hex[:6]}"
+    ue_id = f"imsi-00101{rng.randint(100000000, 999999999)}"
+    ran_id = f"gnb-{rng.randint(100, 199)}"
 
-    base_time = datetime.utcnow()
+    base_time = start_time or datetime.utcnow()
     logs = []
     log_id = start_log_id
     current_time = base_time
@@ -98,22 +100,23 @@ def generate_registration_success(start_log_id=1):
     add_log("registration_request", "SUCCESS", latency=6)
 
     # Step 2: Authentication Request
-    add_log("authentication_request", "SUCCESS", latency=random.randint(10, 18))
+    add_log("authentication_request", "SUCCESS", latency=rng.randint(10, 18))
 
     # Step 3: Authentication Success
-    add_log("authentication_success", "SUCCESS", latency=random.randint(10, 18))
+    add_log("authentication_success", "SUCCESS", latency=rng.randint(10, 18))
 
     # Step 4: Registration Complete
-    add_log("registration_complete", "SUCCESS", latency=random.randint(5, 10))
+    add_log("registration_complete", "SUCCESS", latency=rng.randint(5, 10))
 
     return logs
 
-def generate_registration_reject(start_log_id=1):
-    procedure_id = f"reg-{uuid.uuid4().hex[:6]}"
-    ue_id = f"imsi-00101{random.randint(100000000, 999999999)}"
-    ran_id = f"gnb-{random.randint(100, 199)}"
+def generate_registration_reject(start_log_id=1, rng=random, start_time=None, procedure_id=None):
+    # rng, start_time and procedure_id make the output reproducible
+    procedure_id = procedure_id or f"reg-{uuid.uuid4().hex[:6]}"
+    ue_id = f"imsi-00101{rng.randint(100000000, 999999999)}"
+    ran_id = f"gnb-{rng.randint(100, 199)}"
 
-    base_time = datetime.utcnow()
+    base_time = start_time or datetime.utcnow()
     logs = []
     log_id = start_log_id
     current_time = base_time
@@ -142,7 +145,7 @@ def generate_registration_reject(start_log_id=1):
     add_log("registration_request", "SUCCESS", latency=6)
 
     # Step 2: Authentication Request
-    add_log("registration_reject", "FAILURE", latency=random.randint(10, 18))
+    add_log("registration_reject", "FAILURE", latency=rng.randint(10, 18))
 
     return logs
 
@@ -0,0 +1,142 @@
+"""
+Benchmark for the KPI bulk writer.
+
+Stores the same synthetic ingestion (KPI totals, 1m/5m/1h buckets and
+procedure records, split into micro-batches as in follow mode) twice,
+each into a fresh database: first the old way, with a connection, one
+statement per row and one commit per table, then through KpiWriter.
+Prints rows/sec for both.
+
+Usage:
+    python -m tools.benchmark_writer --procedures 100000 --batches 50
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from db.insert_kpis import KpiWriter
+from db.setup_db import setup_database
+from log_parser.amf_parser import EVENT_KPI_MAP
+from log_parser.time_buckets import rollup_minute_counts
+
+
+def make_run(procedures, first=0, seed=7):
+    """
+    Build a deterministic synthetic ingestion batch.
+
+    Returns:
+        tuple: (kpis, series, records) as produced by the parsers and the
+        procedure correlator.
+    """
+    rng = random.Random(seed + first)
+    kpi_names = list(EVENT_KPI_MAP.values())
+    start = 1767225600  # 2026-01-01T00:00:00Z
+
+    kpis = {name: rng.randrange(1000) for name in kpi_names}
+    series = {}
+    records = []
+
+    for index in range(first, first + procedures):
+        start_time = start + index * 0.05
+        minute = time.strftime("%Y-%m-%dT%H:%M", time.gmtime(start_time))
+        bucket = (minute, rng.choice(kpi_names))
+        series[bucket] = series.get(bucket, 0) + 1
+        records.append((
+            f"reg-{index:08x}",
+            rng.choice(("SUCCESS", "FAILURE")),
+            start_time,
+            rng.uniform(20, 90),
+            rng.randint(2, 8),
+            rng.randint(0, 2)
+        ))
+
+    return kpis, series, records
+
+
+def write_per_row(db_path, kpis, series, records):
+    """
+    Store a run the way insert_kpis did before the bulk writer.
+    """
+    def per_row(sql, rows):
+        conn = sqlite3.connect(db_path)
+        for row in rows:
+            conn.execute(sql, row)
+        conn.commit()
+        conn.close()
+
+    per_row(
+        "INSERT INTO amf_kpis (timestamp, kpi_name, kpi_value) VALUES (?, ?, ?)",
+        [("now", name, value) for name, value in kpis.items()]
+    )
+    per_row(
+        """
+        INSERT INTO amf_kpi_buckets (resolution, bucket_start, kpi_name, kpi_value)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(resolution, bucket_start, kpi_name)
+        DO UPDATE SET kpi_value = kpi_value + excluded.kpi_value
+        """,
+        [(*bucket, count) for bucket, count in rollup_minute_counts(series).items()]
+    )
+    per_row(
+        """
+        INSERT INTO procedure_records
+        (nf, procedure_id, outcome, start_time, duration_ms, steps, retries)
+        VALUES ('AMF', ?, ?, ?, ?, ?, ?)
+        """,
+        records
+    )
+    return len(kpis) + len(rollup_minute_counts(series)) + len(records)
+
+
+def write_bulk(db_path, kpis, series, records):
+    """
+    Store a run through KpiWriter.
+    """
+    with KpiWriter(db_path) as writer:
+        writer.insert_amf_kpis(kpis)
+        writer.insert_kpi_buckets("amf_kpi_buckets", series)
+        writer.insert_procedure_records("AMF", records)
+    return writer.rows
+
+
+def fresh_database(directory, name, journal_mode):
+    db_path = os.path.join(directory, name)
+    setup_database(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.close()
+    return db_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-row inserts against KpiWriter")
+    parser.add_argument("--procedures", type=int, default=100000,
+                        help="Synthetic procedure records in total")
+    parser.add_argument("--batches", type=int, default=50,
+                        help="Micro-batches the procedures are stored in")
+    args = parser.parse_args()
+
+    batch_size = args.procedures // args.batches
+    batches = [make_run(batch_size, first=index * batch_size) for index in range(args.batches)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, journal_mode, write in (
+            ("per-row (before)", "DELETE", write_per_row),
+            ("KpiWriter (after)", "WAL", write_bulk)
+        ):
+            db_path = fresh_database(directory, f"{journal_mode.lower()}.db", journal_mode)
+
+            started = time.perf_counter()
+            rows = sum(write(db_path, *batch) for batch in batches)
+            elapsed = time.perf_counter() - started
+
+            print(f"{label:<20} {rows:>9} rows  {elapsed:8.3f}s  {rows / elapsed:12,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+High-throughput synthetic log generator for load testing.
+
+Writes AMF (JSON) and SMF (key=value) logs in the formats of
+amf_log_generator.py and smf_log_generator.py, but much faster. Lines
+are formatted from templates and written in bulk, and the procedures
+are generated in fixed-size shards on a process pool.
+
+Output is reproducible. Each shard draws from its own RNG, seeded with
+(seed, NF, shard index), so a given seed gives byte-identical logs for
+any --workers. Procedure start times follow --rate on a fixed clock
+starting at --start, and the steps of concurrent procedures are
+interleaved in timestamp order, as an NF would log them.
+
+Usage:
+    python -m tools.log_generator --lines 10000000 --workers 8 --seed 7
+    python -m tools.log_generator --rate 5000 --duration 3600 \\
+        --amf-mix success=90,auth_retry=8,reject=2 \\
+        --slices 1-010203=6,2-020304=3,3-030405=1 --gnbs 500
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import os
+import shutil
+import time
+
+import numpy as np
+
+# Procedures per shard; fixed so the output does not depend on --workers
+SHARD_PROCEDURES = 20000
+
+# Bytes buffered per shard write
+WRITE_BUFFER_BYTES = 8 * 1024 * 1024
+
+NF_CODES = {"AMF": 1, "SMF": 2}
+
+# Scenario → steps of (event, result, latency range ms, retry count, error code JSON)
+AMF_SCENARIOS = {
+    "success": [
+        ("registration_request", "SUCCESS", (6, 6), 0, "null"),
+        ("authentication_request", "SUCCESS", (10, 18), 0, "null"),
+        ("authentication_success", "SUCCESS", (10, 18), 0, "null"),
+        ("registration_complete", "SUCCESS", (5, 10), 0, "null")
+    ],
+    "auth_retry": [
+        ("registration_request", "SUCCESS", (6, 6), 0, "null"),
+        ("authentication_request", "SUCCESS", (10, 18), 0, "null"),
+        ("authentication_failure", "FAILURE", (8, 15), 1, '"AUTH_REJECT"'),
+        ("authentication_retry", "RETRY", (3, 6), 1, "null"),
+        ("authentication_failure", "FAILURE", (8, 15), 2, '"AUTH_REJECT"'),
+        ("authentication_retry", "RETRY", (3, 6), 2, "null"),
+        ("authentication_success", "SUCCESS", (10, 18), 0, "null"),
+        ("registration_complete", "SUCCESS", (5, 10), 0, "null")
+    ],
+    "reject": [
+        ("registration_request", "SUCCESS", (6, 6), 0, "null"),
+        ("registration_reject", "FAILURE", (10, 18), 0, "null")
+    ]
+}
+
+# Scenario → steps of (step, level, result, latency range ms, cause)
+SMF_SCENARIOS = {
+    "success": [
+        ("SM_CONTEXT_CREATE_REQUEST", "INFO", "SUCCESS", (10, 14), None),
+        ("SM_POLICY_ASSOCIATION_REQUEST", "INFO", "SUCCESS", (12, 16), None),
+        ("SM_POLICY_ASSOCIATION_RESPONSE", "INFO", "SUCCESS", (14, 18), None),
+        ("PFCP_SESSION_EST_REQUEST", "INFO", "SUCCESS", (16, 20), None),
+        ("PFCP_SESSION_EST_RESPONSE", "INFO", "SUCCESS", (18, 22), None),
+        ("PDU_SESSION_EST_COMPLETE", "INFO", "SUCCESS", (20, 24), None)
+    ],
+    "pfcp_failure": [
+        ("SM_CONTEXT_CREATE_REQUEST", "INFO", "SUCCESS", (10, 14), None),
+        ("SM_POLICY_ASSOCIATION_REQUEST", "INFO", "SUCCESS", (12, 16), None),
+        ("SM_POLICY_ASSOCIATION_RESPONSE", "INFO", "SUCCESS", (14, 18), None),
+        ("PFCP_SESSION_EST_REQUEST", "INFO", "SUCCESS", (16, 20), None),
+        ("PFCP_SESSION_EST_FAILURE", "ERROR", "FAILURE", (18, 22), "PFCP_TIMEOUT"),
+        ("PDU_SESSION_EST_REJECT", "ERROR", "FAILURE", (20, 24), "PFCP_TIMEOUT")
+    ],
+    "policy_failure": [
+        ("SM_CONTEXT_CREATE_REQUEST", "INFO", "SUCCESS", (10, 14), None),
+        ("SM_POLICY_ASSOCIATION_REQUEST", "INFO", "SUCCESS", (12, 16), None),
+        ("SM_POLICY_ASSOCIATION_FAILURE", "ERROR", "FAILURE", (14, 18), "POLICY_ASSOCIATION_FAILURE"),
+        ("PDU_SESSION_EST_REJECT", "ERROR", "FAILURE", (16, 20), "POLICY_ASSOCIATION_FAILURE")
+    ]
+}
+
+# Defaults follow the procedure counts of the original generators' __main__ runs
+DEFAULT_AMF_MIX = "success=228,auth_retry=78,reject=10"
+DEFAULT_SMF_MIX = "success=246,pfcp_failure=32,policy_failure=45"
+DEFAULT_SLICES = "1-010203=222,2-020304=58,3-030405=43"
+DEFAULT_GNBS = "100"
+DEFAULT_UES = 1000000
+DEFAULT_RATE = 1000.0
+DEFAULT_START = "2026-01-01T00:00:00"
+
+# Line templates: str.format fills in a step's constant fields and leaves
+# %-placeholders for the per-procedure ones
+AMF_LINE = (
+    '{{"log_id": %d, "timestamp": "%s", "nf_type": "AMF", "procedure": "registration", '
+    '"procedure_id": "reg-%08x", "event_name": "{event}", "retry_count": {retry}, '
+    '"ue_id": "%s", "supi": "%s", "ran_id": "%s", "result": "{result}", '
+    '"latency_ms": %d, "error_code": {error_code}}}\n'
+)
+SMF_LINE = (
+    "%s SMF {level} PDU_SESSION_EST proc_id=SMF-PDU-%08x step={step} step_seq={seq} "
+    "supi=%s pdu_id=1 dnn=internet snssai=%s result={result}{cause} latency=%dms\n"
+)
+
+
+def parse_weights(text, names=None):
+    """
+    Parse "name=weight,..." into (names, probabilities).
+
+    Raises:
+        ValueError: On a malformed entry, an unknown name or no positive weight.
+    """
+    entries = {}
+    for entry in text.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if not name or not weight:
+            raise ValueError(f"Invalid weight entry '{entry}', expected name=weight")
+        if names is not None and name not in names:
+            raise ValueError(f"Unknown scenario '{name}', expected one of: {', '.join(names)}")
+        entries[name] = float(weight)
+
+    total = sum(entries.values())
+    if total <= 0:
+        raise ValueError(f"Weights in '{text}' must add up to more than zero")
+    return list(entries), [weight / total for weight in entries.values()]
+
+
+def parse_gnbs(text):
+    """
+    Parse --gnbs: a count of equally likely gNBs from gnb-100, or "name=weight,...".
+    """
+    if text.isdigit():
+        count = int(text)
+        return [f"gnb-{100 + index}" for index in range(count)], [1 / count] * count
+    return parse_weights(text)
+
+
+def build_config(nf_type, seed=7, mix=None, slices=DEFAULT_SLICES, gnbs=DEFAULT_GNBS,
+                 ues=DEFAULT_UES, rate=DEFAULT_RATE, start=DEFAULT_START):
+    """
+    Collect what a shard needs to generate one NF's procedures.
+
+    Args:
+        nf_type (str): "AMF" or "SMF".
+        seed (int): RNG seed.
+        mix (str): Scenario weights "name=weight,..."; defaults to the NF's mix.
+        slices (str): S-NSSAI weights (SMF).
+        gnbs (str): gNB count or weights (AMF).
+        ues (int): Distinct SUPIs to draw from.
+        rate (float): Log lines per second of event time.
+        start (str): ISO-8601 event time of the first procedure.
+
+    Returns:
+        dict: Picklable generator settings.
+
+    Raises:
+        ValueError: On invalid weights or start time.
+    """
+    if nf_type == "AMF":
+        scenarios, weights = parse_weights(mix or DEFAULT_AMF_MIX, AMF_SCENARIOS)
+        steps = [AMF_SCENARIOS[name] for name in scenarios]
+        templates = [
+            [AMF_LINE.format(event=event, result=result, retry=retry, error_code=error_code)
+             for event, result, _, retry, error_code in scenario_steps]
+            for scenario_steps in steps
+        ]
+        ranges = [[step[2] for step in scenario_steps] for scenario_steps in steps]
+    else:
+        scenarios, weights = parse_weights(mix or DEFAULT_SMF_MIX, SMF_SCENARIOS)
+        steps = [SMF_SCENARIOS[name] for name in scenarios]
+        templates = [
+            [SMF_LINE.format(step=name, seq=seq, level=level, result=result,
+                             cause=f" cause={cause}" if cause else "")
+             for seq, (name, level, result, _, cause) in enumerate(scenario_steps, start=1)]
+            for scenario_steps in steps
+        ]
+        ranges = [[step[3] for step in scenario_steps] for scenario_steps in steps]
+
+    line_counts = [len(scenario_steps) for scenario_steps in steps]
+    mean_lines = sum(count * weight for count, weight in zip(line_counts, weights))
+
+    # Latency bounds per scenario and step, padded to the longest scenario
+    max_steps = max(line_counts)
+    lows = np.zeros((len(steps), max_steps), dtype=np.int64)
+    spans = np.zeros((len(steps), max_steps), dtype=np.int64)
+    for scenario, scenario_ranges in enumerate(ranges):
+        for seq, (low, high) in enumerate(scenario_ranges):
+            lows[scenario, seq] = low
+            spans[scenario, seq] = high - low + 1
+
+    start_time = datetime.fromisoformat(start)
+    if start_time.tzinfo is None:
+        start_time = start_time.replace(tzinfo=timezone.utc)
+
+    return {
+        "nf_type": nf_type,
+        "seed": seed,
+        "templates": templates,
+        "weights": weights,
+        "line_counts": line_counts,
+        "latency_lows": lows,
+        "latency_spans": spans,
+        "slices": parse_weights(slices),
+        "gnbs": parse_gnbs(gnbs),
+        "ues": ues,
+        "start_us": int(start_time.timestamp() * 1_000_000),
+        # Procedures start evenly spaced so that lines arrive at --rate per second
+        "spacing_us": mean_lines / rate * 1_000_000
+    }
+
+
+def shard_rng(config, shard):
+    return np.random.default_rng([config["seed"], NF_CODES[config["nf_type"]], shard])
+
+
+def draw_scenarios(rng, config):
+    """
+    Draw the scenario of every procedure in a shard (the shard's first draw).
+    """
+    return rng.choice(len(config["weights"]), size=SHARD_PROCEDURES, p=config["weights"])
+
+
+def plan_shards(config, target_lines):
+    """
+    Split a target line count into shards.
+
+    Returns:
+        list[tuple]: (shard, first procedure index, first log_id, lines to keep)
+    """
+    line_counts = np.array(config["line_counts"])
+    shards, lines, shard = [], 0, 0
+
+    while lines < target_lines:
+        count = int(line_counts[draw_scenarios(shard_rng(config, shard), config)].sum())
+        keep = min(count, target_lines - lines)
+        shards.append((shard, shard * SHARD_PROCEDURES, lines + 1, keep))
+        lines += keep
+        shard += 1
+
+    return shards
+
+
+def generate_shard(config, shard, first_procedure, first_log_id, keep, path):
+    """
+    Write one shard of procedures to a part file.
+
+    Random draws, latencies and timestamps are computed for the whole
+    shard with numpy; only the line formatting loops in Python. Lines
+    are in timestamp order within the shard. The last procedures of one
+    shard may still overlap the first ones of the next.
+
+    Returns:
+        int: Lines written.
+    """
+    rng = shard_rng(config, shard)
+    scenarios = draw_scenarios(rng, config)
+    count = SHARD_PROCEDURES
+
+    slice_names, slice_weights = config["slices"]
+    gnb_names, gnb_weights = config["gnbs"]
+    supis = [f"imsi-00101{ue}" for ue in (100000000 + rng.integers(config["ues"], size=count)).tolist()]
+    slices = [slice_names[index] for index in rng.choice(len(slice_names), size=count, p=slice_weights).tolist()]
+    gnbs = [gnb_names[index] for index in rng.choice(len(gnb_names), size=count, p=gnb_weights).tolist()]
+
+    # Latency of every step, then its timestamp: procedure start + latencies so far
+    jitter = rng.random((count, config["latency_lows"].shape[1]))
+    latencies = config["latency_lows"][scenarios] + (jitter * config["latency_spans"][scenarios]).astype(np.int64)
+    procedures = np.arange(first_procedure, first_procedure + count)
+    starts_us = config["start_us"] + (procedures * config["spacing_us"]).astype(np.int64)
+    times_us = starts_us[:, None] + np.cumsum(latencies, axis=1) * 1000
+
+    # Concurrent procedures overlap, so the shard's steps are written in
+    # timestamp order; the stable sort keeps ties in procedure and step order
+    steps = np.arange(latencies.shape[1]) < np.array(config["line_counts"])[scenarios][:, None]
+    rows, seqs = np.nonzero(steps)
+    order = np.argsort(times_us[steps], kind="stable")[:keep]
+    rows, seqs = rows[order], seqs[order]
+    timestamps = np.datetime_as_string(times_us[steps][order].astype("datetime64[us]"), unit="us")
+
+    templates = [config["templates"][scenario] for scenario in scenarios.tolist()]
+    is_amf = config["nf_type"] == "AMF"
+    procedures = procedures.tolist()
+    lines = zip(rows.tolist(), seqs.tolist(), timestamps.tolist(), latencies[rows, seqs].tolist())
+
+    out, written, log_id = [], 0, first_log_id
+    with open(path, "w", buffering=WRITE_BUFFER_BYTES) as part:
+        for index, seq, timestamp, latency in lines:
+            supi = supis[index]
+            if is_amf:
+                out.append(templates[index][seq] % (log_id, timestamp, procedures[index], supi, supi,
+                                                    gnbs[index], latency))
+                log_id += 1
+            else:
+                out.append(templates[index][seq] % (timestamp, procedures[index], supi, slices[index],
+                                                    latency))
+
+            if len(out) >= 16384:
+                written += len(out)
+                part.write("".join(out))
+                out.clear()
+
+        written += len(out)
+        part.write("".join(out))
+
+    return written
+
+
+def append_file(output, path):
+    """
+    Append a file to an open binary file, copying in the kernel where possible.
+    """
+    with open(path, "rb") as source:
+        remaining = os.fstat(source.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(source.fileno(), output.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            # No copy_file_range (non-Linux) or unsupported by the filesystem
+            shutil.copyfileobj(source, output, WRITE_BUFFER_BYTES)
+
+
+def generate_log(config, target_lines, output_path, workers=1):
+    """
+    Generate one NF log of exactly target_lines lines.
+
+    Shards are written to part files in parallel and concatenated in
+    order.
+
+    Returns:
+        int: Bytes written.
+    """
+    shards = plan_shards(config, target_lines)
+    parts = [f"{output_path}.part{shard:06d}" for shard, *_ in shards]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_shard, config, shard, first_procedure, first_log_id, keep, part)
+            for (shard, first_procedure, first_log_id, keep), part in zip(shards, parts)
+        ]
+        for future in futures:
+            future.result()
+
+    with open(output_path, "wb") as output:
+        for part in parts:
+            append_file(output, part)
+            os.remove(part)
+
+    return os.path.getsize(output_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate reproducible AMF/SMF logs for load testing")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--lines", type=int, help="Lines per NF log (default 1,000,000)")
+    size.add_argument("--duration", type=float,
+                      help="Seconds of traffic per NF log; lines = --rate x --duration")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="Log lines per second of event time, per NF (default %(default)s)")
+    parser.add_argument("--start", default=DEFAULT_START,
+                        help="Event time of the first procedure, ISO-8601 (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=7, help="RNG seed (default %(default)s)")
+    parser.add_argument("--nf", choices=("amf", "smf", "both"), default="both",
+                        help="Which logs to write (default %(default)s)")
+    parser.add_argument("--amf-mix", default=DEFAULT_AMF_MIX,
+                        help=f"AMF scenario weights: {', '.join(AMF_SCENARIOS)} (default %(default)s)")
+    parser.add_argument("--smf-mix", default=DEFAULT_SMF_MIX,
+                        help=f"SMF scenario weights: {', '.join(SMF_SCENARIOS)} (default %(default)s)")
+    parser.add_argument("--slices", default=DEFAULT_SLICES,
+                        help="S-NSSAI weights of SMF sessions (default %(default)s)")
+    parser.add_argument("--gnbs", default=DEFAULT_GNBS,
+                        help="Number of equally likely gNBs, or gNB weights name=weight,... "
+                             "(default %(default)s)")
+    parser.add_argument("--ues", type=int, default=DEFAULT_UES,
+                        help="Distinct SUPIs to draw from (default %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Generator processes (default: CPU count)")
+    parser.add_argument("--output-dir", default="logs",
+                        help="Directory for amf.log / smf.log (default %(default)s)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    target_lines = int(args.rate * args.duration) if args.duration else (args.lines or 1000000)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    nf_types = ("AMF", "SMF") if args.nf == "both" else (args.nf.upper(),)
+
+    for nf_type in nf_types:
+        try:
+            config = build_config(
+                nf_type, args.seed, args.amf_mix if nf_type == "AMF" else args.smf_mix,
+                args.slices, args.gnbs, args.ues, args.rate, args.start
+            )
+        except ValueError as e:
+            raise SystemExit(f"Invalid options: {e}")
+        output_path = os.path.join(args.output_dir, f"{nf_type.lower()}.log")
+
+        started = time.perf_counter()
+        size = generate_log(config, target_lines, output_path, args.workers)
+        elapsed = time.perf_counter() - started
+
+        print(f"Generated {target_lines:,} {nf_type} lines ({size / 1e6:,.1f} MB) → {output_path} "
+              f"in {elapsed:.2f}s ({target_lines / elapsed:,.0f} lines/s, {size / 1e6 / elapsed:,.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,9 @@ def write_log(f, ts, level, proc_id, step, seq, supi, pdu_id, dnn, snssai, resul
     log += f" latency={latency}ms\n"
     f.write(log)
 
-def generate_success_flow(f, snssai="1-010203"):
-    proc_id = f"SMF-PDU-{uuid.uuid4().hex[:8]}"
+def generate_success_flow(f, snssai="1-010203", start_time=None, proc_id=None):
+    # start_time and proc_id make the output reproducible
+    proc_id = proc_id or f"SMF-PDU-{uuid.uuid4().hex[:8]}"
     supi = "imsi-001010000001234"
     pdu_id = 1
     dnn = "internet"
@@ -28,7 +29,7 @@ def generate_success_flow(f, snssai="1-010203"):
         "PDU_SESSION_EST_COMPLETE"
     ]
 
-    ts = datetime.now()
+    ts = start_time or datetime.now()
 
     for seq, step in enumerate(steps, start=1):
         latency = 10 + seq * 2
@@ -40,8 +41,9 @@ def generate_success_flow(f, snssai="1-010203"):
             "SUCCESS", latency
         )
 
-def generate_pfcp_failure_flow(f):
-    proc_id = f"SMF-PDU-{uuid.uuid4().hex[:8]}"
+def generate_pfcp_failure_flow(f, start_time=None, proc_id=None):
+    # start_time and proc_id make the output reproducible
+    proc_id = proc_id or f"SMF-PDU-{uuid.uuid4().hex[:8]}"
     supi = "imsi-001010000009999"
     pdu_id = 1
     dnn = "internet"
@@ -56,7 +58,7 @@ def generate_pfcp_failure_flow(f):
         "PDU_SESSION_EST_REJECT"
     ]
 
-    ts = datetime.now()
+    ts = start_time or datetime.now()
 
     for seq, step in enumerate(steps, start=1):
         latency = 10 + seq * 2
@@ -75,8 +77,9 @@ def generate_pfcp_failure_flow(f):
                 supi, pdu_id, dnn, snssai,
             "SUCCESS", latency)
 
-def generate_policy_association_failure_flow(f):
-    proc_id = f"SMF-PDU-{uuid.uuid4().hex[:8]}"
+def generate_policy_association_failure_flow(f, start_time=None, proc_id=None):
+    # start_time and proc_id make the output reproducible
+    proc_id = proc_id or f"SMF-PDU-{uuid.uuid4().hex[:8]}"
     supi = "imsi-001010000009999"
     pdu_id = 1
     dnn = "internet"
@@ -89,7 +92,7 @@ def generate_policy_association_failure_flow(f):
         "PDU_SESSION_EST_REJECT"
     ]
 
-    ts = datetime.now()
+    ts = start_time or datetime.now()
 
     for seq, step in enumerate(steps, start=1):
         latency = 10 + seq * 2